@@ -0,0 +1,102 @@
+import re
+from functools import lru_cache
+from app.models.commands import COMMAND_GUIDE
+
+_LEADING_WORD = re.compile(r"[a-z]+")
+_QUANTIFIERS = "?*{"
+# A leading lookahead constrains the same characters as the branch it
+# guards, so its literals are used as that branch's prefixes.
+_GROUP_OPEN = re.compile(r"\(\?(?::|=|P<\w+>)")
+
+def _split_alternatives(pattern: str) -> list:
+    branches, depth, start, i = [], 0, 0, 0
+    in_class = False
+    while i < len(pattern):
+        char = pattern[i]
+        if char == "\\":
+            i += 2
+            continue
+        if in_class:
+            in_class = char != "]"
+        elif char == "[":
+            in_class = True
+        elif char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        elif char == "|" and depth == 0:
+            branches.append(pattern[start:i])
+            start = i + 1
+        i += 1
+    branches.append(pattern[start:])
+    return branches
+
+def _matching_paren(pattern: str, open_index: int) -> int:
+    depth, i = 0, open_index
+    while i < len(pattern):
+        char = pattern[i]
+        if char == "\\":
+            i += 2
+            continue
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+            if depth == 0:
+                return i
+        i += 1
+    return -1
+
+def _leading_literals(pattern: str):
+    prefixes = set()
+    for branch in _split_alternatives(pattern):
+        branch = branch.lstrip("^")
+        group = _GROUP_OPEN.match(branch)
+        if group:
+            end = _matching_paren(branch, 0)
+            if end < 0 or branch[end + 1:end + 2] in tuple(_QUANTIFIERS):
+                return None
+            branch_prefixes = _leading_literals(branch[group.end():end])
+        else:
+            literal = _LEADING_WORD.match(branch)
+            literal = literal.group(0) if literal else ""
+            if branch[len(literal):len(literal) + 1] in tuple(_QUANTIFIERS):
+                literal = literal[:-1]
+            branch_prefixes = {literal} if literal else None
+
+        if not branch_prefixes:
+            return None
+        prefixes |= branch_prefixes
+    return prefixes
+
+def _build_index(command_guide: list) -> tuple[dict, list]:
+    index, unindexed = {}, []
+    for position, cmd_def in enumerate(command_guide):
+        entry = (position, re.compile(cmd_def["pattern"]), cmd_def)
+        prefixes = _leading_literals(cmd_def["pattern"])
+        if not prefixes:
+            unindexed.append(entry)
+            continue
+        for prefix in prefixes:
+            index.setdefault(prefix, []).append(entry)
+    return index, unindexed
+
+# Built once at import: COMMAND_GUIDE is static, so neither the index nor
+# the per-word candidate cache below ever needs invalidating.
+_COMMAND_INDEX, _UNINDEXED_COMMANDS = _build_index(COMMAND_GUIDE)
+
+@lru_cache(maxsize=512)
+def _candidates_for(leading_word: str) -> tuple:
+    candidates = {entry[0]: entry for entry in _UNINDEXED_COMMANDS}
+    for end in range(1, len(leading_word) + 1):
+        for entry in _COMMAND_INDEX.get(leading_word[:end], ()):
+            candidates[entry[0]] = entry
+    return tuple(candidates[position] for position in sorted(candidates))
+
+def match_command(normalized_command: str):
+    leading_word = _LEADING_WORD.match(normalized_command)
+    for _position, compiled, cmd_def in _candidates_for(leading_word.group(0) if leading_word else ""):
+        match = compiled.fullmatch(normalized_command)
+        if match:
+            return cmd_def, match
+    return None, None
@@ -1,7 +1,8 @@
-import re
-from app.models.commands import COMMAND_GUIDE
+from app.api.command_matcher import match_command
 from app.core import container_manager, image_manager, compose_manager, volume_manager, network_manager, system_manager, history_manager
 from app.core import gemini_client
+from app.core.job_queue import jobs
+from app.core.docker_client import fan_out, host_names, use_host
 from flask import current_app
 
 ACTION_HANDLERS = {
@@ -10,8 +11,13 @@ ACTION_HANDLERS = {
     "start_container": container_manager.start_container,
     "stop_container": container_manager.stop_container,
     "remove_container": container_manager.remove_container,
+    "bulk_container_action": container_manager.bulk_container_action,
     "view_logs": container_manager.view_logs,
+    "search_logs": container_manager.search_logs,
+    "follow_logs": container_manager.follow_logs,
     "view_stats": container_manager.view_stats,
+    "view_all_stats": container_manager.view_all_stats,
+    "view_metrics_history": container_manager.view_metrics_history,
     "inspect_container": container_manager.inspect_container,
     "pull_image": image_manager.pull_image,
     "list_images": image_manager.list_images,
@@ -39,6 +45,7 @@ ACTION_HANDLERS = {
     "remove_network": network_manager.remove_network,
     "compose_restart": compose_manager.compose_restart,
     "compose_build": compose_manager.compose_build,
+    "refresh_inventory": system_manager.refresh_inventory,
 }
 
 INSPECT_ACTION_MAP = {
@@ -49,43 +56,77 @@ INSPECT_ACTION_MAP = {
     "network": "inspect_network",
 }
 
+# Matching runs on the lowercased command; these values are taken back
+# from the original text because their case changes their meaning.
+CASE_SENSITIVE_PARAMS = ("query",)
+
+FAN_OUT_ACTIONS = {"list_containers", "list_images", "list_volumes", "list_networks"}
+
+def execute_action(action: str, params: dict, command: str = None) -> tuple:
+    host = (params.pop("host", None) or "").strip().lower() or None
+    hosts = host_names()
+    if host and host not in hosts:
+        return None, f"Error: Host '{host}' tidak dikenal. Host yang tersedia: {', '.join(hosts)}.", False
+    with use_host(host):
+        if jobs.handles(action):
+            output_data, error_str = jobs.submit(action, ACTION_HANDLERS[action], params, command)
+            return output_data, error_str, True
+        if not host and action in FAN_OUT_ACTIONS and len(hosts) > 1:
+            output_data, error_str = fan_out(ACTION_HANDLERS[action], params)
+        else:
+            output_data, error_str = ACTION_HANDLERS[action](params)
+    return output_data, error_str, False
+
+def _original_case_params(params: dict, match, original_command: str) -> dict:
+    if len(original_command) != len(match.string):
+        return params
+    for name in CASE_SENSITIVE_PARAMS:
+        if params.get(name) is not None:
+            start, end = match.span(name)
+            params[name] = original_command[start:end]
+    return params
+
 def parse_and_execute_command(user_command_str: str, history: list = None) -> dict:
     normalized_command = user_command_str.lower().strip()
     
-    for cmd_def in COMMAND_GUIDE:
-        match = re.fullmatch(cmd_def["pattern"], normalized_command)
-        if match:
-            action = cmd_def["action"]
-            params = match.groupdict()
+    cmd_def, match = match_command(normalized_command)
+    if match:
+        action = cmd_def["action"]
+        params = _original_case_params(match.groupdict(), match, user_command_str.strip())
 
-            if action == "inspect_object":
-                object_type = params.get("object_type")
-                resolved_action = INSPECT_ACTION_MAP.get(object_type)
-                if not resolved_action:
-                    return {"output": None, "error": f"Error: Tipe objek '{object_type}' tidak dikenal untuk inspect.", "output_type": "text"}
-                action = resolved_action
+        if action == "inspect_object":
+            object_type = params.get("object_type")
+            resolved_action = INSPECT_ACTION_MAP.get(object_type)
+            if not resolved_action:
+                return {"output": None, "error": f"Error: Tipe objek '{object_type}' tidak dikenal untuk inspect.", "output_type": "text"}
+            action = resolved_action
 
-            if action in ACTION_HANDLERS:
-                if "params_map" in cmd_def:
-                    params.update(cmd_def["params_map"])
-                output_data, error_str = ACTION_HANDLERS[action](params)
+        if action in ACTION_HANDLERS:
+            if "params_map" in cmd_def:
+                params.update(cmd_def["params_map"])
+            output_data, error_str, is_job = execute_action(action, params, user_command_str)
+            if is_job:
+                return {"output": output_data, "error": error_str, "output_type": "job"}
 
-                output_type = "text"
-                if action in ["list_containers", "list_images", "view_stats", "view_logs", "list_volumes", "list_networks"]:
-                    output_type = "table"
-                elif action in [
-                    "run_container", "stop_container", "remove_container", "pull_image", 
-                    "compose_up", "compose_down", "start_container", "remove_volume", 
-                    "prune_system", "remove_image", "restart_container", "pause_container", 
-                    "unpause_container", "create_volume", "rename_container", "remove_network"
-                ]:
-                    output_type = "action_receipt"
-                elif "inspect" in action or action in ["system_info", "system_version"]:
-                    output_type = "inspect"
-                
-                return {"output": output_data, "error": error_str, "output_type": output_type}
-            else:
-                return {"output": None, "error": f"Error: Aksi '{action}' belum terdefinisi di backend.", "output_type": "text"}
+            output_type = "text"
+            if action in ["list_containers", "list_images", "view_stats", "view_all_stats", "view_metrics_history", "view_logs", "search_logs", "bulk_container_action", "list_volumes", "list_networks", "compose_ps", "compose_logs", "compose_restart"]:
+                output_type = "table"
+            elif action in [
+                "run_container", "stop_container", "remove_container", "pull_image", 
+                "compose_up", "compose_down", "start_container", "remove_volume", 
+                "prune_system", "remove_image", "restart_container", "pause_container", 
+                "unpause_container", "create_volume", "rename_container", "remove_network",
+                "refresh_inventory"
+            ]:
+                output_type = "action_receipt"
+            elif "inspect" in action or action in ["system_info", "system_version"]:
+                output_type = "inspect"
+            elif action == "follow_logs":
+                output_type = "log_stream"
+            
+            return {"output": output_data, "error": error_str, "output_type": output_type}
+        else:
+            return {"output": None, "error": f"Error: Aksi '{action}' belum terdefinisi di backend.", "output_type": "text"}
 
     current_app.logger.info(f"Command '{user_command_str}' not found in guide. Passing to Gemini.")
     return gemini_client.handle_gemini_request(user_command_str, history or [])
\ No newline at end of file
@@ -1,23 +1,39 @@
 from flask import (Blueprint, request, jsonify, current_app, 
-                   render_template, session, redirect, url_for, flash)
+                   render_template, session, redirect, url_for, flash,
+                   Response, stream_with_context)
 from ..api.handlers import parse_and_execute_command
-from ..core import history_manager
+from ..core import history_manager, gemini_client, container_manager
+from ..core.inventory_cache import inventory
+from ..core.stats_sampler import stats_sampler
+from ..core.metrics_store import metrics_store
+from ..core.job_queue import jobs
+from ..core.docker_client import host_pool_stats
+from ..core.compose_project import compose_project
 from ..models.commands import COMMAND_GUIDE
 from functools import wraps
+import json
 
 api_bp = Blueprint('api', __name__)
 
+DEFAULT_PAGE_LIMIT = 20
+MAX_PAGE_LIMIT = 200
+
 def login_required(f):
     @wraps(f)
     def decorated_function(*args, **kwargs):
         if 'logged_in' not in session:
-            if request.path.startswith('/conversation') or request.path.startswith('/command'):
+            if request.path.startswith(('/conversation', '/command', '/metrics', '/logs', '/jobs')):
                  return jsonify({"error": "Sesi berakhir. Silakan login kembali.", "session_expired": True}), 401
 
             return redirect(url_for('api.login'))
         return f(*args, **kwargs)
     return decorated_function
 
+@api_bp.before_app_request
+def start_background_samplers():
+    if 'logged_in' in session and current_app.config.get('METRICS_AUTOSTART', True):
+        stats_sampler.ensure_started()
+
 @api_bp.route('/')
 @login_required
 def index():
@@ -45,18 +61,48 @@ def logout():
     flash('Anda telah berhasil logout.', 'success')
     return redirect(url_for('api.login'))
 
+def _get_page_args(cursor_type=str):
+    limit = request.args.get('limit', type=int)
+    before = request.args.get('before')
+    if limit is None and before is None:
+        return None, None, None
+    if limit is None or limit <= 0:
+        limit = DEFAULT_PAGE_LIMIT
+    if before is not None:
+        try:
+            before = cursor_type(before)
+        except ValueError:
+            return None, None, (jsonify({"error": "Parameter 'before' tidak valid."}), 400)
+    return min(limit, MAX_PAGE_LIMIT), before, None
+
 @api_bp.route('/conversations', methods=['GET'])
 @login_required
 def get_conversations():
-    conv_list = history_manager.get_conversations_list()
-    return jsonify(conv_list)
+    limit, before, error_response = _get_page_args()
+    if error_response:
+        return error_response
+
+    with history_manager.history_session() as history:
+        if limit is None:
+            return jsonify(history.get_conversations())
+        conv_list, next_before = history.get_conversations_page(limit, before)
+        last_active_id = history.get_last_active_id()
+    return jsonify({"conversations": conv_list, "next_before": next_before, "last_active_id": last_active_id})
 
 @api_bp.route('/conversation/<string:conv_id>', methods=['GET'])
 @login_required
 def get_conversation(conv_id):
-    messages = history_manager.get_conversation_messages(conv_id)
-    history_manager.set_last_active(conv_id)
-    return jsonify(messages)
+    limit, before, error_response = _get_page_args(cursor_type=int)
+    if error_response:
+        return error_response
+
+    with history_manager.history_session() as history:
+        if before is None:
+            history.set_last_active(conv_id)
+        if limit is None:
+            return jsonify(history.get_messages(conv_id))
+        messages, next_before = history.get_messages_page(conv_id, limit, before)
+    return jsonify({"messages": messages, "next_before": next_before})
 
 @api_bp.route('/conversation/<string:conv_id>', methods=['DELETE'])
 @login_required
@@ -66,6 +112,59 @@ def delete_conversation_route(conv_id):
     else:
         return jsonify({"error": "Percakapan tidak ditemukan."}), 404
 
+@api_bp.route('/metrics', methods=['GET'])
+@login_required
+def get_metrics():
+    return jsonify({
+        "docker_hosts": host_pool_stats(),
+        "gemini_cache": gemini_client.get_response_cache_stats(),
+        "gemini_tools": gemini_client.get_tool_call_stats(),
+        "inventory_cache": inventory.stats(),
+        "stats_sampler": stats_sampler.stats(),
+        "metrics_store": metrics_store.stats(),
+        "jobs": jobs.stats(),
+        "compose_project": compose_project.stats(),
+    })
+
+@api_bp.route('/jobs/<string:job_id>', methods=['GET'])
+@login_required
+def get_job(job_id):
+    job = jobs.get(job_id, log_from=request.args.get('log_from', type=int))
+    if job is None:
+        return jsonify({"error": "Job tidak ditemukan."}), 404
+    return jsonify(job)
+
+@api_bp.route('/jobs/<string:job_id>/cancel', methods=['POST'])
+@login_required
+def cancel_job(job_id):
+    job, error = jobs.cancel(job_id)
+    if job is None:
+        return jsonify({"error": error}), 404
+    if error:
+        return jsonify({**job, "error": error}), 409
+    return jsonify(job)
+
+@api_bp.route('/logs/<name>/stream', methods=['GET'])
+@login_required
+def stream_container_logs(name):
+    records, error = container_manager.open_log_stream({**request.args.to_dict(), "name": name})
+    if error:
+        status = 404 if "tidak ditemukan" in error else 400
+        return jsonify({"error": error}), status
+
+    def generate():
+        try:
+            for event, payload in records:
+                if event == "keepalive":
+                    yield ": keepalive\n\n"
+                    continue
+                yield f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+        finally:
+            records.close()
+
+    return Response(stream_with_context(generate()), mimetype='text/event-stream',
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
 @api_bp.route('/command', methods=['POST'])
 @login_required
 def handle_command_route():
@@ -82,21 +181,28 @@ def handle_command_route():
 
         current_app.logger.info(f"Menerima perintah: '{user_command_str}' untuk conv_id: {conv_id}")
 
-        conversation_history = []
-        if conv_id:
-            conversation_history = history_manager.get_conversation_messages(conv_id)
+        with history_manager.history_session() as history:
+            conversation_history = []
+            if conv_id:
+                conversation_history = history.get_messages(conv_id)
 
-        result = parse_and_execute_command(user_command_str, history=conversation_history)
+            result = parse_and_execute_command(user_command_str, history=conversation_history)
 
-        if conv_id:
-            history_manager.add_message_to_conversation(conv_id, user_command_str, result)
-            history_manager.set_last_active(conv_id)
-            return jsonify(result)
-        else:
-            new_conv_id = history_manager.create_new_conversation(user_command_str, result)
-            history_manager.set_last_active(new_conv_id)
-            response_data = {**result, "conversation_id": new_conv_id}
-            return jsonify(response_data)
+            if conv_id:
+                history.add_message(conv_id, user_command_str, result)
+                history.set_last_active(conv_id)
+                response_data = result
+            else:
+                new_conv_id = history.create_conversation(user_command_str, result)
+                history.set_last_active(new_conv_id)
+                response_data = {**result, "conversation_id": new_conv_id}
+
+        if result.get("output_type") == "job" and result.get("output"):
+            jobs.bind_conversation(result["output"]["job_id"], conv_id or new_conv_id, user_command_str)
+        for job in result.get("jobs") or []:
+            jobs.bind_conversation(job["job_id"], conv_id or new_conv_id, user_command_str)
+
+        return jsonify(response_data)
 
     except Exception as e:
         current_app.logger.exception(f"Error internal server saat memproses perintah dari {request.remote_addr}:")
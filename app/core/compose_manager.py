@@ -1,64 +1,340 @@
+import docker
 import os
+import queue
 import re
 import subprocess
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from flask import current_app
+from .docker_client import get_docker_client
+from .inventory_cache import inventory
+from .container_manager import is_self_container, parse_log_line, run_bulk_operation
+from .compose_project import compose_file_path, compose_project
+from .job_queue import cancel_event, report_log
 
+PROJECT_LABEL = "com.docker.compose.project"
+SERVICE_LABEL = "com.docker.compose.service"
+NUMBER_LABEL = "com.docker.compose.container-number"
+CONFIG_HASH_LABEL = "com.docker.compose.config-hash"
+IMAGE_LABEL = "com.docker.compose.image"
+ONEOFF_LABEL = "com.docker.compose.oneoff"
+MAX_COMPOSE_LOG_LINES = 1000
+COMPOSE_ERROR_TAIL_LINES = 50
+COMPOSE_DRAIN_SECONDS = 5
+_ANSI_ESCAPE = re.compile(r"\x1b\[[0-9;?]*[A-Za-z]")
+
+def _project_name(model: dict = None) -> str:
+    configured = current_app.config.get('COMPOSE_PROJECT_NAME')
+    if configured:
+        return configured
+    if model is None:
+        model, _error = compose_project.get()
+    if model and model["name"]:
+        return model["name"]
+    project_dir = os.path.basename(os.path.dirname(compose_file_path()))
+    return re.sub(r"[^a-z0-9_-]", "", project_dir.lower())
+
+def _validate_service(service: str) -> str:
+    if not service:
+        return ""
+    if not re.match(r"^[a-zA-Z0-9_.-]+$", service):
+        return "Error: Nama service tidak valid."
+    model, _error = compose_project.get()
+    if model and service not in model["services"]:
+        return f"Error: Service '{service}' tidak ada di docker-compose.yml. Service yang tersedia: {', '.join(sorted(model['services']))}."
+    return ""
+
+# ps, logs and restart only need the project's containers, which compose
+# tags with its project/service labels, so they talk to the Docker API
+# directly instead of forking the docker-compose CLI.
+def _project_containers(client, service: str = None) -> tuple[list, str]:
+    error = _validate_service(service)
+    if error:
+        return [], error
+    project = _project_name()
+    wanted = {PROJECT_LABEL: project}
+    if service:
+        wanted[SERVICE_LABEL] = service
+
+    summaries = inventory.list("containers")
+    if summaries is None:
+        summaries = client.api.containers(all=True, filters={"label": [f"{key}={value}" for key, value in wanted.items()]})
+    containers = []
+    for summary in summaries:
+        labels = summary.get('Labels') or {}
+        if any(labels.get(key) != value for key, value in wanted.items()):
+            continue
+        # `docker-compose run` containers are not part of the service's
+        # replicas; compose ps and the scale checks leave them out too.
+        if labels.get(ONEOFF_LABEL) == "True":
+            continue
+        number = labels.get(NUMBER_LABEL, "")
+        containers.append({
+            "id": summary['Id'],
+            "name": (summary.get('Names') or ['/' + summary['Id'][:12]])[0].lstrip('/'),
+            "service": labels.get(SERVICE_LABEL, "-"),
+            "number": int(number) if number.isdigit() else 0,
+            "summary": summary,
+        })
+    if service and not containers:
+        return [], f"Error: Service '{service}' tidak memiliki kontainer di proyek compose '{project}'."
+    return sorted(containers, key=lambda container: (container["service"], container["number"], container["name"])), ""
+
+def _format_ports(summary: dict) -> str:
+    ports = sorted({f"{port['PublicPort']}->{port['PrivatePort']}/{port.get('Type', 'tcp')}"
+                    for port in summary.get('Ports') or [] if port.get('PublicPort')})
+    return ", ".join(ports) or "-"
+
+def _pump_lines(pipe, lines: queue.Queue):
+    try:
+        for line in pipe:
+            lines.put(line)
+    finally:
+        pipe.close()
+        lines.put(None)
+
+def _terminate(process: subprocess.Popen):
+    process.terminate()
+    try:
+        process.wait(timeout=5)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+# docker-compose output is read line by line as it is produced: each line
+# goes to the job log (polled by the UI) and at most COMPOSE_OUTPUT_MAX_BYTES
+# are kept; the rest is drained and dropped so the process never blocks on
+# a full pipe, and only the last lines are kept for the error message. The
+# process is terminated on timeout or when the job is cancelled; output is
+# then drained for at most COMPOSE_DRAIN_SECONDS, since children that
+# outlive it can keep the pipe open. Outside a job the command holds a
+# request thread, so it gets the shorter COMPOSE_SYNC_TIMEOUT.
 def _run_compose_command(command: list) -> tuple[str, str]:
-    compose_file_path = os.path.join(current_app.root_path, '..', 'docker-compose.yml') #
-    if not os.path.exists(compose_file_path): #
+    compose_path = compose_file_path() #
+    if not os.path.exists(compose_path): #
         return "", "Error: docker-compose.yml tidak ditemukan di root proyek." #
     
-    cmd_list = ['docker-compose', '-f', compose_file_path] + command #
-    
+    cmd_list = ['docker-compose', '-f', compose_path] + command #
+    max_bytes = current_app.config['COMPOSE_OUTPUT_MAX_BYTES']
+    cancelled = cancel_event()
+    timeout = current_app.config['COMPOSE_COMMAND_TIMEOUT' if cancelled is not None else 'COMPOSE_SYNC_TIMEOUT']
+
     try:
-        result = subprocess.run(cmd_list, capture_output=True, text=True, check=True, timeout=120) #
-        output = result.stdout.strip() if result.stdout else "(no standard output)" #
-        error_output = result.stderr.strip() if result.stderr else "(no standard error)" #
-        return f"Output:\n{output}\n\nLogs/Errors:\n{error_output}", "" #
-    except subprocess.CalledProcessError as e: #
-        return "", f"Error saat menjalankan docker-compose:\n{e.stderr}" #
+        process = subprocess.Popen(cmd_list, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                   text=True, errors='replace', bufsize=1)
     except Exception as e: #
         return "", f"Error tak terduga: {str(e)}" #
+    lines = queue.Queue()
+    threading.Thread(target=_pump_lines, args=(process.stdout, lines), name="compose-output", daemon=True).start()
+
+    captured, captured_bytes, dropped_bytes = [], 0, 0
+    tail = deque(maxlen=COMPOSE_ERROR_TAIL_LINES)
+    deadline = time.monotonic() + timeout
+    stopped = None
+    while True:
+        if stopped is None:
+            if cancelled is not None and cancelled.is_set():
+                stopped = "cancelled"
+            elif time.monotonic() > deadline:
+                stopped = "timeout"
+            if stopped:
+                _terminate(process)
+                deadline = time.monotonic() + COMPOSE_DRAIN_SECONDS
+        elif time.monotonic() > deadline:
+            current_app.logger.warning(f"Output docker-compose {' '.join(command)} tidak selesai {COMPOSE_DRAIN_SECONDS} detik setelah dihentikan, sisa output diabaikan.")
+            break
+        try:
+            line = lines.get(timeout=0.5)
+        except queue.Empty:
+            continue
+        if line is None:
+            break
+        line = _ANSI_ESCAPE.sub("", line.rstrip("\r\n"))
+        tail.append(line)
+        size = len(line.encode('utf-8')) + 1
+        if dropped_bytes or captured_bytes + size > max_bytes:
+            if not dropped_bytes:
+                report_log(f"... output melebihi {max_bytes} byte, sisa output tidak ditampilkan ...")
+            dropped_bytes += size
+            continue
+        captured.append(line)
+        captured_bytes += size
+        report_log(line)
+    returncode = process.wait()
+
+    output = "\n".join(captured).strip() or "(no output)"
+    if dropped_bytes:
+        output += f"\n\n({dropped_bytes} byte output dipotong)"
+    if stopped == "cancelled":
+        current_app.logger.info(f"docker-compose {' '.join(command)} dibatalkan oleh pengguna.")
+        return "", "Error: docker-compose dibatalkan oleh pengguna."
+    if stopped == "timeout":
+        return "", f"Error: docker-compose melebihi batas waktu {timeout:g} detik."
+    if returncode != 0:
+        return "", f"Error saat menjalankan docker-compose (exit {returncode}):\n" + "\n".join(tail) #
+    return f"Output:\n{output}", "" #
+
+def _up_targets(model: dict, service: str = None) -> list:
+    if service:
+        pending = [service]
+    else:
+        pending = [name for name, definition in model["services"].items() if not definition["profiles"]]
+    targets = set()
+    while pending:
+        name = pending.pop()
+        if name in targets or name not in model["services"]:
+            continue
+        targets.add(name)
+        pending.extend(model["services"][name]["depends_on"])
+    return sorted(targets)
+
+# compose up is a no-op when every target service already has its expected
+# number of running containers labelled with the desired config hash and
+# created from the image the service's tag points to now. The config hash
+# does not cover the image, so both are checked; services with build: are
+# never short-circuited because their image is rebuilt out of band.
+def _converged_receipt(service: str = None) -> dict:
+    model, error = compose_project.get()
+    if error:
+        return None
+    targets = _up_targets(model, service)
+    if not targets or any(model["services"][name]["build"] or not model["services"][name]["image"] for name in targets):
+        return None
+    hashes = compose_project.config_hashes(model)
+    if any(name not in hashes for name in targets):
+        return None
+    client = get_docker_client()
+    if not client:
+        return None
+    try:
+        image_ids = {name: client.api.inspect_image(model["services"][name]["image"])['Id'] for name in targets}
+        containers, error = _project_containers(client)
+    except docker.errors.ImageNotFound:
+        return None
+    except Exception as e:
+        current_app.logger.warning(f"Cek no-op compose up gagal, lanjut ke docker-compose: {e}")
+        return None
+    if error:
+        return None
+
+    by_service = {}
+    for container in containers:
+        by_service.setdefault(container["service"], []).append(container)
+    for name in targets:
+        service_containers = by_service.get(name, [])
+        if len(service_containers) != model["services"][name]["replicas"]:
+            return None
+        for container in service_containers:
+            labels = container["summary"].get('Labels') or {}
+            if container["summary"].get('State') != "running" or labels.get(CONFIG_HASH_LABEL) != hashes[name]:
+                return None
+            if container["summary"].get('ImageID') != image_ids[name] or labels.get(IMAGE_LABEL, image_ids[name]) != image_ids[name]:
+                return None
+
+    return {
+        "action": "Compose Up",
+        "status": "Sudah Sesuai, Tidak Ada Perubahan",
+        "resource_type": "Proyek Compose",
+        "resource_name": _project_name(model),
+        "details": [
+            {"key": "Service", "value": ", ".join(targets)},
+            {"key": "Kontainer", "value": str(sum(len(by_service[name]) for name in targets))},
+        ]
+    }
 
 def compose_up(params: dict) -> tuple[str, str]: #
     service = params.get('service') #
+    error = _validate_service(service)
+    if error:
+        return "", error
+    converged = _converged_receipt(service)
+    if converged:
+        return converged, ""
     command = ['up', '-d'] #
     if service: #
-        if not re.match(r"^[a-zA-Z0-9_.-]+$", service): #
-            return "", "Error: Nama service tidak valid." #
         command.append(service) #
     return _run_compose_command(command) #
 
 def compose_down(params: dict) -> tuple[str, str]: #
     return _run_compose_command(['down']) #
 
-def compose_ps(params: dict) -> tuple[str, str]:
-    return _run_compose_command(['ps'])
+def compose_ps(params: dict) -> tuple[list, str]:
+    client = get_docker_client()
+    if not client: return [], "Error: Tidak dapat terhubung ke Docker daemon."
+    try:
+        containers, error = _project_containers(client, params.get('service'))
+    except docker.errors.APIError as e:
+        return [], f"Error Docker API: {e.explanation or str(e)}"
+    except Exception as e: return [], f"Error tak terduga: {str(e)}"
+    if error:
+        return [], error
+    return [{
+        "service": container["service"],
+        "container_name": container["name"],
+        "image": container["summary"].get('Image', '-'),
+        "state": container["summary"].get('State', '-'),
+        "status": container["summary"].get('Status', '-'),
+        "ports": _format_ports(container["summary"]),
+    } for container in containers], ""
 
-def compose_logs(params: dict) -> tuple[str, str]:
-    service = params.get('service')
-    lines = params.get('lines', '50')
-    command = ['logs', '--tail', lines]
-    if service:
-        if not re.match(r"^[a-zA-Z0-9_.-]+$", service):
-            return "", "Error: Nama service tidak valid."
-        command.append(service)
-    return _run_compose_command(command)
+def _tail_container_logs(client, container: dict, lines: int) -> list:
+    raw = client.api.logs(container["id"], tail=lines, timestamps=True).decode('utf-8', errors='replace').strip()
+    if not raw:
+        return []
+    return [{"container_name": container["name"], **parse_log_line(line)} for line in raw.split('\n')]
 
-def compose_restart(params: dict) -> tuple[str, str]:
-    service = params.get('service')
-    command = ['restart']
-    if service:
-        if not re.match(r"^[a-zA-Z0-9_.-]+$", service):
-            return "", "Error: Nama service tidak valid."
-        command.append(service)
-    return _run_compose_command(command)
+def compose_logs(params: dict) -> tuple[list, str]:
+    client = get_docker_client()
+    if not client: return [], "Error: Tidak dapat terhubung ke Docker daemon."
+    try:
+        lines = int(params.get('lines') or 50)
+    except ValueError:
+        return [], "Error: Jumlah baris harus berupa angka positif."
+    lines = min(lines if lines > 0 else 50, MAX_COMPOSE_LOG_LINES)
+
+    try:
+        containers, error = _project_containers(client, params.get('service'))
+        if error:
+            return [], error
+        if not containers:
+            return [], ""
+        with ThreadPoolExecutor(max_workers=min(current_app.config['COMPOSE_MAX_WORKERS'], len(containers))) as executor:
+            per_container = list(executor.map(lambda container: _tail_container_logs(client, container, lines), containers))
+    except docker.errors.APIError as e:
+        return [], f"Error Docker API: {e.explanation or str(e)}"
+    except Exception as e: return [], f"Error tak terduga: {str(e)}"
+
+    rows = [row for container_rows in per_container for row in container_rows]
+    rows.sort(key=lambda row: row["timestamp"])
+    return rows, ""
+
+def compose_restart(params: dict) -> tuple[list, str]:
+    client = get_docker_client()
+    if not client: return [], "Error: Tidak dapat terhubung ke Docker daemon."
+    try:
+        containers, error = _project_containers(client, params.get('service'))
+        if error:
+            return [], error
+        if not containers:
+            return [], f"Tidak ada kontainer di proyek compose '{_project_name()}'."
+        for container in containers:
+            container["is_self"] = is_self_container(container["id"], container["name"])
+            container["state"] = container["summary"].get('State')
+        with ThreadPoolExecutor(max_workers=min(current_app.config['COMPOSE_MAX_WORKERS'], len(containers))) as executor:
+            rows = list(executor.map(lambda container: run_bulk_operation(client, "restart", container), containers))
+    except docker.errors.APIError as e:
+        return [], f"Error Docker API: {e.explanation or str(e)}"
+    except Exception as e: return [], f"Error tak terduga: {str(e)}"
+    return rows, ""
 
 def compose_build(params: dict) -> tuple[str, str]:
     service = params.get('service')
+    error = _validate_service(service)
+    if error:
+        return "", error
     command = ['build']
     if service:
-        if not re.match(r"^[a-zA-Z0-9_.-]+$", service):
-            return "", "Error: Nama service tidak valid."
         command.append(service)
-    return _run_compose_command(command)
\ No newline at end of file
+    return _run_compose_command(command)
@@ -0,0 +1,140 @@
+import os
+import re
+import subprocess
+import threading
+import yaml
+from flask import current_app
+
+COMPOSE_FILE_NAME = "docker-compose.yml"
+_HASH_LINE = re.compile(r"^(?P<service>\S+)\s+(?P<hash>[0-9a-f]{64})$")
+
+def compose_file_path() -> str:
+    return os.path.abspath(os.path.join(current_app.root_path, '..', COMPOSE_FILE_NAME))
+
+def _file_signature(path: str, referenced: tuple = ()) -> tuple:
+    signature = []
+    for candidate in (path, os.path.join(os.path.dirname(path), '.env'), *referenced):
+        try:
+            stat = os.stat(candidate)
+            signature.append((stat.st_mtime_ns, stat.st_size))
+        except FileNotFoundError:
+            signature.append(None)
+    return tuple(signature)
+
+def _dependencies(definition: dict) -> list:
+    depends_on = definition.get('depends_on') or []
+    return list(depends_on.keys()) if isinstance(depends_on, dict) else list(depends_on)
+
+def _referenced_files(base_dir: str, definition: dict) -> list:
+    env_files = definition.get('env_file') or []
+    if isinstance(env_files, (str, dict)):
+        env_files = [env_files]
+    paths = [entry.get('path') if isinstance(entry, dict) else entry for entry in env_files]
+    extends = definition.get('extends')
+    if isinstance(extends, dict) and extends.get('file'):
+        paths.append(extends['file'])
+    return [os.path.normpath(os.path.join(base_dir, path)) for path in paths if isinstance(path, str) and path]
+
+# docker-compose.yml is parsed once into services, images and dependencies
+# and reused until the file, its .env or any env_file/extends file it
+# references changes. Config hashes come from
+# `docker-compose config --hash` so they match the labels compose writes on
+# containers; they are loaded lazily because only compose up needs them.
+class ComposeProjectCache:
+    def __init__(self, hash_timeout: float = 30):
+        self.hash_timeout = hash_timeout
+        self._lock = threading.Lock()
+        self._hash_lock = threading.Lock()
+        self._model = None
+        self._last_error = None
+        self._counters = {"loads": 0, "hits": 0, "load_failures": 0, "hash_loads": 0, "hash_failures": 0}
+
+    def get(self) -> tuple[dict, str]:
+        path = compose_file_path()
+        if not os.path.exists(path):
+            return None, "Error: docker-compose.yml tidak ditemukan di root proyek."
+        with self._lock:
+            model = self._model
+            if model is not None and model["path"] == path and model["signature"] == _file_signature(path, model["referenced"]):
+                self._counters["hits"] += 1
+                return model, ""
+            try:
+                model = self._load(path)
+            except (OSError, yaml.YAMLError, ValueError) as e:
+                self._counters["load_failures"] += 1
+                self._last_error = str(e)
+                return None, f"Error: docker-compose.yml tidak dapat dibaca: {e}"
+            self._model = model
+            self._last_error = None
+            self._counters["loads"] += 1
+        current_app.logger.info(f"Model proyek compose dimuat: {len(model['services'])} service dari {path}.")
+        return model, ""
+
+    def config_hashes(self, model: dict) -> dict:
+        if model["config_hashes"] is not None:
+            return model["config_hashes"]
+        with self._hash_lock:
+            if model["config_hashes"] is None:
+                model["config_hashes"] = self._load_hashes(model["path"])
+            return model["config_hashes"] or {}
+
+    def stats(self) -> dict:
+        with self._lock:
+            model = self._model
+            return {
+                **self._counters,
+                "services": len(model["services"]) if model else 0,
+                "hashes_loaded": bool(model and model["config_hashes"]),
+                "last_error": self._last_error,
+            }
+
+    @staticmethod
+    def _load(path: str) -> dict:
+        with open(path, encoding='utf-8') as f:
+            document = yaml.safe_load(f) or {}
+        if not isinstance(document, dict) or not isinstance(document.get('services'), dict):
+            raise ValueError("bagian 'services' tidak ditemukan")
+
+        services = {}
+        referenced = []
+        for name, definition in document['services'].items():
+            definition = definition or {}
+            deploy = definition.get('deploy') or {}
+            referenced.extend(_referenced_files(os.path.dirname(path), definition))
+            services[str(name)] = {
+                "image": definition.get('image'),
+                "build": bool(definition.get('build')),
+                "replicas": int(definition.get('scale') or deploy.get('replicas') or 1),
+                "profiles": list(definition.get('profiles') or []),
+                "depends_on": _dependencies(definition),
+                "container_name": definition.get('container_name'),
+            }
+        referenced = tuple(sorted(set(referenced)))
+        return {
+            "path": path,
+            "referenced": referenced,
+            "signature": _file_signature(path, referenced),
+            "name": document.get('name'),
+            "services": services,
+            "config_hashes": None,
+        }
+
+    def _load_hashes(self, path: str):
+        try:
+            result = subprocess.run(['docker-compose', '-f', path, 'config', '--hash=*'],
+                                    capture_output=True, text=True, check=True, timeout=self.hash_timeout)
+        except (OSError, subprocess.SubprocessError) as e:
+            with self._lock:
+                self._counters["hash_failures"] += 1
+            current_app.logger.warning(f"Config hash compose tidak dapat dihitung, cek no-op dilewati: {e}")
+            return None
+        hashes = {}
+        for line in result.stdout.splitlines():
+            match = _HASH_LINE.match(line.strip())
+            if match:
+                hashes[match.group("service")] = match.group("hash")
+        with self._lock:
+            self._counters["hash_loads"] += 1
+        return hashes
+
+compose_project = ComposeProjectCache()
@@ -1,37 +1,109 @@
 import docker
+import fnmatch
+import os
 import re
+import socket
+import threading
+import time
 from flask import current_app
-from .docker_client import get_docker_client
+from .docker_client import get_docker_client, is_default_host, use_host
+from .inventory_cache import inventory
+from .stats_sampler import compute_usage, stats_sampler
+from .metrics_store import metrics_store, RETENTION_SECONDS
 import json
-
-def is_self_target(target_name: str) -> bool: #
-    CHATOP_CONTAINER_NAME = current_app.config.get('CHATOP_CONTAINER_NAME') #
-    if not CHATOP_CONTAINER_NAME or not target_name: #
-        return False #
-    
-    client = get_docker_client() #
-    if not client: #
-        return False #
-
-    try:
-        target_container = client.containers.get(target_name) #
-        target_id = target_container.id #
-        target_actual_name = target_container.name #
-        if target_name == CHATOP_CONTAINER_NAME: #
-            return True #
-        
-        if target_actual_name == CHATOP_CONTAINER_NAME: #
-             return True #
-    
-        if target_id == CHATOP_CONTAINER_NAME or target_container.short_id == CHATOP_CONTAINER_NAME: #
-            return True #
-
-    except docker.errors.NotFound: #
-        return False #
-    except Exception as e: #
-        current_app.logger.error(f"Error saat memeriksa identitas diri kontainer: {e}") #
-        return False #
-    return False #
+import queue
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+_CONTAINER_ID_PATTERN = re.compile(r"[0-9a-f]{64}")
+LISTED_STATES = ("running", "paused", "restarting")
+_CGROUP_SOURCES = ("/proc/self/cgroup", "/proc/self/mountinfo")
+_DOCKERENV_PATH = "/.dockerenv"
+_self_id_lock = threading.Lock()
+_self_id_resolved = False
+_self_container_id = None
+
+def _container_id_from_cgroup() -> str:
+    for source in _CGROUP_SOURCES:
+        try:
+            with open(source, encoding="utf-8") as f:
+                content = f.read()
+        except OSError:
+            continue
+        for line in content.splitlines():
+            if "docker" not in line and "containers" not in line:
+                continue
+            found = _CONTAINER_ID_PATTERN.search(line)
+            if found:
+                return found.group(0)
+    return None
+
+# Docker sets the hostname to the short container ID, but outside a
+# container the host's own name can collide with an unrelated container, so
+# the hostname is only tried when there is evidence we run in one.
+def _resolve_self_container_id(client) -> str:
+    cgroup_id = _container_id_from_cgroup()
+    in_container = bool(cgroup_id) or os.path.exists(_DOCKERENV_PATH)
+    candidates = [current_app.config.get('CHATOP_CONTAINER_NAME'), cgroup_id, socket.gethostname() if in_container else None]
+    for candidate in candidates:
+        if not candidate:
+            continue
+        try:
+            return client.api.inspect_container(candidate)['Id']
+        except docker.errors.NotFound:
+            continue
+    return None
+
+def get_self_container_id() -> str:
+    global _self_id_resolved, _self_container_id
+    if _self_id_resolved:
+        return _self_container_id
+
+    with use_host(None):
+        client = get_docker_client()
+    if not client:
+        return None
+    with _self_id_lock:
+        if not _self_id_resolved:
+            try:
+                _self_container_id = _resolve_self_container_id(client)
+            except Exception as e:
+                current_app.logger.error(f"Error saat menentukan ID kontainer ChatOps: {e}")
+                return None
+            _self_id_resolved = True
+            if _self_container_id:
+                current_app.logger.info(f"Kontainer ChatOps teridentifikasi sebagai {_self_container_id[:12]}.")
+            else:
+                current_app.logger.info("ChatOps tidak berjalan di dalam kontainer yang dikenali.")
+    return _self_container_id
+
+def is_self_container(container_id: str, container_name: str = None) -> bool:
+    if not is_default_host():
+        return False
+    self_id = get_self_container_id()
+    if self_id:
+        return container_id == self_id
+    CHATOP_CONTAINER_NAME = current_app.config.get('CHATOP_CONTAINER_NAME')
+    return bool(CHATOP_CONTAINER_NAME) and container_name == CHATOP_CONTAINER_NAME
+
+def _image_tags_by_id(client) -> dict:
+    images = inventory.list("images")
+    if images is None:
+        images = client.api.images()
+    tags_by_id = {}
+    for image in images:
+        tags = [tag for tag in (image.get('RepoTags') or []) if tag != '<none>:<none>']
+        tags_by_id[image['Id']] = tags
+    return tags_by_id
+
+def _format_port_summary(ports: list) -> str:
+    ports_str_list = []
+    for port in ports or []:
+        if 'PublicPort' not in port:
+            continue
+        host_ip = port.get('IP', '0.0.0.0')
+        if host_ip == '::': host_ip = '[::]'
+        ports_str_list.append(f"{host_ip}:{port['PublicPort']}->{port['PrivatePort']}/{port.get('Type', 'tcp')}")
+    return ', '.join(ports_str_list)
 
 def list_containers(params: dict) -> tuple[list, str]: #
     client = get_docker_client() #
@@ -39,33 +111,37 @@ def list_containers(params: dict) -> tuple[list, str]: #
         return None, "Error: Tidak dapat terhubung ke Docker daemon." #
     try:
         all_containers = params.get("all", False) #
-        containers = client.containers.list(all=all_containers) #
-        
-        container_list = [] #
-        CHATOP_CONTAINER_NAME = current_app.config.get('CHATOP_CONTAINER_NAME') #
+        summaries = inventory.list("containers")
+        if summaries is None:
+            summaries = client.api.containers(all=all_containers)
+        elif not all_containers:
+            summaries = [summary for summary in summaries if summary.get('State') in LISTED_STATES]
+        tags_by_id = _image_tags_by_id(client) if summaries else {}
 
-        for container in containers: #
-            is_self = CHATOP_CONTAINER_NAME and (container.name == CHATOP_CONTAINER_NAME or container.short_id == CHATOP_CONTAINER_NAME or container.id == CHATOP_CONTAINER_NAME) #
-            
-            image_tags = container.image.tags #
-            image_display = image_tags[0] if image_tags else container.attrs['Config']['Image'] #
-            
-            ports_str_list = [] #
-            if container.ports: #
-                for _internal_port, host_ports_list in container.ports.items(): #
-                    if host_ports_list: #
-                        for host_port_info in host_ports_list: #
-                            host_ip = host_port_info.get('HostIp', '0.0.0.0') #
-                            host_port = host_port_info.get('HostPort', '') #
-                            if host_ip == '::': host_ip = '[::]' #
-                            ports_str_list.append(f"{host_ip}:{host_port}->{_internal_port}") #
+        container_list = [] #
+        on_default_host = is_default_host()
+        self_id = get_self_container_id() if on_default_host else None
+        CHATOP_CONTAINER_NAME = current_app.config.get('CHATOP_CONTAINER_NAME') if on_default_host else None #
+
+        for summary in summaries: #
+            container_id = summary['Id']
+            short_id = container_id[:12]
+            names = summary.get('Names') or []
+            name = names[0].lstrip('/') if names else short_id
+            if self_id:
+                is_self = container_id == self_id
+            else:
+                is_self = bool(CHATOP_CONTAINER_NAME) and name == CHATOP_CONTAINER_NAME
+
+            image_tags = tags_by_id.get(summary.get('ImageID')) #
+            image_display = image_tags[0] if image_tags else summary.get('Image') #
 
             container_list.append({ #
-                "id": container.short_id, #
-                "name": container.name, #
+                "id": short_id, #
+                "name": name, #
                 "image": image_display, #
-                "status": container.status, #
-                "ports": ', '.join(ports_str_list), #
+                "status": summary.get('State'), #
+                "ports": _format_port_summary(summary.get('Ports')), #
                 "is_self": is_self #
             })
             
@@ -190,11 +266,10 @@ def stop_container(params: dict) -> tuple[dict, str]: #
     if not name: return None, "Error: Nama kontainer dibutuhkan." #
     if not re.match(r"^[a-zA-Z0-9_.-]+$", name): return None, "Error: Nama kontainer mengandung karakter tidak valid." #
     
-    if is_self_target(name): #
-        return None, f"Error: Tidak diizinkan menghentikan kontainer ChatOps sendiri." #
-    
     try:
         container = client.containers.get(name) #
+        if is_self_container(container.id, container.name): #
+            return None, f"Error: Tidak diizinkan menghentikan kontainer ChatOps sendiri." #
         container.stop(timeout=5) #
         output = { #
             "action": "Stop", #
@@ -216,11 +291,10 @@ def remove_container(params: dict) -> tuple[dict, str]: #
     if not name: return None, "Error: Nama kontainer dibutuhkan." #
     if not re.match(r"^[a-zA-Z0-9_.-]+$", name): return None, "Error: Nama kontainer mengandung karakter tidak valid." #
 
-    if is_self_target(name): #
-        return None, f"Error: Tidak diizinkan menghapus kontainer ChatOps sendiri." #
-
     try:
         container = client.containers.get(name) #
+        if is_self_container(container.id, container.name): #
+            return None, f"Error: Tidak diizinkan menghapus kontainer ChatOps sendiri." #
         if container.status == "running": #
             return None, f"Error: Kontainer '{name}' sedang berjalan. Hentikan terlebih dahulu." #
         container.remove() #
@@ -237,6 +311,277 @@ def remove_container(params: dict) -> tuple[dict, str]: #
         return None, f"Error Docker API: {e.explanation or str(e)}" #
     except Exception as e: return None, f"Error tak terduga: {str(e)}" #
 
+BULK_OPERATION_ALIASES = {
+    "hentikan": "stop", "matikan": "stop", "stop": "stop",
+    "hidupkan": "start", "nyalakan": "start", "start": "start", "mulai": "start",
+    "restart": "restart", "mulai ulang": "restart",
+    "pause": "pause", "jeda": "pause",
+    "unpause": "unpause", "lanjutkan": "unpause",
+    "hapus": "remove", "buang": "remove", "remove": "remove", "rm": "remove",
+}
+# operation -> (receipt verb, states the container must be in, message when it is not)
+BULK_OPERATIONS = {
+    "stop": ("Dihentikan", ("running", "restarting", "paused"), "tidak sedang berjalan"),
+    "start": ("Dihidupkan", ("created", "exited", "dead"), "sudah berjalan"),
+    "restart": ("Di-restart", None, None),
+    "pause": ("Dijeda", ("running",), "tidak sedang berjalan"),
+    "unpause": ("Dilanjutkan", ("paused",), "tidak sedang dijeda"),
+    "remove": ("Dihapus", ("created", "exited", "dead"), "masih berjalan, hentikan terlebih dahulu"),
+}
+
+def _select_containers(client, params: dict) -> tuple[list, str]:
+    names = [part for part in (params.get("names") or "").split(",") if part]
+    label = params.get("label")
+    status = params.get("status")
+    if not (names or label or status or params.get("all")):
+        return [], "Error: Pilih kontainer dengan nama, pola glob, label, atau status."
+    for name in names:
+        if not re.match(r"^[a-zA-Z0-9_.*?\[\]-]+$", name):
+            return [], f"Error: Pola nama '{name}' mengandung karakter tidak valid."
+
+    summaries = inventory.list("containers")
+    if summaries is None:
+        summaries = client.api.containers(all=True)
+    label_key, _, label_value = (label or "").partition("=")
+    # A plain (non-glob) name may also be an ID prefix, but only when it is
+    # long enough and matches exactly one container, so short hex-looking
+    # names never select unrelated containers.
+    id_matches = set()
+    for name in names:
+        if len(name) < 4 or any(char in name for char in "*?["):
+            continue
+        candidates = [summary['Id'] for summary in summaries if summary['Id'].startswith(name)]
+        if len(candidates) == 1:
+            id_matches.add(candidates[0])
+    selected = []
+    for summary in summaries:
+        container_name = (summary.get('Names') or ['/' + summary['Id'][:12]])[0].lstrip('/')
+        if names and summary['Id'] not in id_matches and not any(fnmatch.fnmatchcase(container_name, name) for name in names):
+            continue
+        labels = summary.get('Labels') or {}
+        if label and (label_key not in labels or (label_value and labels[label_key] != label_value)):
+            continue
+        if status and summary.get('State') != status:
+            continue
+        selected.append({"id": summary['Id'], "name": container_name, "state": summary.get('State')})
+    return sorted(selected, key=lambda container: container["name"]), ""
+
+def run_bulk_operation(client, operation: str, container: dict) -> dict:
+    verb, allowed_states, state_message = BULK_OPERATIONS[operation]
+    row = {"container_name": container["name"], "operation": operation, "result": "", "duration": "-"}
+    if container["is_self"]:
+        row["result"] = "Dilewati: kontainer ChatOps sendiri"
+        return row
+    if allowed_states and container["state"] not in allowed_states:
+        row["result"] = f"Dilewati: {state_message}"
+        return row
+
+    started = time.perf_counter()
+    try:
+        if operation == "stop":
+            client.api.stop(container["id"], timeout=5)
+        elif operation == "start":
+            client.api.start(container["id"])
+        elif operation == "restart":
+            client.api.restart(container["id"], timeout=5)
+        elif operation == "pause":
+            client.api.pause(container["id"])
+        elif operation == "unpause":
+            client.api.unpause(container["id"])
+        elif operation == "remove":
+            client.api.remove_container(container["id"])
+        row["result"] = f"Berhasil {verb}"
+    except docker.errors.NotFound:
+        row["result"] = "Gagal: kontainer tidak ditemukan"
+    except docker.errors.APIError as e:
+        row["result"] = f"Gagal: {e.explanation or str(e)}"
+    except Exception as e:
+        row["result"] = f"Gagal: {str(e)}"
+    row["duration"] = f"{(time.perf_counter() - started) * 1000:.0f} ms"
+    return row
+
+def bulk_container_action(params: dict) -> tuple[list, str]:
+    client = get_docker_client()
+    if not client: return [], "Error: Tidak dapat terhubung ke Docker daemon."
+    operation = BULK_OPERATION_ALIASES.get(re.sub(r"\s+", " ", (params.get("operation") or "").strip()))
+    if not operation: return [], "Error: Operasi harus salah satu dari stop, start, restart, pause, unpause, atau hapus."
+
+    try:
+        selected, error = _select_containers(client, params)
+        if error:
+            return [], error
+        if not selected:
+            return [], "Tidak ada kontainer yang cocok dengan pilihan tersebut."
+        max_containers = current_app.config['BULK_MAX_CONTAINERS']
+        if len(selected) > max_containers:
+            return [], f"Error: {len(selected)} kontainer cocok, melebihi batas {max_containers} kontainer per perintah. Persempit pilihan."
+
+        for container in selected:
+            container["is_self"] = is_self_container(container["id"], container["name"])
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=min(current_app.config['BULK_MAX_WORKERS'], len(selected))) as executor:
+            rows = list(executor.map(lambda container: run_bulk_operation(client, operation, container), selected))
+    except docker.errors.APIError as e:
+        return [], f"Error Docker API: {e.explanation or str(e)}"
+    except Exception as e: return [], f"Error tak terduga: {str(e)}"
+
+    succeeded = sum(1 for row in rows if row["result"].startswith("Berhasil"))
+    current_app.logger.info(f"Operasi massal '{operation}': {succeeded}/{len(rows)} berhasil dalam {time.perf_counter() - started:.2f} detik.")
+    return rows, ""
+
+def parse_log_line(line: str) -> dict:
+    if 'Z ' in line:
+        parts = line.split('Z ', 1)
+        return {"timestamp": parts[0] + 'Z', "log_entry": parts[1]}
+    return {"timestamp": "-", "log_entry": line}
+
+def _int_param(value, default: int, maximum: int) -> int:
+    try:
+        value = int(value) if value not in (None, "") else default
+    except (TypeError, ValueError):
+        value = default
+    return max(1, min(value, maximum))
+
+def open_log_stream(params: dict) -> tuple[object, str]:
+    client = get_docker_client()
+    if not client: return None, "Error: Tidak dapat terhubung ke Docker daemon."
+    name = params.get("name")
+    if not name: return None, "Error: Nama kontainer dibutuhkan."
+    if not re.match(r"^[a-zA-Z0-9_.-]+$", name): return None, "Error: Nama kontainer mengandung karakter tidak valid."
+
+    config = current_app.config
+    limits = {
+        "max_lines": _int_param(params.get("max_lines"), config['LOG_STREAM_MAX_LINES'], config['LOG_STREAM_MAX_LINES']),
+        "max_bytes": _int_param(params.get("max_bytes"), config['LOG_STREAM_MAX_BYTES'], config['LOG_STREAM_MAX_BYTES']),
+        "max_line_bytes": config['LOG_STREAM_MAX_LINE_BYTES'],
+        "max_seconds": config['LOG_STREAM_MAX_SECONDS'],
+        "keepalive_seconds": config['LOG_STREAM_KEEPALIVE_SECONDS'],
+        "queue_lines": config['LOG_STREAM_QUEUE_LINES'],
+    }
+    tail = _int_param(params.get("tail"), 100, limits["max_lines"])
+    follow = str(params.get("follow", "1")).lower() not in ("0", "false", "no")
+    try:
+        since = int(params["since"]) if params.get("since") else None
+    except ValueError:
+        return None, "Error: Parameter 'since' harus berupa unix timestamp."
+
+    try:
+        container_id = client.api.inspect_container(name)['Id']
+    except docker.errors.NotFound:
+        return None, f"Error: Kontainer '{name}' tidak ditemukan."
+    except docker.errors.APIError as e:
+        return None, f"Error Docker API: {e.explanation or str(e)}"
+    return _log_stream_records(client, container_id, tail, since, follow, limits), ""
+
+def _iter_log_lines(stream, max_line_bytes: int):
+    pending, discarding = b"", False
+    for chunk in stream:
+        pending += chunk
+        lines = pending.split(b"\n")
+        pending = lines.pop()
+        if discarding:
+            if lines:
+                lines.pop(0)
+                discarding = False
+            else:
+                pending = b""
+        if len(pending) > max_line_bytes:
+            lines.append(pending)
+            pending, discarding = b"", True
+        for raw in lines:
+            yield raw[:max_line_bytes]
+    if pending and not discarding:
+        yield pending[:max_line_bytes]
+
+def _pump_log_stream(stream, max_line_bytes: int, records: queue.Queue, stop: threading.Event):
+    def put(item):
+        while not stop.is_set():
+            try:
+                records.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    try:
+        for raw in _iter_log_lines(stream, max_line_bytes):
+            if not put(("line", raw)):
+                return
+        put(("eof", None))
+    except Exception as e:
+        if not stop.is_set():
+            put(("error", e))
+
+# docker-py disables the socket timeout on log streams, so reads block until
+# the container writes. A reader thread feeds a short queue (at most
+# LOG_STREAM_QUEUE_LINES lines of LOG_STREAM_MAX_LINE_BYTES each) and the SSE
+# generator waits on it with a timeout: that is where the deadline is
+# enforced and keepalives are sent, and a keepalive written to a closed
+# connection ends the generator, which closes the Docker stream.
+def _log_stream_records(client, container_id: str, tail: int, since: int, follow: bool, limits: dict):
+    lines_sent = bytes_sent = 0
+    deadline = time.monotonic() + limits["max_seconds"]
+
+    def end(reason):
+        return "end", {"reason": reason, "lines": lines_sent, "bytes": bytes_sent}
+
+    try:
+        stream = client.api.logs(container_id, stream=True, follow=follow, timestamps=True, tail=tail, since=since)
+    except Exception as e:
+        current_app.logger.warning(f"Stream log {container_id[:12]} gagal dibuka: {e}")
+        yield end("error")
+        return
+
+    records = queue.Queue(maxsize=limits["queue_lines"])
+    stop = threading.Event()
+    reader = threading.Thread(target=_pump_log_stream, args=(stream, limits["max_line_bytes"], records, stop),
+                              name=f"log-stream-{container_id[:12]}", daemon=True)
+    reader.start()
+    try:
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                yield end("max_seconds")
+                return
+            try:
+                kind, item = records.get(timeout=min(limits["keepalive_seconds"], remaining))
+            except queue.Empty:
+                yield "keepalive", None
+                continue
+            if kind == "eof":
+                yield end("eof")
+                return
+            if kind == "error":
+                current_app.logger.warning(f"Stream log {container_id[:12]} terputus: {item}")
+                yield end("error")
+                return
+
+            if bytes_sent + len(item) > limits["max_bytes"]:
+                yield end("max_bytes")
+                return
+            lines_sent += 1
+            bytes_sent += len(item)
+            yield "log", parse_log_line(item.decode('utf-8', errors='replace'))
+            if lines_sent >= limits["max_lines"]:
+                yield end("max_lines")
+                return
+    finally:
+        stop.set()
+        stream.close()
+
+def follow_logs(params: dict) -> tuple[dict, str]:
+    name = params.get("name")
+    if not name: return None, "Error: Nama kontainer dibutuhkan."
+    if not re.match(r"^[a-zA-Z0-9_.-]+$", name): return None, "Error: Nama kontainer mengandung karakter tidak valid."
+    tail = _int_param(params.get("lines"), 100, current_app.config['LOG_STREAM_MAX_LINES'])
+    return {
+        "name": name,
+        "tail": tail,
+        "url": f"/logs/{name}/stream?tail={tail}",
+        "max_lines": current_app.config['LOG_STREAM_MAX_LINES'],
+        "max_bytes": current_app.config['LOG_STREAM_MAX_BYTES'],
+    }, ""
+
 def view_logs(params: dict) -> tuple[list, str]: #
     client = get_docker_client() #
     if not client: return [], "Error: Tidak dapat terhubung ke Docker daemon." #
@@ -256,15 +601,7 @@ def view_logs(params: dict) -> tuple[list, str]: #
         if not logs_raw: #
             return [], "" #
 
-        log_list = [] #
-        for line in logs_raw.split('\n'): #
-            if 'Z ' in line: #
-                parts = line.split('Z ', 1) #
-                timestamp = parts[0] + 'Z' #
-                entry = parts[1] #
-                log_list.append({"timestamp": timestamp, "log_entry": entry}) #
-            else: #
-                log_list.append({"timestamp": "-", "log_entry": line}) #
+        log_list = [parse_log_line(line) for line in logs_raw.split('\n')] #
         return log_list, "" #
     except docker.errors.NotFound: #
         return [], f"Error: Kontainer '{name}' tidak ditemukan." #
@@ -272,6 +609,150 @@ def view_logs(params: dict) -> tuple[list, str]: #
         return [], f"Error Docker API: {e.explanation or str(e)}" #
     except Exception as e: return [], f"Error tak terduga: {str(e)}" #
 
+def _search_targets(client, names: str) -> tuple[list, str]:
+    summaries = inventory.list("containers")
+    if summaries is None:
+        summaries = client.api.containers(all=True)
+    by_name = {}
+    for summary in summaries:
+        for container_name in summary.get('Names') or []:
+            by_name[container_name.lstrip('/')] = summary
+
+    if not names or names in ("semua", "all", "*"):
+        ordered = sorted(summaries, key=lambda summary: summary.get('State') != 'running')
+        return [(summary['Id'], (summary.get('Names') or ['/' + summary['Id'][:12]])[0].lstrip('/')) for summary in ordered], ""
+
+    targets = []
+    for name in [part.strip() for part in names.split(",") if part.strip()]:
+        if not re.match(r"^[a-zA-Z0-9_.-]+$", name):
+            return [], f"Error: Nama kontainer '{name}' mengandung karakter tidak valid."
+        summary = by_name.get(name)
+        if summary is None:
+            matches = [candidate for candidate in summaries if len(name) >= 4 and candidate['Id'].startswith(name)]
+            if len(matches) != 1:
+                return [], f"Error: Kontainer '{name}' tidak ditemukan."
+            summary = matches[0]
+        targets.append((summary['Id'], name))
+    return targets, ""
+
+def _window_seconds(amount, unit, default: int):
+    if not amount:
+        return default
+    seconds = WINDOW_UNITS.get((unit or "menit").lower())
+    if not seconds or not str(amount).isdigit() or int(amount) <= 0:
+        return None
+    return int(amount) * seconds
+
+def _scan_container_logs(client, container_id: str, pattern, since: int, until: int, limits: dict, state: dict) -> list:
+    matches = []
+    scanned = 0
+    stream = client.api.logs(container_id, stream=True, follow=False, timestamps=True, since=since, until=until)
+    try:
+        for raw in _iter_log_lines(stream, limits["max_line_bytes"]):
+            scanned += len(raw) + 1
+            if state["stop"].is_set() or time.monotonic() > state["deadline"]:
+                state["truncated"] = True
+                break
+            if scanned > limits["max_scan_bytes"]:
+                state["truncated"] = True
+                break
+            record = parse_log_line(raw.decode('utf-8', errors='replace'))
+            if not pattern.search(record["log_entry"]):
+                continue
+            matches.append(record)
+            with state["lock"]:
+                state["matches"] += 1
+                if state["matches"] >= limits["max_results"]:
+                    state["stop"].set()
+            if len(matches) >= limits["per_container"]:
+                break
+    finally:
+        stream.close()
+        with state["lock"]:
+            state["scanned_bytes"] += scanned
+    return matches
+
+# Queries are plain substrings unless the user explicitly asks for a regex.
+# Regexes run on every scanned line, so they are length-limited and the
+# constructs behind catastrophic backtracking (nested quantifiers,
+# backreferences) are rejected.
+_NESTED_QUANTIFIER = re.compile(r"\((?:[^()\\]|\\.)*(?:[+*]|\{\d*,\d*\})(?:[^()\\]|\\.)*\)(?:[+*?]|\{\d*,?\d*\})")
+_BACKREFERENCE = re.compile(r"\\[1-9]|\(\?P=")
+
+def _compile_search_pattern(query: str, as_regex: bool) -> tuple[object, str]:
+    if not as_regex:
+        return re.compile(re.escape(query), re.IGNORECASE), ""
+    max_length = current_app.config['LOG_SEARCH_MAX_REGEX_LENGTH']
+    if len(query) > max_length:
+        return None, f"Error: Pola regex terlalu panjang (maks {max_length} karakter)."
+    if _NESTED_QUANTIFIER.search(query) or _BACKREFERENCE.search(query):
+        return None, "Error: Pola regex terlalu kompleks (quantifier bersarang atau backreference tidak diizinkan)."
+    try:
+        return re.compile(query, re.IGNORECASE), ""
+    except re.error as e:
+        return None, f"Error: Pola pencarian tidak valid: {e}"
+
+def search_logs(params: dict) -> tuple[list, str]:
+    client = get_docker_client()
+    if not client: return [], "Error: Tidak dapat terhubung ke Docker daemon."
+    query = params.get("query")
+    if not query: return [], "Error: Kata kunci pencarian dibutuhkan."
+    pattern, error = _compile_search_pattern(query, (params.get("mode") or "").lower() == "regex")
+    if error:
+        return [], error
+
+    config = current_app.config
+    window = _window_seconds(params.get("amount"), params.get("unit"), config['LOG_SEARCH_DEFAULT_WINDOW'])
+    until_offset = _window_seconds(params.get("until_amount"), params.get("until_unit"), 0)
+    if window is None or until_offset is None:
+        return [], "Error: Rentang waktu harus berupa angka dengan satuan menit, jam, atau hari."
+    if until_offset >= window:
+        return [], "Error: Batas akhir pencarian harus lebih baru dari batas awalnya."
+    now = int(time.time())
+    since, until = now - window, (now - until_offset if until_offset else None)
+
+    limits = {
+        "per_container": _int_param(params.get("limit"), config['LOG_SEARCH_PER_CONTAINER_LIMIT'], config['LOG_SEARCH_MAX_RESULTS']),
+        "max_results": config['LOG_SEARCH_MAX_RESULTS'],
+        "max_scan_bytes": config['LOG_SEARCH_MAX_SCAN_BYTES'],
+        "max_line_bytes": config['LOG_STREAM_MAX_LINE_BYTES'],
+    }
+    try:
+        targets, error = _search_targets(client, (params.get("names") or "").strip())
+        if error:
+            return [], error
+        if not targets:
+            return [], "Tidak ada kontainer untuk dicari."
+        skipped = max(0, len(targets) - config['LOG_SEARCH_MAX_CONTAINERS'])
+        targets = targets[:config['LOG_SEARCH_MAX_CONTAINERS']]
+
+        state = {"lock": threading.Lock(), "stop": threading.Event(), "matches": 0, "scanned_bytes": 0,
+                 "truncated": False, "deadline": time.monotonic() + config['LOG_SEARCH_TIMEOUT']}
+        rows, failures = [], []
+        with ThreadPoolExecutor(max_workers=min(config['LOG_SEARCH_MAX_WORKERS'], len(targets))) as executor:
+            futures = {executor.submit(_scan_container_logs, client, container_id, pattern, since, until, limits, state): name
+                       for container_id, name in targets}
+            for future in as_completed(futures):
+                name = futures[future]
+                try:
+                    rows.extend({"container_name": name, **record} for record in future.result())
+                except Exception as e:
+                    failures.append(name)
+                    current_app.logger.warning(f"Pencarian log {name} gagal: {e}")
+    except docker.errors.APIError as e:
+        return [], f"Error Docker API: {e.explanation or str(e)}"
+    except Exception as e: return [], f"Error tak terduga: {str(e)}"
+
+    current_app.logger.info(
+        f"Pencarian log '{query}': {len(targets)} kontainer, {state['scanned_bytes']} byte dipindai, "
+        f"{len(rows)} cocok, {skipped} kontainer dilewati, terpotong={state['truncated']}, gagal={failures}")
+    if not rows:
+        if failures:
+            return [], f"Error: Gagal membaca log dari kontainer: {', '.join(sorted(failures))}."
+        return [], f"Tidak ada log yang cocok dengan '{query}' di {len(targets)} kontainer."
+    rows.sort(key=lambda row: row["timestamp"])
+    return rows[-limits["max_results"]:], ""
+
 def view_stats(params: dict) -> tuple[list, str]: #
     client = get_docker_client() #
     if not client: #
@@ -283,24 +764,10 @@ def view_stats(params: dict) -> tuple[list, str]: #
         if container.status != "running": #
             return [], f"Error: Kontainer '{name}' tidak sedang berjalan." #
         stats = container.stats(stream=False) #
-        cpu_usage = stats['cpu_stats']['cpu_usage']['total_usage'] #
-        system_cpu_usage = stats['cpu_stats']['system_cpu_usage'] #
-        mem_usage = stats['memory_stats']['usage'] / (1024*1024) #
-        mem_limit = stats['memory_stats']['limit'] / (1024*1024) #
-        cpu_delta = cpu_usage - stats.get('precpu_stats', {}).get('cpu_usage', {}).get('total_usage', 0) #
-        system_delta = system_cpu_usage - stats.get('precpu_stats', {}).get('system_cpu_usage', 0) #
-        
-        cpu_percent = 0.0 #
-        if system_delta > 0.0 and cpu_delta > 0.0: #
-            number_cpus = stats.get('cpu_stats', {}).get('online_cpus') #
-            if number_cpus is None: #
-                per_cpu_usage_list = stats.get('cpu_stats', {}).get('cpu_usage', {}).get('percpu_usage') #
-                if per_cpu_usage_list: #
-                    number_cpus = len(per_cpu_usage_list) #
-                else: #
-                    number_cpus = 1 #
-            
-            cpu_percent = (cpu_delta / system_delta) * number_cpus * 100.0 #
+        usage = compute_usage(stats)
+        cpu_percent = usage["cpu_percent"] #
+        mem_usage = usage["mem_usage"] #
+        mem_limit = usage["mem_limit"] #
 
         stats_data = [{ #
             "container_name": container.name, #
@@ -314,6 +781,99 @@ def view_stats(params: dict) -> tuple[list, str]: #
         current_app.logger.error(f"Error saat mengambil statistik: {e}") #
         return [], f"Error tak terduga: {str(e)}" #
     
+STATS_SORT_KEYS = {
+    "cpu": lambda row: -row["sample"]["cpu_percent"],
+    "mem": lambda row: -row["sample"]["mem_usage"],
+    "memori": lambda row: -row["sample"]["mem_usage"],
+    "nama": lambda row: row["container_name"],
+    "name": lambda row: row["container_name"],
+}
+
+def view_all_stats(params: dict) -> tuple[list, str]:
+    client = get_docker_client()
+    if not client:
+        return [], "Error: Tidak dapat terhubung ke Docker daemon."
+    sort_by = (params.get("sort") or "cpu").lower()
+    if sort_by not in STATS_SORT_KEYS:
+        return [], f"Error: Urutan '{sort_by}' tidak dikenal. Gunakan cpu, memori, atau nama."
+
+    stats_sampler.ensure_started()
+    rows = stats_sampler.snapshot()
+    if not rows:
+        return [], "Sampler statistik baru dimulai atau tidak ada kontainer berjalan. Coba lagi dalam beberapa detik."
+
+    sampled = sorted((row for row in rows if row["sample"]), key=STATS_SORT_KEYS[sort_by])
+    pending = sorted((row for row in rows if not row["sample"]), key=lambda row: row["container_name"])
+
+    stats_data = []
+    for row in sampled:
+        sample = row["sample"]
+        stats_data.append({
+            "container_name": row["container_name"],
+            "cpu_usage": f"{sample['cpu_percent']:.2f}%",
+            "mem_usage": f"{sample['mem_usage']:.2f} MB / {sample['mem_limit']:.2f} MB"
+        })
+    for row in pending:
+        stats_data.append({"container_name": row["container_name"], "cpu_usage": "-", "mem_usage": "menunggu sampel"})
+    return stats_data, ""
+
+METRIC_ALIASES = {
+    "cpu": "cpu", "mem": "mem", "memori": "mem", "memory": "mem", "ram": "mem",
+    "net": "net", "network": "net", "jaringan": "net", "disk": "disk", "io": "disk",
+}
+METRIC_SERIES = {
+    "cpu": [("CPU", "cpu_percent", lambda v: f"{v:.2f}%")],
+    "mem": [("Memori", "mem_usage", lambda v: f"{v:.2f} MB")],
+    "net": [("Net RX", "net_rx", lambda v: f"{v / 1024:.2f} KB/s"), ("Net TX", "net_tx", lambda v: f"{v / 1024:.2f} KB/s")],
+    "disk": [("Disk Read", "blk_read", lambda v: f"{v / 1024:.2f} KB/s"), ("Disk Write", "blk_write", lambda v: f"{v / 1024:.2f} KB/s")],
+}
+WINDOW_UNITS = {"m": 60, "menit": 60, "h": 3600, "jam": 3600, "d": 86400, "hari": 86400}
+WINDOW_UNIT_LABELS = {60: "menit", 3600: "jam", 86400: "hari"}
+
+def _window_label(seconds: int) -> str:
+    unit = max(unit for unit in WINDOW_UNIT_LABELS if seconds % unit == 0) if seconds % 60 == 0 else None
+    return f"{seconds // unit} {WINDOW_UNIT_LABELS[unit]}" if unit else f"{seconds} detik"
+
+def view_metrics_history(params: dict) -> tuple[list, str]:
+    name = params.get("name")
+    metric = METRIC_ALIASES.get((params.get("metric") or "").lower())
+    if not name: return [], "Error: Nama kontainer dibutuhkan."
+    if not metric: return [], "Error: Metrik harus salah satu dari cpu, memori, jaringan, atau disk."
+
+    try:
+        amount = int(params.get("amount") or 1)
+    except ValueError:
+        return [], "Error: Rentang waktu harus berupa angka."
+    unit = WINDOW_UNITS.get((params.get("unit") or "jam").lower())
+    if not unit or amount <= 0:
+        return [], "Error: Satuan waktu harus menit, jam, atau hari."
+    window_seconds = min(amount * unit, RETENTION_SECONDS)
+    window_label = _window_label(window_seconds)
+    clamp_note = f" (dibatasi retensi, diminta {amount} {WINDOW_UNIT_LABELS[unit]})" if window_seconds < amount * unit else ""
+
+    stats_sampler.ensure_started()
+    container_id = metrics_store.resolve(name)
+    if not container_id:
+        return [], f"Belum ada data metrik untuk '{name}'. Data dikumpulkan di latar belakang dari kontainer yang berjalan."
+
+    rows = []
+    for label, series, fmt in METRIC_SERIES[metric]:
+        summary = metrics_store.query(container_id, series, window_seconds)
+        if not summary:
+            continue
+        rows.append({
+            "metric": label,
+            "window": window_label + clamp_note,
+            "min": fmt(summary["min"]),
+            "avg": fmt(summary["avg"]),
+            "p95": fmt(summary["p95"]),
+            "max": fmt(summary["max"]),
+            "samples": str(summary["samples"]),
+        })
+    if not rows:
+        return [], f"Belum ada data metrik untuk '{name}' dalam {window_label} terakhir."
+    return rows, ""
+
 def inspect_container(params: dict) -> tuple[str, str]:
     client = get_docker_client()
     if not client:
@@ -336,11 +896,10 @@ def restart_container(params: dict) -> tuple[dict, str]:
     name = params.get("name")
     if not name: return None, "Error: Nama kontainer dibutuhkan."
 
-    if is_self_target(name):
-        return None, f"Error: Tidak diizinkan me-restart kontainer ChatOps sendiri."
-
     try:
         container = client.containers.get(name)
+        if is_self_container(container.id, container.name):
+            return None, f"Error: Tidak diizinkan me-restart kontainer ChatOps sendiri."
         container.restart(timeout=5)
         output = {
             "action": "Restart",
@@ -361,11 +920,10 @@ def pause_container(params: dict) -> tuple[dict, str]:
     name = params.get("name")
     if not name: return None, "Error: Nama kontainer dibutuhkan."
 
-    if is_self_target(name):
-        return None, f"Error: Tidak diizinkan menghentikan sementara kontainer ChatOps sendiri."
-
     try:
         container = client.containers.get(name)
+        if is_self_container(container.id, container.name):
+            return None, f"Error: Tidak diizinkan menghentikan sementara kontainer ChatOps sendiri."
         if container.status != "running":
             return None, f"Error: Kontainer '{name}' tidak sedang berjalan."
         if container.status == "paused":
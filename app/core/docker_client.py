@@ -1,16 +1,312 @@
+import contextlib
+import contextvars
 import docker
+import socket
+import threading
+import time
+import urllib3
+from concurrent.futures import ThreadPoolExecutor, wait
+from docker.transport import UnixHTTPAdapter
 from flask import current_app
 
-docker_client = None
+# docker-py keys unix-socket connection pools by the full request URL, so
+# every distinct endpoint (each /containers/<id>/json, each query string)
+# gets its own pool and keep-alive connections are rarely reused. Keying
+# by the socket instead gives one bounded pool per client.
+class _SocketPoolAdapter(UnixHTTPAdapter):
+    def get_connection(self, url, proxies=None):
+        return super().get_connection("http+docker://localhost", proxies)
 
-def get_docker_client():
-    global docker_client
-    if docker_client is None:
+def create_docker_client(base_url: str = None, **kwargs):
+    kwargs.setdefault('timeout', 5)
+    base_url = base_url or _default_base_url()
+    client = docker.DockerClient(base_url=base_url, **kwargs) if base_url else docker.from_env(**kwargs)
+    adapter = client.api.adapters.get('http+docker://')
+    if isinstance(adapter, UnixHTTPAdapter) and not isinstance(adapter, _SocketPoolAdapter):
+        shared = _SocketPoolAdapter(f"http+unix://{adapter.socket_path}", timeout=adapter.timeout,
+                                    max_pool_size=adapter.max_pool_size)
+        client.api.mount('http+docker://', shared)
+        adapter.close()
+    return client
+
+def is_read_timeout(error: Exception) -> bool:
+    while error is not None:
+        if isinstance(error, (socket.timeout, urllib3.exceptions.ReadTimeoutError)):
+            return True
+        error = error.__cause__ or error.__context__ or (error.args[0] if error.args and isinstance(error.args[0], Exception) else None)
+    return False
+
+def _connection_pools(client) -> list:
+    pools = []
+    for adapter in client.api.adapters.values():
+        container = getattr(adapter, 'pools', None)
+        if container is None and getattr(adapter, 'poolmanager', None) is not None:
+            container = adapter.poolmanager.pools
+        if container is None:
+            continue
+        for key in container.keys():
+            pool = container.get(key) if hasattr(container, 'get') else container[key]
+            if pool is not None:
+                pools.append(pool)
+    return pools
+
+# Two shared clients over keep-alive connection pools: a short timeout for
+# list/inspect calls and a long one for pulls, builds and prunes. A failed
+# connect or health check puts the pool into exponential backoff instead of
+# failing forever; the first caller after the backoff reconnects. Health
+# checks run on a background thread so no request waits on the ping; a
+# reconnect is claimed by one caller and runs outside the lock, while the
+# others get None at once. Clients replaced by a reconnect are closed by the
+# health-check thread once the long timeout has passed, when no call that
+# picked them up can still be using them.
+class DockerClientPool:
+    def __init__(self, base_url: str = None, pool_size: int = 16, timeout: float = 5, long_timeout: float = 600,
+                 health_interval: float = 30, max_backoff: float = 60):
+        self.base_url = base_url
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.long_timeout = long_timeout
+        self.health_interval = health_interval
+        self.max_backoff = max_backoff
+        self._lock = threading.Lock()
+        self._configured = False
+        self._clients = {}
+        self._retired = []
+        self._checking = False
+        self._connecting = False
+        self._healthy = False
+        self._next_check = 0.0
+        self._next_retry = 0.0
+        self._failures = 0
+        self._last_error = None
+        self._counters = {"connects": 0, "reconnects": 0, "connect_failures": 0, "health_checks": 0, "health_failures": 0}
+
+    def get(self, long_running: bool = False):
+        now = time.monotonic()
+        if self._healthy and now < self._next_check:
+            return self._clients["long" if long_running else "short"]
+        with self._lock:
+            if not self._configured:
+                self._configure(current_app.config)
+            now = time.monotonic()
+            if self._healthy and now >= self._next_check and not self._checking:
+                self._checking = True
+                self._next_check = now + self.health_interval
+                threading.Thread(target=self._health_check, args=(current_app._get_current_object(), self._clients["short"]),
+                                 name="docker-health", daemon=True).start()
+            if self._healthy:
+                return self._clients["long" if long_running else "short"]
+            if self._connecting or now < self._next_retry:
+                return None
+            self._connecting = True
+        return self._connect(current_app._get_current_object(), long_running)
+
+    def stats(self) -> dict:
+        with self._lock:
+            clients = dict(self._clients)
+            stats = {
+                **self._counters,
+                "healthy": self._healthy,
+                "consecutive_failures": self._failures,
+                "retired_clients": len(self._retired),
+                "last_error": self._last_error,
+                "retry_in": round(max(0.0, self._next_retry - time.monotonic()), 1) if not self._healthy else 0.0,
+                "pool_size": self.pool_size,
+                "timeouts": {"short": self.timeout, "long": self.long_timeout},
+            }
+        stats["pools"] = {name: self._pool_usage(client) for name, client in clients.items()}
+        return stats
+
+    def _configure(self, config):
+        self.pool_size = config.get('DOCKER_POOL_SIZE', self.pool_size)
+        self.timeout = config.get('DOCKER_TIMEOUT', self.timeout)
+        self.long_timeout = config.get('DOCKER_LONG_TIMEOUT', self.long_timeout)
+        self.health_interval = config.get('DOCKER_HEALTH_INTERVAL', self.health_interval)
+        self.max_backoff = config.get('DOCKER_RECONNECT_MAX_BACKOFF', self.max_backoff)
+        self._configured = True
+
+    def _connect(self, app, long_running: bool):
+        try:
+            clients = {
+                "short": create_docker_client(self.base_url, timeout=self.timeout, max_pool_size=self.pool_size),
+                "long": create_docker_client(self.base_url, timeout=self.long_timeout, max_pool_size=max(2, self.pool_size // 4)),
+            }
+            clients["short"].ping()
+        except Exception as e:
+            with self._lock:
+                self._connecting = False
+                self._failures += 1
+                self._counters["connect_failures"] += 1
+                self._last_error = str(e)
+                backoff = min(self.max_backoff, 2 ** (self._failures - 1))
+                self._next_retry = time.monotonic() + backoff
+            app.logger.error(f"Gagal terkoneksi ke Docker daemon {self.base_url or 'lokal'} via SDK (coba lagi dalam {backoff:.0f} detik): {e}")
+            return None
+
+        with self._lock:
+            now = time.monotonic()
+            reconnect = self._counters["connects"] > 0
+            self._retired.extend((now + self.long_timeout, client) for client in self._clients.values())
+            self._clients = clients
+            self._connecting = False
+            self._healthy = True
+            self._failures = 0
+            self._last_error = None
+            self._next_check = now + self.health_interval
+            self._counters["connects"] += 1
+            if reconnect:
+                self._counters["reconnects"] += 1
+        if reconnect:
+            app.logger.info(f"Koneksi Docker SDK ke {self.base_url or 'daemon lokal'} dipulihkan.")
+        else:
+            app.logger.info(f"Koneksi Docker SDK ke {self.base_url or 'daemon lokal'} berhasil.")
+        return clients["long" if long_running else "short"]
+
+    def _close_expired(self):
+        now = time.monotonic()
+        with self._lock:
+            expired = [client for deadline, client in self._retired if deadline <= now]
+            self._retired = [(deadline, client) for deadline, client in self._retired if deadline > now]
+        for client in expired:
+            client.close()
+
+    def _health_check(self, app, client):
+        self._close_expired()
+        try:
+            client.ping()
+            error = None
+        except Exception as e:
+            error = e
+        with self._lock:
+            self._checking = False
+            self._counters["health_checks"] += 1
+            if error is None or client is not self._clients.get("short"):
+                return
+            self._counters["health_failures"] += 1
+            self._healthy = False
+            self._failures = 0
+            self._last_error = str(error)
+            self._next_retry = time.monotonic()
+        app.logger.warning(f"Health check Docker daemon {self.base_url or 'lokal'} gagal, mencoba koneksi ulang: {error}")
+
+    @staticmethod
+    def _pool_usage(client) -> dict:
+        requests = idle = in_use = capacity = 0
+        for pool in _connection_pools(client):
+            requests += pool.num_requests
+            if pool.pool is None:
+                continue
+            queued = list(pool.pool.queue)
+            capacity += pool.pool.maxsize
+            idle += sum(1 for conn in queued if conn is not None)
+            in_use += pool.pool.maxsize - len(queued)
+        return {
+            "requests": requests,
+            "in_use": in_use,
+            "idle": idle,
+            "capacity": capacity,
+            "utilisation": round(in_use / capacity, 3) if capacity else 0.0,
+        }
+
+docker_pool = DockerClientPool()
+
+# DOCKER_HOSTS names the daemons this instance manages, e.g.
+# "lokal=unix:///var/run/docker.sock,prod1=tcp://10.0.0.5:2375". The first
+# entry is the default host; without it the environment (DOCKER_HOST)
+# decides and the only host is called "lokal". The inventory cache, stats
+# sampler and self-container guard always track the default host.
+DEFAULT_HOST_NAME = "lokal"
+_current_host = contextvars.ContextVar("docker_host", default=None)
+_hosts_lock = threading.Lock()
+_hosts = None
+_fanout_executor = None
+
+def parse_docker_hosts(spec: str) -> dict:
+    hosts = {}
+    for entry in (spec or "").split(","):
+        name, _, url = entry.strip().partition("=")
+        if name.strip() and url.strip():
+            hosts[name.strip().lower()] = url.strip()
+    return hosts
+
+def _host_pools() -> dict:
+    global _hosts
+    if _hosts is None:
+        with _hosts_lock:
+            if _hosts is None:
+                configured = parse_docker_hosts(current_app.config.get('DOCKER_HOSTS'))
+                if not configured:
+                    _hosts = {DEFAULT_HOST_NAME: docker_pool}
+                else:
+                    docker_pool.base_url = next(iter(configured.values()))
+                    _hosts = {name: (docker_pool if index == 0 else DockerClientPool(url))
+                              for index, (name, url) in enumerate(configured.items())}
+    return _hosts
+
+def _default_base_url() -> str:
+    _host_pools()
+    return docker_pool.base_url
+
+def host_names() -> list:
+    return list(_host_pools())
+
+def default_host_name() -> str:
+    return host_names()[0]
+
+def current_host() -> str:
+    return _current_host.get()
+
+def is_default_host() -> bool:
+    host = _current_host.get()
+    return host is None or host == default_host_name()
+
+@contextlib.contextmanager
+def use_host(name: str = None):
+    token = _current_host.set(name)
+    try:
+        yield
+    finally:
+        _current_host.reset(token)
+
+def get_docker_client(long_running: bool = False):
+    pools = _host_pools()
+    host = _current_host.get()
+    pool = pools.get(host) if host else docker_pool
+    return pool.get(long_running) if pool else None
+
+def host_pool_stats() -> dict:
+    return {name: pool.stats() for name, pool in _host_pools().items()}
+
+def _run_on_host(app, host: str, handler, params: dict):
+    with app.app_context(), use_host(host):
+        return handler(dict(params))
+
+def fan_out(handler, params: dict, hosts: list = None) -> tuple[list, str]:
+    global _fanout_executor
+    app = current_app._get_current_object()
+    hosts = host_names() if hosts is None else hosts
+    if _fanout_executor is None:
+        with _hosts_lock:
+            if _fanout_executor is None:
+                _fanout_executor = ThreadPoolExecutor(max_workers=max(4, 2 * len(hosts)), thread_name_prefix="fanout")
+    futures = {host: _fanout_executor.submit(_run_on_host, app, host, handler, params) for host in hosts}
+    deadline = app.config.get('DOCKER_FANOUT_DEADLINE', 5)
+    wait(futures.values(), timeout=deadline)
+
+    rows, problems = [], []
+    for host, future in futures.items():
+        if not future.done():
+            problems.append(f"{host}: tidak menjawab dalam {deadline:g} detik")
+            continue
         try:
-            docker_client = docker.from_env(timeout=5)
-            docker_client.ping()
-            current_app.logger.info("Koneksi Docker SDK berhasil.")
-        except docker.errors.DockerException as e:
-            current_app.logger.error(f"Gagal terkoneksi ke Docker daemon via SDK: {e}")
-            docker_client = "ERROR_CONNECTION"
-    return docker_client if docker_client != "ERROR_CONNECTION" else None
\ No newline at end of file
+            output, error = future.result()
+        except Exception as e:
+            output, error = None, str(e)
+        if error:
+            problems.append(f"{host}: {error}")
+            continue
+        rows.extend({"host": host, **row} for row in output or [])
+    if problems:
+        app.logger.warning(f"Fan-out ke {len(hosts)} host tidak lengkap: {'; '.join(problems)}")
+        return rows, f"Peringatan: sebagian host tidak terjangkau ({'; '.join(problems)})."
+    return rows, ""
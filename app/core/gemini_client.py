@@ -1,9 +1,51 @@
 import google.generativeai as genai
 from flask import current_app
 from app.models.commands import COMMAND_GUIDE
+from app.core.response_cache import ResponseCache
+from app.core.system_manager import docker_state_fingerprint
 from google.generativeai.protos import Part, FunctionResponse
+import hashlib
 import json
 import re
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+
+GEMINI_MODEL_NAME = "gemini-1.5-flash"
+HISTORY_STUB_THRESHOLD_CHARS = 400
+HISTORY_STUB_PREVIEW_CHARS = 160
+
+SYSTEM_PROMPT = """
+    You are a helpful and intelligent Docker assistant. Your primary role is to assist users in managing their Docker environment.
+    When a user asks a question that requires real-time information (e.g., "is my database container running?", "show me the details of nginx and redis containers"), you MUST use your available tools.
+    You can call multiple tools in parallel in a single turn.
+
+    IMPORTANT: If you need to present data in a tabular format, you MUST ONLY output a single, valid JSON object following this EXACT structure:
+    {
+      "type": "table",
+      "data": {
+        "headers": ["Header 1", "Header 2", ...],
+        "rows": [
+          ["Row 1 Cell 1", "Row 1 Cell 2", ...],
+          ["Row 2 Cell 1", "Row 2 Cell 2", ...]
+        ]
+      }
+    }
+    Do not add any text or explanation outside of this JSON object.
+
+    IMPORTANT: If the user asks for "help", "bantuan", or "command list", you MUST NOT list the commands yourself. Instead, reply with the text: "Tentu, Anda dapat melihat semua daftar perintah yang tersedia dengan menekan tombol 'Panduan Perintah' di sidebar."
+    """
+
+_registry = None
+_registry_lock = threading.Lock()
+_tool_lock = threading.Lock()
+_tool_counters = {"calls": 0, "timeouts": 0, "rejected": 0, "abandoned_running": 0}
+
+CACHEABLE_ACTIONS = {
+    "list_containers", "list_images", "list_volumes", "list_networks",
+    "inspect_container", "inspect_image", "inspect_volume", "inspect_network",
+    "system_info", "system_version", "compose_ps",
+}
+response_cache = ResponseCache()
 
 def _create_dynamic_tools_from_guide():
     function_declarations = []
@@ -16,11 +58,13 @@ def _create_dynamic_tools_from_guide():
         
         params = param_pattern.findall(cmd_def["pattern"])
         
-        required_params = cmd_def.get("required_params", params)
+        required_params = cmd_def.get("required_params", [param for param in params if param != "host"])
 
         properties = {}
         for param in params:
             properties[param] = {"type": "string", "description": f"Parameter untuk {param}"}
+        if "host" in properties:
+            properties["host"]["description"] = "Nama host Docker tujuan (opsional, default host pertama)"
 
         func = genai.types.FunctionDeclaration(
             name=function_name,
@@ -35,6 +79,74 @@ def _create_dynamic_tools_from_guide():
         
     return genai.types.Tool(function_declarations=function_declarations)
 
+# COMMAND_GUIDE is a module constant that is never changed at runtime, so
+# the tools and models built from it are kept for the life of the process
+# and only rebuilt when the API key changes.
+def _get_registry(api_key: str) -> dict:
+    global _registry
+    registry = _registry
+    if registry is not None and registry["api_key"] == api_key:
+        return registry
+
+    with _registry_lock:
+        if _registry is None or _registry["api_key"] != api_key:
+            genai.configure(api_key=api_key)
+            _registry = {
+                "api_key": api_key,
+                "commands_by_id": {cmd["id"]: cmd for cmd in COMMAND_GUIDE},
+                "model": genai.GenerativeModel(
+                    model_name=GEMINI_MODEL_NAME,
+                    system_instruction=SYSTEM_PROMPT,
+                    tools=[_create_dynamic_tools_from_guide()]
+                ),
+                "summary_model": genai.GenerativeModel(model_name=GEMINI_MODEL_NAME),
+                "system_prompt_tokens": _estimate_tokens(SYSTEM_PROMPT),
+            }
+            current_app.logger.info("Registry Gemini (tools, model) dibangun.")
+        return _registry
+
+def _estimate_tokens(text: str) -> int:
+    return (len(text) + 3) // 4
+
+def _stub_bot_response(bot_response: dict) -> str:
+    output = bot_response.get('output')
+    output_type = bot_response.get('output_type', 'text')
+    if bot_response.get('error'):
+        return json.dumps({"error": bot_response['error'][:HISTORY_STUB_PREVIEW_CHARS]})
+    if isinstance(output, list):
+        columns = sorted(output[0].keys()) if output and isinstance(output[0], dict) else []
+        return f"[{output_type} lama: {len(output)} baris, kolom: {', '.join(columns) or '-'}]"
+    if isinstance(output, dict) and 'action' in output:
+        return json.dumps({key: output.get(key) for key in ('action', 'status', 'resource_type', 'resource_name')})
+    text = output if isinstance(output, str) else json.dumps(output)
+    return f"[{output_type} lama, {len(text)} karakter] {text[:HISTORY_STUB_PREVIEW_CHARS]}..."
+
+def _compact_history(history: list, token_budget: int, verbatim_turns: int) -> tuple[list, int]:
+    turns = []
+    used_tokens = 0
+    for age, item in enumerate(reversed(history)):
+        bot_response = item.get('bot_response') or {}
+        user_text = item['user_command']
+        bot_response_text = json.dumps(bot_response.get('output'))
+        if age >= verbatim_turns and len(bot_response_text) > HISTORY_STUB_THRESHOLD_CHARS:
+            bot_response_text = _stub_bot_response(bot_response)
+
+        cost = _estimate_tokens(user_text) + _estimate_tokens(bot_response_text)
+        if used_tokens + cost > token_budget and len(bot_response_text) > HISTORY_STUB_THRESHOLD_CHARS:
+            bot_response_text = _stub_bot_response(bot_response)
+            cost = _estimate_tokens(user_text) + _estimate_tokens(bot_response_text)
+        if used_tokens + cost > token_budget:
+            break
+
+        used_tokens += cost
+        turns.append((user_text, bot_response_text))
+
+    gemini_history = []
+    for user_text, bot_response_text in reversed(turns):
+        gemini_history.append({"role": "user", "parts": [{"text": user_text}]})
+        gemini_history.append({"role": "model", "parts": [{"text": bot_response_text}]})
+    return gemini_history, used_tokens
+
 def _get_command_summary():
     return "\n".join([f"- `{cmd['example']}`: {cmd['description']}" for cmd in COMMAND_GUIDE])
 
@@ -43,8 +155,7 @@ def summarize_docker_status(status_data: dict):
     if not api_key:
         return None, "Error: GEMINI_API_KEY tidak diatur di server."
 
-    genai.configure(api_key=api_key)
-    model = genai.GenerativeModel(model_name="gemini-1.5-flash")
+    model = _get_registry(api_key)["summary_model"]
 
     prompt = f"""
     Anda adalah asisten Docker. Berdasarkan data JSON berikut, buatlah sebuah ringkasan status yang singkat, jelas, dan ramah untuk pengguna.
@@ -62,96 +173,188 @@ def summarize_docker_status(status_data: dict):
         current_app.logger.error(f"Error saat meringkas status Docker: {e}", exc_info=True)
         return None, "Gagal saat membuat ringkasan status dari AI."
 
-def handle_gemini_request(user_prompt: str, history: list):
-    from app.api.handlers import ACTION_HANDLERS, INSPECT_ACTION_MAP
+def _abandoned_call_finished(_future) -> None:
+    with _tool_lock:
+        _tool_counters["abandoned_running"] -= 1
 
-    api_key = current_app.config.get('GEMINI_API_KEY')
-    if not api_key:
-        return {"output": None, "error": "Error: GEMINI_API_KEY tidak diatur di server.", "output_type": "text"}
+def get_tool_call_stats() -> dict:
+    with _tool_lock:
+        return dict(_tool_counters)
 
-    genai.configure(api_key=api_key)
+def _tool_error_part(name: str, message: str) -> Part:
+    return Part(function_response=FunctionResponse(name=name, response={"status": "error", "message": message}))
 
-    system_prompt = f"""
-    You are a helpful and intelligent Docker assistant. Your primary role is to assist users in managing their Docker environment.
-    When a user asks a question that requires real-time information (e.g., "is my database container running?", "show me the details of nginx and redis containers"), you MUST use your available tools.
-    You can call multiple tools in parallel in a single turn.
+def _execute_function_call(app, registry: dict, command_id: str, params: dict) -> tuple[Part, str, dict]:
+    from app.api.handlers import ACTION_HANDLERS, INSPECT_ACTION_MAP, execute_action
 
-    IMPORTANT: If you need to present data in a tabular format, you MUST ONLY output a single, valid JSON object following this EXACT structure:
-    {{
-      "type": "table",
-      "data": {{
-        "headers": ["Header 1", "Header 2", ...],
-        "rows": [
-          ["Row 1 Cell 1", "Row 1 Cell 2", ...],
-          ["Row 2 Cell 1", "Row 2 Cell 2", ...]
+    with app.app_context():
+        current_app.logger.info(f"Gemini calling function '{command_id}' with params: {params}")
+
+        cmd_def = registry["commands_by_id"].get(command_id)
+        if not cmd_def:
+            func_response = FunctionResponse(name=command_id, response={"status": "error", "message": f"Fungsi '{command_id}' tidak ditemukan."})
+            return Part(function_response=func_response), None, None
+
+        action = cmd_def.get("action")
+        if action == "inspect_object":
+            object_type = params.get("object_type")
+            action = INSPECT_ACTION_MAP.get(object_type)
+
+        if action not in ACTION_HANDLERS:
+            func_response = FunctionResponse(name=command_id, response={"status": "error", "message": f"Aksi untuk '{command_id}' tidak terdefinisi."})
+            return Part(function_response=func_response), action, None
+
+        if "params_map" in cmd_def:
+            params.update(cmd_def["params_map"])
+
+        is_job = False
+        try:
+            output_data, error_str, is_job = execute_action(action, params, command_id)
+        except Exception as e:
+            current_app.logger.exception(f"Error saat menjalankan fungsi Gemini '{command_id}':")
+            output_data, error_str = None, f"Error tak terduga: {str(e)}"
+
+        func_response = FunctionResponse(
+            name=command_id,
+            response={"data": json.dumps(output_data), "error": error_str}
+        )
+        return Part(function_response=func_response), action, (output_data if is_job and output_data else None)
+
+# Each turn gets its own executor: a running tool call cannot be cancelled,
+# so one that misses the deadline is abandoned to finish on its own thread
+# instead of holding a worker other requests need. Abandoned calls still
+# running are counted, and new turns are refused while there are too many.
+def _execute_function_calls(registry: dict, function_calls: list) -> tuple[list, list, list]:
+    app = current_app._get_current_object()
+    turn_timeout = app.config.get('GEMINI_TOOL_TURN_TIMEOUT', 20)
+    max_abandoned = app.config.get('GEMINI_TOOL_MAX_ABANDONED', 16)
+
+    with _tool_lock:
+        abandoned = _tool_counters["abandoned_running"]
+        if abandoned >= max_abandoned:
+            _tool_counters["rejected"] += len(function_calls)
+        else:
+            _tool_counters["calls"] += len(function_calls)
+    if abandoned >= max_abandoned:
+        current_app.logger.warning(f"{abandoned} fungsi Gemini yang melewati batas waktu masih berjalan, pemanggilan baru ditolak.")
+        message = "Server sedang menunggu pemanggilan fungsi sebelumnya yang melewati batas waktu. Coba lagi nanti."
+        return [_tool_error_part(function_call.name, message) for function_call in function_calls], [None] * len(function_calls), []
+
+    max_workers = max(1, min(app.config.get('GEMINI_TOOL_MAX_WORKERS', 4), len(function_calls)))
+    executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="gemini-tool")
+    try:
+        futures = [
+            executor.submit(_execute_function_call, app, registry, function_call.name, dict(function_call.args))
+            for function_call in function_calls
         ]
-      }}
-    }}
-    Do not add any text or explanation outside of this JSON object.
+        wait(futures, timeout=turn_timeout)
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
 
-    IMPORTANT: If the user asks for "help", "bantuan", or "command list", you MUST NOT list the commands yourself. Instead, reply with the text: "Tentu, Anda dapat melihat semua daftar perintah yang tersedia dengan menekan tombol 'Panduan Perintah' di sidebar."
-    """
+    tool_responses = []
+    actions = []
+    submitted_jobs = []
+    for function_call, future in zip(function_calls, futures):
+        if future.done() and not future.cancelled():
+            tool_response, action, job = future.result()
+            tool_responses.append(tool_response)
+            actions.append(action)
+            if job:
+                submitted_jobs.append(job)
+            continue
+        actions.append(None)
+        if not future.cancelled():
+            with _tool_lock:
+                _tool_counters["timeouts"] += 1
+                _tool_counters["abandoned_running"] += 1
+            future.add_done_callback(_abandoned_call_finished)
+        current_app.logger.warning(f"Fungsi Gemini '{function_call.name}' melewati batas waktu {turn_timeout} detik "
+                                   f"({get_tool_call_stats()['abandoned_running']} masih berjalan di latar belakang).")
+        tool_responses.append(_tool_error_part(function_call.name, f"Fungsi '{function_call.name}' melewati batas waktu {turn_timeout} detik."))
+    return tool_responses, actions, submitted_jobs
 
-    model = genai.GenerativeModel(
-        model_name="gemini-1.5-flash",
-        system_instruction=system_prompt,
-        tools=[_create_dynamic_tools_from_guide()]
-    )
-    
-    gemini_history = []
+def _normalize_prompt(user_prompt: str) -> str:
+    return " ".join(user_prompt.lower().split()).rstrip("?!. ")
+
+def _history_digest(history: list) -> str:
+    digest = hashlib.sha256()
     for item in history:
-        gemini_history.append({"role": "user", "parts": [{"text": item['user_command']}]})
-        bot_response_text = json.dumps(item.get('bot_response', {}).get('output'))
-        gemini_history.append({"role": "model", "parts": [{"text": bot_response_text}]})
+        bot_response = item.get('bot_response') or {}
+        digest.update(json.dumps([item.get('user_command'), bot_response.get('output'), bot_response.get('error')],
+                                 sort_keys=True, default=str).encode('utf-8'))
+    return digest.hexdigest()
+
+def _cache_key(user_prompt: str, history: list):
+    fingerprint = docker_state_fingerprint()
+    return (_normalize_prompt(user_prompt), _history_digest(history), fingerprint) if fingerprint else None
+
+def get_response_cache_stats() -> dict:
+    return response_cache.stats()
+
+def handle_gemini_request(user_prompt: str, history: list):
+    api_key = current_app.config.get('GEMINI_API_KEY')
+    if not api_key:
+        return {"output": None, "error": "Error: GEMINI_API_KEY tidak diatur di server.", "output_type": "text"}
+
+    cache_size = current_app.config.get('GEMINI_CACHE_SIZE', 256)
+    cache_ttl = current_app.config.get('GEMINI_CACHE_TTL', 300)
+    response_cache.configure(cache_size, cache_ttl)
+    caching = cache_size > 0 and cache_ttl > 0
+    # Follow-ups like "restart it" depend on the conversation, so the
+    # history is part of the key alongside the prompt and Docker state. The
+    # fingerprint is only computed when a lookup could hit or an answer is
+    # about to be stored.
+    cache_key = None
+    if caching and not response_cache.is_empty():
+        cache_key = _cache_key(user_prompt, history)
+        cached = response_cache.get(cache_key) if cache_key else None
+        if cached:
+            current_app.logger.info(f"Jawaban Gemini untuk '{user_prompt}' diambil dari cache.")
+            return {**cached, "cached": True}
+
+    result, cacheable = _run_gemini_chat(api_key, user_prompt, history)
+    if caching and cacheable and not result.get("error"):
+        cache_key = cache_key or _cache_key(user_prompt, history)
+        if cache_key:
+            response_cache.put(cache_key, result)
+    return result
+
+def _run_gemini_chat(api_key: str, user_prompt: str, history: list) -> tuple[dict, bool]:
+    registry = _get_registry(api_key)
+    
+    gemini_history, history_tokens = _compact_history(
+        history,
+        current_app.config.get('GEMINI_HISTORY_TOKEN_BUDGET', 6000),
+        current_app.config.get('GEMINI_HISTORY_VERBATIM_TURNS', 3)
+    )
+    prompt_tokens_estimate = history_tokens + registry["system_prompt_tokens"] + _estimate_tokens(user_prompt)
+    current_app.logger.info(
+        f"Gemini prompt: {len(gemini_history) // 2}/{len(history)} giliran riwayat, "
+        f"estimasi {prompt_tokens_estimate} token (riwayat {history_tokens})."
+    )
 
-    chat = model.start_chat(history=gemini_history)
+    chat = registry["model"].start_chat(history=gemini_history)
+    called_actions = []
+    # Jobs submitted by tool calls are returned with the answer so the
+    # route can bind them to the conversation and the UI can poll them.
+    submitted_jobs = []
     
     try:
         response = chat.send_message(user_prompt)
+        usage = getattr(response, 'usage_metadata', None)
+        if usage:
+            current_app.logger.info(f"Gemini prompt_token_count aktual: {usage.prompt_token_count}")
         
         while response.candidates[0].content.parts[0].function_call:
-            function_calls = response.candidates[0].content.parts
-            tool_responses = []
-
-            for call in function_calls:
-                function_call = call.function_call
-                command_id = function_call.name
-                params = dict(function_call.args)
-                
-                current_app.logger.info(f"Gemini calling function '{command_id}' with params: {params}")
-
-                cmd_def = next((cmd for cmd in COMMAND_GUIDE if cmd["id"] == command_id), None)
-                
-                if not cmd_def:
-                    func_response = FunctionResponse(name=command_id, response={"status": "error", "message": f"Fungsi '{command_id}' tidak ditemukan."})
-                    tool_responses.append(Part(function_response=func_response))
-                    continue
-
-                action = cmd_def.get("action")
-                if action == "inspect_object":
-                    object_type = params.get("object_type")
-                    action = INSPECT_ACTION_MAP.get(object_type)
-                
-                if action in ACTION_HANDLERS:
-                    if "params_map" in cmd_def:
-                        params.update(cmd_def["params_map"])
-                    
-                    output_data, error_str = ACTION_HANDLERS[action](params)
-                    
-                    serialized_output = json.dumps(output_data)
-
-                    func_response = FunctionResponse(
-                        name=command_id, 
-                        response={"data": serialized_output, "error": error_str}
-                    )
-                    tool_responses.append(Part(function_response=func_response))
-                else:
-                    func_response = FunctionResponse(name=command_id, response={"status": "error", "message": f"Aksi untuk '{command_id}' tidak terdefinisi."})
-                    tool_responses.append(Part(function_response=func_response))
-                
+            function_calls = [part.function_call for part in response.candidates[0].content.parts if part.function_call]
+            tool_responses, actions, jobs = _execute_function_calls(registry, function_calls)
+            called_actions.extend(actions)
+            submitted_jobs.extend(jobs)
             response = chat.send_message(tool_responses)
         
         final_text = response.candidates[0].content.parts[0].text
+        cacheable = bool(called_actions) and all(action in CACHEABLE_ACTIONS for action in called_actions)
+        job_fields = {"jobs": submitted_jobs} if submitted_jobs else {}
         
         json_match = re.search(r'\{.*\}', final_text, re.DOTALL)
         
@@ -161,11 +364,11 @@ def handle_gemini_request(user_prompt: str, history: list):
                 json_data = json.loads(json_string)
                 if isinstance(json_data, dict) and json_data.get("type") == "table":
                     current_app.logger.info("Gemini generated a table, extracted from text.")
-                    return {"output": json_data.get("data"), "error": None, "output_type": "gemini_table"}
+                    return {"output": json_data.get("data"), "error": None, "output_type": "gemini_table", **job_fields}, cacheable
             except json.JSONDecodeError:
                 pass
         
-        return {"output": final_text, "error": None, "output_type": "gemini_text"}
+        return {"output": final_text, "error": None, "output_type": "gemini_text", **job_fields}, cacheable
 
     except Exception as e:
         current_app.logger.error(f"An unexpected error occurred with Gemini API: {e}", exc_info=True)
@@ -173,4 +376,4 @@ def handle_gemini_request(user_prompt: str, history: list):
             current_app.logger.error(f"Last Gemini Response before error: {response}")
         except NameError:
             pass
-        return {"output": None, "error": f"An unexpected error occurred with the Gemini API. Check server logs for details.", "output_type": "text"}
\ No newline at end of file
+        return {"output": None, "error": f"An unexpected error occurred with the Gemini API. Check server logs for details.", "output_type": "text"}, False
\ No newline at end of file
@@ -1,98 +1,462 @@
+import fcntl
 import json
 import os
+import re
+import shutil
+import sqlite3
+import threading
 import time
 import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
 from flask import current_app
 
-def _get_history_file_path():
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS conversations (
+    id TEXT PRIMARY KEY,
+    title TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+_CONV_ID_PATTERN = re.compile(r"^[a-zA-Z0-9_-]{1,64}$")
+_MESSAGE_CACHE_SIZE = 64
+_PAGE_READ_BLOCK = 64 * 1024
+
+_local = threading.local()
+_init_lock = threading.Lock()
+_initialized_paths = set()
+_cache_lock = threading.Lock()
+_caches = {}
+
+def _get_db_path():
+    return os.path.join(current_app.instance_path, 'chat_history.db')
+
+def _get_shard_dir():
+    return os.path.join(current_app.instance_path, 'history')
+
+def _get_lock_path():
+    return os.path.join(current_app.instance_path, 'chat_history.lock')
+
+def _get_legacy_file_path():
     return os.path.join(current_app.instance_path, 'chat_history.json')
 
-def _get_or_create_history_file():
-    history_file = _get_history_file_path()
+def _shard_path(conv_id):
+    if not conv_id or not _CONV_ID_PATTERN.match(conv_id):
+        return None
+    return os.path.join(_get_shard_dir(), f"{conv_id}.jsonl")
+
+def _connect():
+    db_path = _get_db_path()
+    connections = getattr(_local, 'connections', None)
+    if connections is None:
+        connections = _local.connections = {}
+
+    conn = connections.get(db_path)
+    if conn is None:
+        os.makedirs(_get_shard_dir(), exist_ok=True)
+        conn = sqlite3.connect(db_path, timeout=10, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        connections[db_path] = conn
+
+    if db_path not in _initialized_paths:
+        with _init_lock:
+            if db_path not in _initialized_paths:
+                conn.executescript(_SCHEMA)
+                _migrate_messages_table(conn)
+                _migrate_legacy_json(conn)
+                _initialized_paths.add(db_path)
+    return conn
+
+def _migrate_messages_table(conn):
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        has_table = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'messages'"
+        ).fetchone()
+        if has_table:
+            conv_ids = [row[0] for row in conn.execute("SELECT id FROM conversations").fetchall()]
+            for conv_id in conv_ids:
+                rows = conn.execute(
+                    "SELECT user_command, bot_response FROM messages WHERE conv_id = ? ORDER BY seq", (conv_id,)
+                ).fetchall()
+                _write_shard(conv_id, [
+                    {"user_command": user_command, "bot_response": json.loads(bot_response)}
+                    for user_command, bot_response in rows
+                ])
+            conn.execute("DROP TABLE messages")
+            _bump_generation(conn)
+            current_app.logger.info(f"Riwayat {len(conv_ids)} percakapan dipecah ke '{_get_shard_dir()}'.")
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+def _migrate_legacy_json(conn):
+    legacy_file = _get_legacy_file_path()
+    if not os.path.exists(legacy_file):
+        return
+
+    try:
+        with open(legacy_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (json.JSONDecodeError, OSError) as e:
+        current_app.logger.error(f"Gagal membaca riwayat lama '{legacy_file}': {e}")
+        return
+
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        already_migrated = _get_meta(conn, 'legacy_migrated')
+        for conv_id, conv_data in ({} if already_migrated else data.get("conversations", {})).items():
+            if not _shard_path(conv_id):
+                continue
+            conn.execute(
+                "INSERT OR IGNORE INTO conversations (id, title, created_at) VALUES (?, ?, ?)",
+                (conv_id, conv_data.get("title", "Tanpa Judul"), conv_data.get("created_at") or 0)
+            )
+            _write_shard(conv_id, [
+                {"user_command": msg.get("user_command", ""), "bot_response": msg.get("bot_response", {})}
+                for msg in conv_data.get("messages", [])
+            ])
+        if not already_migrated:
+            _set_meta(conn, 'last_active_id', data.get('last_active_id'))
+            _set_meta(conn, 'legacy_migrated', '1')
+            _bump_generation(conn)
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
     try:
-        os.makedirs(current_app.instance_path)
+        os.replace(legacy_file, legacy_file + '.migrated')
     except OSError:
         pass
-    
-    if not os.path.exists(history_file):
-        initial_data = {"conversations": {}, "last_active_id": None}
-        with open(history_file, 'w', encoding='utf-8') as f:
-            json.dump(initial_data, f, indent=2)
-        return initial_data
-    
+    current_app.logger.info(f"Riwayat lama dipindahkan dari '{legacy_file}' ke '{_get_db_path()}'.")
+
+def _encode(message):
+    return json.dumps(message, ensure_ascii=False) + "\n"
+
+def _write_shard(conv_id, messages):
+    path = _shard_path(conv_id)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.writelines(_encode(msg) for msg in messages)
+    os.replace(tmp_path, path)
+
+def _append_to_shard(conv_id, messages, create=False):
+    path = _shard_path(conv_id)
+    if not path:
+        return False
+    flags = os.O_WRONLY | os.O_APPEND | (os.O_CREAT if create else 0)
     try:
-        with open(history_file, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except (json.JSONDecodeError, FileNotFoundError):
-        return {"conversations": {}, "last_active_id": None}
+        fd = os.open(path, flags, 0o644)
+    except FileNotFoundError:
+        return False
+    with os.fdopen(fd, 'wb') as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            f.write(''.join(_encode(msg) for msg in messages).encode('utf-8'))
+            f.flush()
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+    return True
 
-def _save_history_data(data):
-    history_file = _get_history_file_path()
-    with open(history_file, 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+# Shard writers hold this lock shared and clear_history holds it exclusive,
+# so the shard directory is never removed between a conversation's index
+# commit and the append that writes its messages.
+@contextmanager
+def _shard_dir_lock(exclusive=False):
+    fd = os.open(_get_lock_path(), os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        yield
+    finally:
+        os.close(fd)
 
-def get_conversations_list():
-    data = _get_or_create_history_file()
-    last_active_id = data.get('last_active_id')
-    
-    conv_list = [
-        {
+def _get_meta(conn, key):
+    row = conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+    return row[0] if row else None
+
+def _set_meta(conn, key, value):
+    conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+def _bump_generation(conn):
+    conn.execute(
+        "INSERT INTO meta (key, value) VALUES ('generation', 1) "
+        "ON CONFLICT(key) DO UPDATE SET value = CAST(value AS INTEGER) + 1"
+    )
+
+def _current_generation(conn):
+    return int(_get_meta(conn, 'generation') or 0)
+
+def _make_title(user_command):
+    return user_command[:50] + '...' if len(user_command) > 50 else user_command
+
+def _get_cache():
+    db_path = _get_db_path()
+    with _cache_lock:
+        cache = _caches.get(db_path)
+        if cache is None:
+            cache = _caches[db_path] = {"listing": None, "messages": OrderedDict()}
+        return cache
+
+def _load_listing(conn, cache, generation):
+    listing = cache["listing"]
+    if listing is not None and listing[0] == generation:
+        return listing[1:]
+
+    rows = conn.execute("SELECT id, title, created_at FROM conversations ORDER BY created_at DESC").fetchall()
+    positions = {row[0]: position for position, row in enumerate(rows)}
+    last_active_id = _get_meta(conn, 'last_active_id')
+    cache["listing"] = (generation, rows, positions, last_active_id)
+    return rows, positions, last_active_id
+
+def _load_messages(cache, conv_id):
+    path = _shard_path(conv_id)
+    messages_cache = cache["messages"]
+    try:
+        size = os.stat(path).st_size if path else None
+    except FileNotFoundError:
+        size = None
+
+    with _cache_lock:
+        entry = messages_cache.get(conv_id)
+        if size is None:
+            messages_cache.pop(conv_id, None)
+            return []
+        if entry and entry["offset"] == size:
+            messages_cache.move_to_end(conv_id)
+            return entry["messages"]
+
+    offset, messages = (entry["offset"], entry["messages"]) if entry and entry["offset"] < size else (0, [])
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        chunk = f.read(size - offset)
+
+    complete = chunk[:chunk.rfind(b"\n") + 1]
+    if complete:
+        messages = messages + [json.loads(line) for line in complete.decode('utf-8').splitlines() if line]
+        offset += len(complete)
+
+    with _cache_lock:
+        messages_cache[conv_id] = {"offset": offset, "messages": messages}
+        messages_cache.move_to_end(conv_id)
+        while len(messages_cache) > _MESSAGE_CACHE_SIZE:
+            messages_cache.popitem(last=False)
+    return messages
+
+def _read_shard_page(conv_id, limit, before=None):
+    path = _shard_path(conv_id)
+    if not path:
+        return [], None
+    try:
+        f = open(path, 'rb')
+    except FileNotFoundError:
+        return [], None
+
+    with f:
+        size = f.seek(0, os.SEEK_END)
+        end = size if before is None else max(0, min(before, size))
+        pos = end
+        buf = b""
+        while pos > 0 and buf.count(b"\n") <= limit:
+            step = min(_PAGE_READ_BLOCK, pos)
+            pos -= step
+            f.seek(pos)
+            buf = f.read(step) + buf
+
+    buf = buf[:buf.rfind(b"\n") + 1]
+    end = pos + len(buf)
+    lines = buf.split(b"\n")[:-1]
+    if pos > 0:
+        lines = lines[1:]
+    page = lines[-limit:] if limit > 0 else []
+
+    start = end - sum(len(line) + 1 for line in page)
+    messages = [json.loads(line) for line in page if line]
+    return messages, (start if start > 0 else None)
+
+class HistorySession:
+    def __init__(self, conn):
+        self._conn = conn
+        self._cache = _get_cache()
+        self._generation = _current_generation(conn)
+        self._new_conversations = {}
+        self._new_messages = []
+        self._last_active_id = None
+
+    def get_conversations(self):
+        rows, _, last_active_id = _load_listing(self._conn, self._cache, self._generation)
+        pending = [(conv_id, conv["title"], conv["created_at"]) for conv_id, conv in self._new_conversations.items()]
+        return [self._conversation_entry(row, last_active_id) for row in pending[::-1] + rows]
+
+    def get_conversations_page(self, limit, before=None):
+        rows, positions, last_active_id = _load_listing(self._conn, self._cache, self._generation)
+        start = 0
+        if before:
+            position = positions.get(before)
+            if position is None:
+                return [], None
+            start = position + 1
+        page = rows[start:start + limit]
+        next_before = page[-1][0] if page and start + limit < len(rows) else None
+        return [self._conversation_entry(row, last_active_id) for row in page], next_before
+
+    def _conversation_entry(self, row, last_active_id):
+        conv_id, title, created_at = row
+        return {
             "id": conv_id,
-            "title": conv_data.get("title", "Tanpa Judul"),
-            "created_at": conv_data.get("created_at"),
-            "is_last_active": conv_id == last_active_id
+            "title": title,
+            "created_at": created_at,
+            "is_last_active": conv_id == (self._last_active_id or last_active_id)
         }
-        for conv_id, conv_data in data.get("conversations", {}).items()
-    ]
-    
-    conv_list.sort(key=lambda x: x.get('created_at', 0), reverse=True)
-    return conv_list
+
+    def get_messages(self, conv_id):
+        if conv_id in self._new_conversations:
+            messages = []
+        else:
+            messages = _load_messages(self._cache, conv_id)
+        pending = [msg for pending_id, msg in self._new_messages if pending_id == conv_id]
+        return messages + pending
+
+    def get_messages_page(self, conv_id, limit, before=None):
+        if not self.exists(conv_id):
+            return [], None
+        return _read_shard_page(conv_id, limit, before)
+
+    def get_last_active_id(self):
+        if self._last_active_id:
+            return self._last_active_id
+        _, _, last_active_id = _load_listing(self._conn, self._cache, self._generation)
+        return last_active_id
+
+    def exists(self, conv_id):
+        if conv_id in self._new_conversations:
+            return True
+        _, positions, _ = _load_listing(self._conn, self._cache, self._generation)
+        return conv_id in positions
+
+    def create_conversation(self, user_command, bot_response):
+        conv_id = str(uuid.uuid4())
+        self._new_conversations[conv_id] = {"title": _make_title(user_command), "created_at": time.time()}
+        self._new_messages.append((conv_id, {"user_command": user_command, "bot_response": bot_response}))
+        return conv_id
+
+    def add_message(self, conv_id, user_command, bot_response):
+        if not self.exists(conv_id):
+            return False
+        self._new_messages.append((conv_id, {"user_command": user_command, "bot_response": bot_response}))
+        return True
+
+    def set_last_active(self, conv_id):
+        if not self.exists(conv_id):
+            return False
+        _, _, last_active_id = _load_listing(self._conn, self._cache, self._generation)
+        if conv_id != (self._last_active_id or last_active_id):
+            self._last_active_id = conv_id
+        return True
+
+    def flush(self):
+        pending_by_conv = OrderedDict()
+        for conv_id, msg in self._new_messages:
+            pending_by_conv.setdefault(conv_id, []).append(msg)
+        if not (pending_by_conv or self._new_conversations or self._last_active_id):
+            return
+
+        # The index row is committed before the shard is created, so a
+        # failed commit never leaves a shard without a conversation.
+        with _shard_dir_lock():
+            if self._new_conversations or self._last_active_id:
+                conn = self._conn
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    conn.executemany(
+                        "INSERT INTO conversations (id, title, created_at) VALUES (?, ?, ?)",
+                        [(conv_id, conv["title"], conv["created_at"]) for conv_id, conv in self._new_conversations.items()]
+                    )
+                    if self._last_active_id:
+                        conn.execute(
+                            "INSERT OR REPLACE INTO meta (key, value) SELECT 'last_active_id', id FROM conversations WHERE id = ?",
+                            (self._last_active_id,)
+                        )
+                    _bump_generation(conn)
+                    conn.execute("COMMIT")
+                except Exception:
+                    conn.execute("ROLLBACK")
+                    raise
+                self._generation = _current_generation(conn)
+            for conv_id, messages in pending_by_conv.items():
+                _append_to_shard(conv_id, messages, create=conv_id in self._new_conversations)
+
+        self._new_conversations = {}
+        self._new_messages = []
+        self._last_active_id = None
+
+@contextmanager
+def history_session():
+    session = HistorySession(_connect())
+    yield session
+    session.flush()
+
+def get_conversations_list():
+    with history_session() as session:
+        return session.get_conversations()
 
 def get_conversation_messages(conv_id):
-    data = _get_or_create_history_file()
-    return data.get("conversations", {}).get(conv_id, {}).get("messages", [])
+    with history_session() as session:
+        return session.get_messages(conv_id)
 
 def set_last_active(conv_id):
-    data = _get_or_create_history_file()
-    if conv_id in data.get("conversations", {}):
-        data['last_active_id'] = conv_id
-        _save_history_data(data)
+    with history_session() as session:
+        session.set_last_active(conv_id)
 
 def create_new_conversation(user_command, bot_response):
-    data = _get_or_create_history_file()
-    conv_id = str(uuid.uuid4())
-    title = user_command[:50] + '...' if len(user_command) > 50 else user_command
-    new_conv = {
-        "id": conv_id,
-        "title": title,
-        "created_at": time.time(),
-        "messages": [{"user_command": user_command, "bot_response": bot_response}]
-    }
-    data["conversations"][conv_id] = new_conv
-    _save_history_data(data)
-    return conv_id
+    with history_session() as session:
+        return session.create_conversation(user_command, bot_response)
 
 def add_message_to_conversation(conv_id, user_command, bot_response):
-    data = _get_or_create_history_file()
-    if conv_id in data.get("conversations", {}):
-        data["conversations"][conv_id]["messages"].append(
-            {"user_command": user_command, "bot_response": bot_response}
-        )
-        _save_history_data(data)
+    with history_session() as session:
+        session.add_message(conv_id, user_command, bot_response)
 
 def delete_conversation(conv_id):
-    data = _get_or_create_history_file()
-    if conv_id in data.get("conversations", {}):
-        del data["conversations"][conv_id]
-        if data.get('last_active_id') == conv_id:
-            data['last_active_id'] = None
-        _save_history_data(data)
-        return True
-    return False
-
-def clear_history():
-    history_file = _get_history_file_path()
-    initial_data = {"conversations": {}, "last_active_id": None}
-    with open(history_file, 'w', encoding='utf-8') as f:
-        json.dump(initial_data, f, indent=2)
-    return {"status": "Berhasil", "message": "Semua riwayat percakapan telah dihapus."}, ""
\ No newline at end of file
+    conn = _connect()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        deleted = conn.execute("DELETE FROM conversations WHERE id = ?", (conv_id,)).rowcount
+        if deleted:
+            conn.execute("DELETE FROM meta WHERE key = 'last_active_id' AND value = ?", (conv_id,))
+            _bump_generation(conn)
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+    shard_path = _shard_path(conv_id)
+    if deleted and shard_path:
+        try:
+            os.remove(shard_path)
+        except FileNotFoundError:
+            pass
+    return bool(deleted)
+
+def clear_history(params: dict = None):
+    conn = _connect()
+    with _shard_dir_lock(exclusive=True):
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM conversations")
+            conn.execute("DELETE FROM meta WHERE key = 'last_active_id'")
+            _bump_generation(conn)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+        shutil.rmtree(_get_shard_dir(), ignore_errors=True)
+        os.makedirs(_get_shard_dir(), exist_ok=True)
+    return {"status": "Berhasil", "message": "Semua riwayat percakapan telah dihapus."}, ""
@@ -1,24 +1,90 @@
 import docker
 import re
+import time
+from docker.utils import parse_repository_tag
 from flask import current_app
 from .docker_client import get_docker_client
+from .inventory_cache import inventory
+from .job_queue import report_progress
+from datetime import datetime, timezone
 import json
 
+PULL_PROGRESS_INTERVAL = 0.5
+
+def _apply_pull_event(layers: dict, event: dict):
+    layer_id = event.get('id')
+    status = event.get('status', '')
+    if not layer_id or status.startswith('Pulling from'):
+        return
+    detail = event.get('progressDetail') or {}
+    layer = layers.setdefault(layer_id, {"status": status, "downloaded": 0, "extracted": 0, "total": 0, "done": False})
+    layer["status"] = status
+    if detail.get('total') and not detail.get('units'):
+        layer["total"] = detail['total']
+    if status == 'Downloading':
+        layer["downloaded"] = detail.get('current', layer["downloaded"])
+    elif status in ('Download complete', 'Verifying Checksum'):
+        layer["downloaded"] = layer["total"] or layer["downloaded"]
+    elif status == 'Extracting' and not detail.get('units'):
+        layer["extracted"] = detail.get('current', layer["extracted"])
+    elif status in ('Pull complete', 'Already exists'):
+        layer["done"] = True
+        if status == 'Pull complete':
+            layer["downloaded"] = layer["extracted"] = layer["total"] or layer["downloaded"]
+
+def _pull_progress(layers: dict, started: float) -> dict:
+    total = sum(layer["total"] for layer in layers.values())
+    downloaded = sum(layer["downloaded"] for layer in layers.values())
+    return {
+        "layers_total": len(layers),
+        "layers_done": sum(1 for layer in layers.values() if layer["done"]),
+        "downloaded_bytes": downloaded,
+        "extracted_bytes": sum(layer["extracted"] for layer in layers.values()),
+        "total_bytes": total,
+        "percent": round(downloaded * 100.0 / total, 1) if total else None,
+        "elapsed": round(time.monotonic() - started, 2),
+    }
+
 def pull_image(params: dict) -> tuple[dict, str]: #
-    client = get_docker_client() #
+    client = get_docker_client(long_running=True) #
     if not client: return None, "Error: Tidak dapat terhubung ke Docker daemon." #
     image_name = params.get("image") #
     if not image_name: return None, "Error: Nama image dibutuhkan." #
     if not re.match(r"^[a-zA-Z0-9/:_.-]+$", image_name): return None, "Error: Nama image mengandung karakter tidak valid." #
+    repository, tag = parse_repository_tag(image_name)
+    reference = f"{repository}:{tag or 'latest'}"
     try:
-        current_app.logger.info(f"Menarik image: {image_name}") #
-        image_obj = client.images.pull(image_name) #
-        current_app.logger.info(f"Selesai pull image: {image_name}") #
+        current_app.logger.info(f"Menarik image: {reference}") #
+        started = time.monotonic()
+        layers, digest = {}, None
+        last_report = 0.0
+        for event in client.api.pull(repository, tag=tag or 'latest', stream=True, decode=True):
+            if event.get('error'):
+                return None, f"Error Docker API saat pull '{image_name}': {event['error']}"
+            status = event.get('status', '')
+            if status.startswith('Digest:'):
+                digest = status.split(':', 1)[1].strip()
+            _apply_pull_event(layers, event)
+            if time.monotonic() - last_report >= PULL_PROGRESS_INTERVAL:
+                last_report = time.monotonic()
+                report_progress(_pull_progress(layers, started))
+
+        progress = _pull_progress(layers, started)
+        report_progress(progress)
+        current_app.logger.info(f"Selesai pull image: {reference} ({progress['downloaded_bytes']} byte, {progress['elapsed']:.1f} detik)") #
+        details = [
+            {"key": "Layer", "value": f"{progress['layers_done']}/{progress['layers_total']}"},
+            {"key": "Diunduh", "value": f"{progress['downloaded_bytes'] / (1024 * 1024):.2f} MB"},
+            {"key": "Durasi", "value": f"{progress['elapsed']:.1f} detik"},
+        ]
+        if digest:
+            details.append({"key": "Digest", "value": digest})
         output = { #
             "action": "Pull", #
             "status": "Berhasil Ditarik", #
             "resource_type": "Image", #
-            "resource_name": image_obj.tags[0] if image_obj.tags else image_name #
+            "resource_name": reference, #
+            "details": details,
         }
         return output, "" #
     except docker.errors.APIError as e: #
@@ -32,10 +98,12 @@ def list_images(params: dict) -> tuple[list, str]: #
     client = get_docker_client() #
     if not client: return None, "Error: Tidak dapat terhubung ke Docker daemon." #
     try:
-        images = client.images.list() #
+        images = inventory.list("images") #
+        if images is None: #
+            images = client.api.images() #
         image_list = [] #
         for img in images: #
-            repo_tags = img.tags #
+            repo_tags = [tag for tag in (img.get('RepoTags') or []) if tag != '<none>:<none>'] #
             if not repo_tags: #
                 repo = "<none>" #
                 tag = "<none>" #
@@ -44,12 +112,13 @@ def list_images(params: dict) -> tuple[list, str]: #
                 repo = parts[0] #
                 tag = parts[1] if len(parts) > 1 else "<none>" #
 
+            created = datetime.fromtimestamp(img.get('Created', 0), tz=timezone.utc) #
             image_list.append({ #
-                "id": img.short_id[7:19], #
+                "id": img['Id'][7:19], #
                 "repository": repo, #
                 "tag": tag, #
-                "created": img.attrs['Created'][:19].replace('T', ' '), #
-                "size": round(img.attrs['Size'] / (1024 * 1024), 2) #
+                "created": created.strftime('%Y-%m-%d %H:%M:%S'), #
+                "size": round(img.get('Size', 0) / (1024 * 1024), 2) #
             })
         return image_list, "" 
     except docker.errors.APIError as e: 
@@ -0,0 +1,176 @@
+import docker
+import threading
+import time
+from flask import current_app
+from .docker_client import get_docker_client, is_default_host, is_read_timeout
+
+KINDS = ("containers", "images", "volumes", "networks")
+IMAGE_REFRESH_ACTIONS = {"pull", "tag", "untag", "delete", "import", "load", "build"}
+IGNORED_CONTAINER_ACTION_PREFIXES = ("exec_", "attach", "top", "resize", "export", "archive-path",
+                                     "extract-to-dir", "copy", "commit", "health_status")
+
+def _summary_key(kind: str, summary: dict) -> str:
+    return summary["Name"] if kind == "volumes" else summary["Id"]
+
+class InventoryCache:
+    def __init__(self, reconnect_delay: float = 1.0, max_reconnect_delay: float = 30.0):
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self._lock = threading.Lock()
+        self._resources = {kind: {} for kind in KINDS}
+        self._live = False
+        self._generation = 0
+        self._thread = None
+        self._stop = threading.Event()
+        self._refreshed_at = None
+        self._last_event_at = None
+        self._last_event_lag = None
+        self._last_error = None
+        self._counters = {"events": 0, "refreshes": 0, "reconnects": 0, "hits": 0, "fallbacks": 0}
+
+    def ensure_started(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        app = current_app._get_current_object()
+        if not app.config.get('INVENTORY_CACHE_ENABLED', True):
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, args=(app,), name="inventory-cache", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        with self._lock:
+            self._live = False
+
+    def is_live(self) -> bool:
+        return self._live
+
+    # Bumped by every refresh and applied event, so while the cache is live
+    # it identifies the daemon's state without asking the daemon.
+    def generation(self):
+        with self._lock:
+            return self._generation if self._live else None
+
+    def list(self, kind: str):
+        if not is_default_host():
+            return None
+        self.ensure_started()
+        with self._lock:
+            if not self._live:
+                self._counters["fallbacks"] += 1
+                return None
+            self._counters["hits"] += 1
+            summaries = list(self._resources[kind].values())
+        if kind in ("containers", "images"):
+            summaries.sort(key=lambda summary: summary.get("Created", 0), reverse=True)
+        return summaries
+
+    def refresh(self, client) -> dict:
+        resources = {
+            "containers": client.api.containers(all=True),
+            "images": client.api.images(),
+            "volumes": client.api.volumes().get("Volumes") or [],
+            "networks": client.api.networks(),
+        }
+        with self._lock:
+            for kind, summaries in resources.items():
+                self._resources[kind] = {_summary_key(kind, summary): summary for summary in summaries}
+            self._refreshed_at = time.time()
+            self._generation += 1
+            self._counters["refreshes"] += 1
+            self._live = self._thread is not None and self._thread.is_alive()
+        return {kind: len(summaries) for kind, summaries in resources.items()}
+
+    def stats(self) -> dict:
+        now = time.time()
+        with self._lock:
+            return {
+                **self._counters,
+                "enabled": self._thread is not None,
+                "live": self._live,
+                "age_seconds": round(now - self._refreshed_at, 3) if self._refreshed_at else None,
+                "last_event_age_seconds": round(now - self._last_event_at, 3) if self._last_event_at else None,
+                "event_lag_seconds": round(self._last_event_lag, 6) if self._last_event_lag is not None else None,
+                "counts": {kind: len(self._resources[kind]) for kind in KINDS},
+                "last_error": self._last_error,
+            }
+
+    def _run(self, app):
+        delay = self.reconnect_delay
+        with app.app_context():
+            while not self._stop.is_set():
+                client = get_docker_client()
+                if client:
+                    try:
+                        since = int(time.time())
+                        self.refresh(client)
+                        delay = self.reconnect_delay
+                        self._follow_events(client, since)
+                    except Exception as e:
+                        with self._lock:
+                            self._live = False
+                            self._last_error = str(e)
+                            self._counters["reconnects"] += 1
+                        app.logger.warning(f"Stream event Docker terputus, inventaris akan dimuat ulang: {e}")
+                self._stop.wait(delay)
+                delay = min(delay * 2, self.max_reconnect_delay)
+        with self._lock:
+            self._live = False
+
+    def _follow_events(self, client, since: int):
+        while not self._stop.is_set():
+            try:
+                for event in client.api.events(since=since, decode=True):
+                    since = max(since, int(event.get("time") or since))
+                    self._apply_event(client, event)
+                    if self._stop.is_set():
+                        return
+            except Exception as e:
+                if not is_read_timeout(e):
+                    raise
+                since = max(since, int(time.time()) - 1)
+
+    def _apply_event(self, client, event: dict):
+        event_type = event.get("Type")
+        action = event.get("Action") or event.get("status") or ""
+        actor_id = (event.get("Actor") or {}).get("ID") or event.get("id")
+
+        if event_type == "container" and actor_id and not action.startswith(IGNORED_CONTAINER_ACTION_PREFIXES):
+            summaries = [] if action == "destroy" else client.api.containers(all=True, filters={"id": actor_id})
+            self._store("containers", actor_id, summaries[0] if summaries else None)
+        elif event_type == "image" and action in IMAGE_REFRESH_ACTIONS:
+            images = {summary["Id"]: summary for summary in client.api.images()}
+            with self._lock:
+                self._resources["images"] = images
+        elif event_type == "volume" and actor_id and action in ("create", "destroy"):
+            self._store("volumes", actor_id, self._inspect(client.api.inspect_volume, actor_id) if action == "create" else None)
+        elif event_type == "network" and actor_id and action in ("create", "destroy", "remove"):
+            self._store("networks", actor_id, self._inspect(client.api.inspect_network, actor_id) if action == "create" else None)
+
+        now = time.time()
+        with self._lock:
+            self._counters["events"] += 1
+            self._generation += 1
+            self._last_event_at = now
+            if event.get("timeNano"):
+                self._last_event_lag = max(0.0, now - event["timeNano"] / 1e9)
+
+    @staticmethod
+    def _inspect(inspect, key: str):
+        try:
+            return inspect(key)
+        except docker.errors.NotFound:
+            return None
+
+    def _store(self, kind: str, key: str, summary):
+        with self._lock:
+            if summary is None:
+                self._resources[kind].pop(key, None)
+            else:
+                self._resources[kind][key] = summary
+
+inventory = InventoryCache()
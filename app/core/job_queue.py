@@ -0,0 +1,250 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from flask import current_app
+from . import history_manager
+from .docker_client import current_host, use_host
+
+# Long-running actions run on the job pool instead of the request thread.
+# Actions sharing a group also share that group's concurrency limit, so a
+# compose build and a compose up never run against the project at once.
+JOB_ACTIONS = {
+    "pull_image": "pull",
+    "compose_up": "compose",
+    "compose_build": "compose",
+    "compose_down": "compose",
+    "prune_system": "prune",
+}
+# Running jobs in these groups watch their cancel event; the others can
+# only be cancelled while they are still queued.
+CANCELLABLE_GROUPS = {"compose"}
+FINISHED_STATES = ("succeeded", "failed", "cancelled")
+_current = threading.local()
+
+def report_progress(progress: dict):
+    job = getattr(_current, "job", None)
+    if job is not None:
+        job["progress"] = progress
+
+def report_log(line: str):
+    job = getattr(_current, "job", None)
+    if job is not None:
+        job["log"].append(line)
+
+def cancel_event() -> threading.Event:
+    job = getattr(_current, "job", None)
+    return job["cancel_event"] if job is not None else None
+
+class JobQueue:
+    def __init__(self, max_workers: int = 4, max_pending: int = 50, max_finished: int = 200):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.max_finished = max_finished
+        self.group_limits = {"pull": 2, "compose": 1, "prune": 1}
+        self._lock = threading.Lock()
+        self._jobs = OrderedDict()
+        self._pending = {}
+        self._running = {}
+        self._executor = None
+        self._app = None
+        self._counters = {"submitted": 0, "succeeded": 0, "failed": 0, "cancelled": 0, "rejected": 0, "recorded": 0}
+
+    def handles(self, action: str) -> bool:
+        return action in JOB_ACTIONS and current_app.config.get('JOB_QUEUE_ENABLED', True)
+
+    def submit(self, action: str, handler, params: dict, command: str = None) -> tuple[dict, str]:
+        app = current_app._get_current_object()
+        group = JOB_ACTIONS[action]
+        with self._lock:
+            if self._executor is None:
+                self._configure(app)
+            queued = sum(len(jobs) for jobs in self._pending.values())
+            if queued >= self.max_pending:
+                self._counters["rejected"] += 1
+                return None, f"Error: Antrean job penuh ({queued} job menunggu). Coba lagi nanti."
+
+            job = {
+                "id": uuid.uuid4().hex[:12],
+                "action": action,
+                "group": group,
+                "host": current_host(),
+                "command": command,
+                "status": "queued",
+                "created_at": time.time(),
+                "started_at": None,
+                "finished_at": None,
+                "output": None,
+                "error": None,
+                "output_type": None,
+                "progress": None,
+                "log": [],
+                "cancel_event": threading.Event(),
+                "conversation_id": None,
+                "recorded": False,
+            }
+            self._jobs[job["id"]] = job
+            self._pending.setdefault(group, deque()).append((job, handler, dict(params)))
+            self._counters["submitted"] += 1
+            self._dispatch(group)
+            return self._public(job), ""
+
+    def get(self, job_id: str, log_from: int = None) -> dict:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            # Workers append to the log without the lock; taking its length
+            # once keeps log_total and the returned slice consistent.
+            log_total = len(job["log"])
+            public = {**self._public(job), "log_total": log_total}
+            if log_from is not None:
+                public["log"] = job["log"][max(0, log_from):log_total]
+            return public
+
+    def cancel(self, job_id: str) -> tuple[dict, str]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None, "Job tidak ditemukan."
+            if job["status"] in FINISHED_STATES:
+                return self._public(job), "Job sudah selesai."
+            pending = self._pending.get(job["group"]) or deque()
+            entry = next((entry for entry in pending if entry[0] is job), None)
+            if entry is None and job["group"] not in CANCELLABLE_GROUPS:
+                return self._public(job), "Job ini tidak dapat dibatalkan saat sedang berjalan."
+            job["cancel_event"].set()
+            bound = False
+            if entry is not None:
+                pending.remove(entry)
+                job["status"] = "cancelled"
+                job["error"] = "Job dibatalkan sebelum dijalankan."
+                job["output_type"] = "text"
+                job["finished_at"] = time.time()
+                self._counters["cancelled"] += 1
+                self._evict_finished()
+                bound = job["conversation_id"] is not None
+            public = self._public(job)
+        if bound:
+            self._record(job)
+        return public, ""
+
+    def bind_conversation(self, job_id: str, conv_id: str, command: str):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            job["conversation_id"] = conv_id
+            job["command"] = command
+            finished = job["status"] in FINISHED_STATES
+        if finished:
+            self._record(job)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                **self._counters,
+                "max_workers": self.max_workers,
+                "group_limits": dict(self.group_limits),
+                "running": {group: count for group, count in self._running.items() if count},
+                "pending": {group: len(jobs) for group, jobs in self._pending.items() if jobs},
+                "tracked": len(self._jobs),
+            }
+
+    def _configure(self, app):
+        self._app = app
+        self.max_workers = app.config.get('JOB_MAX_WORKERS', self.max_workers)
+        self.max_pending = app.config.get('JOB_MAX_PENDING', self.max_pending)
+        self.max_finished = app.config.get('JOB_MAX_FINISHED', self.max_finished)
+        self.group_limits = {
+            "pull": app.config.get('JOB_LIMIT_PULL', self.group_limits["pull"]),
+            "compose": app.config.get('JOB_LIMIT_COMPOSE', self.group_limits["compose"]),
+            "prune": app.config.get('JOB_LIMIT_PRUNE', self.group_limits["prune"]),
+        }
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="job")
+
+    def _dispatch(self, group: str):
+        pending = self._pending.get(group)
+        while pending and self._running.get(group, 0) < self.group_limits.get(group, 1):
+            job, handler, params = pending.popleft()
+            self._running[group] = self._running.get(group, 0) + 1
+            self._executor.submit(self._run, job, handler, params)
+
+    def _run(self, job: dict, handler, params: dict):
+        app = self._app
+        with self._lock:
+            job["status"] = "running"
+            job["started_at"] = time.time()
+        _current.job = job
+        with app.app_context(), use_host(job["host"]):
+            try:
+                if job["cancel_event"].is_set():
+                    output, error = None, "Job dibatalkan sebelum dijalankan."
+                else:
+                    output, error = handler(params)
+            except Exception as e:
+                app.logger.exception(f"Job {job['id']} ({job['action']}) gagal:")
+                output, error = None, f"Error tak terduga: {str(e)}"
+            finally:
+                _current.job = None
+
+            with self._lock:
+                job["output"] = output
+                job["error"] = error or ""
+                job["output_type"] = "action_receipt" if isinstance(output, dict) else "text"
+                if error:
+                    job["status"] = "cancelled" if job["cancel_event"].is_set() else "failed"
+                else:
+                    job["status"] = "succeeded"
+                job["finished_at"] = time.time()
+                self._counters[job["status"]] += 1
+                self._running[job["group"]] -= 1
+                self._dispatch(job["group"])
+                self._evict_finished()
+                bound = job["conversation_id"] is not None
+            app.logger.info(f"Job {job['id']} ({job['action']}) {job['status']} dalam {job['finished_at'] - job['started_at']:.1f} detik.")
+            if bound:
+                self._record(job)
+
+    def _record(self, job: dict):
+        with self._lock:
+            if job["recorded"]:
+                return
+            job["recorded"] = True
+        result = {"output": job["output"], "error": job["error"], "output_type": job["output_type"], "job_id": job["id"]}
+        try:
+            with self._app.app_context():
+                history_manager.add_message_to_conversation(job["conversation_id"], f"{job['command']} [job {job['id']}]", result)
+            with self._lock:
+                self._counters["recorded"] += 1
+        except Exception as e:
+            self._app.logger.error(f"Gagal mencatat hasil job {job['id']} ke percakapan: {e}")
+
+    def _evict_finished(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job["status"] in FINISHED_STATES]
+        for job_id in finished[:max(0, len(finished) - self.max_finished)]:
+            del self._jobs[job_id]
+
+    @staticmethod
+    def _public(job: dict) -> dict:
+        now = job["finished_at"] or time.time()
+        return {
+            "job_id": job["id"],
+            "action": job["action"],
+            "host": job["host"],
+            "status": job["status"],
+            "url": f"/jobs/{job['id']}",
+            "created_at": job["created_at"],
+            "started_at": job["started_at"],
+            "finished_at": job["finished_at"],
+            "elapsed": round(now - (job["started_at"] or job["created_at"]), 2),
+            "output": job["output"],
+            "error": job["error"],
+            "output_type": job["output_type"],
+            "progress": job["progress"],
+            "log_total": len(job["log"]),
+            "cancellable": job["status"] == "queued" or (job["status"] == "running" and job["group"] in CANCELLABLE_GROUPS),
+        }
+
+jobs = JobQueue()
@@ -0,0 +1,157 @@
+import threading
+import time
+from array import array
+
+# Each container owns one ring per tier. A slot keeps the bucket start (int64),
+# the sample count (uint32) and float32 min/sum/max for every metric:
+# 8 + 4 + len(METRICS) * 3 * 4 = 84 bytes per slot. With the default tiers
+# (360 + 1440 + 1008 slots) that is 2808 slots, about 230 KB per container,
+# and METRICS_MAX_CONTAINERS caps the number of containers kept.
+METRICS = ("cpu_percent", "mem_usage", "net_rx", "net_tx", "blk_read", "blk_write")
+TIERS = (
+    (10, 360),
+    (60, 1440),
+    (600, 1008),
+)
+SLOT_BYTES = 8 + 4 + len(METRICS) * 3 * 4
+BYTES_PER_CONTAINER = sum(slots for _resolution, slots in TIERS) * SLOT_BYTES
+RETENTION_SECONDS = max(resolution * slots for resolution, slots in TIERS)
+COUNTER_METRICS = {"net_rx": "net_rx_total", "net_tx": "net_tx_total",
+                   "blk_read": "blk_read_total", "blk_write": "blk_write_total"}
+
+class _Ring:
+    def __init__(self, resolution: int, slots: int):
+        self.resolution = resolution
+        self.slots = slots
+        self.starts = array('q', bytes(8 * slots))
+        self.counts = array('I', bytes(4 * slots))
+        self.mins = {metric: array('f', bytes(4 * slots)) for metric in METRICS}
+        self.sums = {metric: array('f', bytes(4 * slots)) for metric in METRICS}
+        self.maxs = {metric: array('f', bytes(4 * slots)) for metric in METRICS}
+
+    @property
+    def span(self) -> int:
+        return self.resolution * self.slots
+
+    def add(self, timestamp: float, values: dict):
+        start = int(timestamp) - int(timestamp) % self.resolution
+        index = (start // self.resolution) % self.slots
+        if self.starts[index] != start:
+            self.starts[index] = start
+            self.counts[index] = 0
+        first = self.counts[index] == 0
+        self.counts[index] += 1
+        for metric in METRICS:
+            value = values[metric]
+            if first:
+                self.mins[metric][index] = self.maxs[metric][index] = self.sums[metric][index] = value
+                continue
+            self.sums[metric][index] += value
+            if value < self.mins[metric][index]:
+                self.mins[metric][index] = value
+            if value > self.maxs[metric][index]:
+                self.maxs[metric][index] = value
+
+    def summarize(self, metric: str, since: float) -> dict:
+        mins, sums, maxs = self.mins[metric], self.sums[metric], self.maxs[metric]
+        low, high, total, samples = None, None, 0.0, 0
+        bucket_means = []
+        for index in range(self.slots):
+            count = self.counts[index]
+            if not count or self.starts[index] + self.resolution <= since:
+                continue
+            low = mins[index] if low is None else min(low, mins[index])
+            high = maxs[index] if high is None else max(high, maxs[index])
+            total += sums[index]
+            samples += count
+            bucket_means.append(sums[index] / count)
+        if not samples:
+            return None
+        bucket_means.sort()
+        p95 = bucket_means[min(len(bucket_means) - 1, int(round(0.95 * (len(bucket_means) - 1))))]
+        return {"min": low, "avg": total / samples, "p95": p95, "max": high,
+                "samples": samples, "resolution": self.resolution}
+
+class _ContainerSeries:
+    def __init__(self, name: str, created_at: float):
+        self.name = name
+        self.rings = [_Ring(resolution, slots) for resolution, slots in TIERS]
+        self.last_counters = None
+        self.updated_at = created_at
+
+class MetricsStore:
+    def __init__(self, max_containers: int = 200):
+        self.max_containers = max_containers
+        self._lock = threading.Lock()
+        self._series = {}
+        self._counters = {"samples": 0, "evictions": 0}
+
+    def record(self, container_id: str, name: str, timestamp: float, usage: dict):
+        with self._lock:
+            series = self._series.get(container_id)
+            if series is None:
+                series = self._series[container_id] = _ContainerSeries(name, timestamp)
+                self._evict_overflow(timestamp)
+            series.name = name
+
+            counters = {metric: usage.get(total, 0) for metric, total in COUNTER_METRICS.items()}
+            previous = series.last_counters
+            series.last_counters = (timestamp, counters)
+            if previous is None:
+                return
+            elapsed = timestamp - previous[0]
+            if elapsed <= 0:
+                return
+
+            values = {"cpu_percent": usage["cpu_percent"], "mem_usage": usage["mem_usage"]}
+            for metric, value in counters.items():
+                values[metric] = max(0.0, (value - previous[1][metric]) / elapsed)
+            for ring in series.rings:
+                ring.add(timestamp, values)
+            series.updated_at = timestamp
+            self._counters["samples"] += 1
+
+    def resolve(self, name_or_id: str):
+        with self._lock:
+            if name_or_id in self._series:
+                return name_or_id
+            for container_id, series in self._series.items():
+                if series.name == name_or_id:
+                    return container_id
+            matches = [container_id for container_id in self._series if len(name_or_id) >= 4 and container_id.startswith(name_or_id)]
+            return matches[0] if len(matches) == 1 else None
+
+    def query(self, container_id: str, metric: str, window_seconds: float, now: float = None):
+        now = now or time.time()
+        with self._lock:
+            series = self._series.get(container_id)
+            if series is None:
+                return None
+            ring = next((ring for ring in series.rings if ring.span >= window_seconds), series.rings[-1])
+            return ring.summarize(metric, now - window_seconds)
+
+    def forget(self, container_id: str):
+        with self._lock:
+            self._series.pop(container_id, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                **self._counters,
+                "containers": len(self._series),
+                "max_containers": self.max_containers,
+                "bytes_per_container": BYTES_PER_CONTAINER,
+                "approx_total_bytes": BYTES_PER_CONTAINER * len(self._series),
+                "tiers": [{"resolution_seconds": resolution, "slots": slots} for resolution, slots in TIERS],
+            }
+
+    def _evict_overflow(self, now: float):
+        for container_id in [cid for cid, series in self._series.items() if series.updated_at < now - RETENTION_SECONDS]:
+            del self._series[container_id]
+            self._counters["evictions"] += 1
+        while len(self._series) > self.max_containers:
+            oldest = min(self._series, key=lambda container_id: self._series[container_id].updated_at)
+            del self._series[oldest]
+            self._counters["evictions"] += 1
+
+metrics_store = MetricsStore()
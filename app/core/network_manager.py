@@ -1,6 +1,7 @@
 import docker
 from flask import current_app
 from .docker_client import get_docker_client
+from .inventory_cache import inventory
 import json
 
 def list_networks(params: dict) -> tuple[list, str]:
@@ -8,14 +9,16 @@ def list_networks(params: dict) -> tuple[list, str]:
     if not client:
         return None, "Error: Tidak dapat terhubung ke Docker daemon."
     try:
-        networks = client.networks.list()
+        networks = inventory.list("networks")
+        if networks is None:
+            networks = client.api.networks()
         network_list = []
         for net in networks:
             network_list.append({
-                "id": net.short_id,
-                "name": net.name,
-                "driver": net.attrs.get('Driver', 'n/a'), 
-                "scope": net.attrs.get('Scope', 'local'),
+                "id": net['Id'][:12],
+                "name": net.get('Name'),
+                "driver": net.get('Driver', 'n/a'), 
+                "scope": net.get('Scope', 'local'),
             })
         return network_list, ""
     except docker.errors.APIError as e:
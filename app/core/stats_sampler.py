@@ -0,0 +1,170 @@
+import threading
+import time
+from flask import current_app
+from .docker_client import create_docker_client, get_docker_client
+from .inventory_cache import inventory
+from .metrics_store import metrics_store
+
+def compute_usage(stats: dict) -> dict:
+    cpu_stats = stats.get('cpu_stats', {})
+    precpu_stats = stats.get('precpu_stats', {})
+    cpu_usage = cpu_stats.get('cpu_usage', {}).get('total_usage', 0)
+    system_cpu_usage = cpu_stats.get('system_cpu_usage', 0)
+    mem_usage = stats.get('memory_stats', {}).get('usage', 0) / (1024*1024)
+    mem_limit = stats.get('memory_stats', {}).get('limit', 0) / (1024*1024)
+    cpu_delta = cpu_usage - precpu_stats.get('cpu_usage', {}).get('total_usage', 0)
+    system_delta = system_cpu_usage - precpu_stats.get('system_cpu_usage', 0)
+
+    cpu_percent = 0.0
+    if system_delta > 0.0 and cpu_delta > 0.0:
+        number_cpus = cpu_stats.get('online_cpus')
+        if number_cpus is None:
+            per_cpu_usage_list = cpu_stats.get('cpu_usage', {}).get('percpu_usage')
+            if per_cpu_usage_list:
+                number_cpus = len(per_cpu_usage_list)
+            else:
+                number_cpus = 1
+
+        cpu_percent = (cpu_delta / system_delta) * number_cpus * 100.0
+
+    networks = stats.get('networks') or {}
+    blkio = stats.get('blkio_stats', {}).get('io_service_bytes_recursive') or []
+    return {
+        "cpu_percent": cpu_percent, "mem_usage": mem_usage, "mem_limit": mem_limit,
+        "net_rx_total": sum(net.get('rx_bytes', 0) for net in networks.values()),
+        "net_tx_total": sum(net.get('tx_bytes', 0) for net in networks.values()),
+        "blk_read_total": sum(entry.get('value', 0) for entry in blkio if str(entry.get('op', '')).lower() == 'read'),
+        "blk_write_total": sum(entry.get('value', 0) for entry in blkio if str(entry.get('op', '')).lower() == 'write'),
+    }
+
+class StatsSampler:
+    def __init__(self, reconcile_interval: float = 10.0, max_containers: int = 100):
+        self.reconcile_interval = reconcile_interval
+        self.max_containers = max_containers
+        self._lock = threading.Lock()
+        self._latest = {}
+        self._workers = {}
+        self._wanted = {}
+        self._client = None
+        self._thread = None
+        self._stop = threading.Event()
+        self._counters = {"samples": 0, "subscriptions": 0, "stream_errors": 0, "skipped": 0}
+
+    def ensure_started(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        app = current_app._get_current_object()
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self.reconcile_interval = app.config.get('STATS_SAMPLER_INTERVAL', self.reconcile_interval)
+            self.max_containers = app.config.get('STATS_SAMPLER_MAX_CONTAINERS', self.max_containers)
+            metrics_store.max_containers = app.config.get('METRICS_MAX_CONTAINERS', metrics_store.max_containers)
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, args=(app,), name="stats-sampler", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def snapshot(self) -> list:
+        with self._lock:
+            wanted = dict(self._wanted)
+            latest = dict(self._latest)
+        now = time.time()
+        rows = []
+        for container_id, name in wanted.items():
+            sample = latest.get(container_id)
+            if sample is None:
+                rows.append({"container_id": container_id, "container_name": name, "sample": None, "age": None})
+            else:
+                rows.append({"container_id": container_id, "container_name": name, "sample": sample, "age": now - sample["sampled_at"]})
+        return rows
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                **self._counters,
+                "running": self._thread is not None and self._thread.is_alive(),
+                "tracked": len(self._wanted),
+                "active_streams": sum(1 for worker in self._workers.values() if worker.is_alive()),
+                "sampled": len(self._latest),
+                "max_containers": self.max_containers,
+            }
+
+    def _running_containers(self, client) -> dict:
+        summaries = inventory.list("containers")
+        if summaries is None:
+            summaries = client.api.containers()
+        running = {}
+        for summary in summaries:
+            if summary.get('State') != 'running':
+                continue
+            names = summary.get('Names') or []
+            running[summary['Id']] = names[0].lstrip('/') if names else summary['Id'][:12]
+        return running
+
+    def _run(self, app):
+        with app.app_context():
+            while not self._stop.is_set():
+                try:
+                    self._reconcile(app)
+                except Exception as e:
+                    app.logger.warning(f"Stats sampler gagal menyinkronkan daftar kontainer: {e}")
+                self._stop.wait(self.reconcile_interval)
+
+    def _reconcile(self, app):
+        if not get_docker_client():
+            return
+        if self._client is None:
+            self._client = create_docker_client(max_pool_size=self.max_containers + 4)
+        running = self._running_containers(self._client)
+        skipped = max(0, len(running) - self.max_containers)
+        if skipped:
+            running = dict(list(running.items())[:self.max_containers])
+
+        with self._lock:
+            self._counters["skipped"] = skipped
+            self._wanted = running
+            for container_id in list(self._latest):
+                if container_id not in running:
+                    del self._latest[container_id]
+            for container_id in list(self._workers):
+                if container_id not in running and not self._workers[container_id].is_alive():
+                    del self._workers[container_id]
+            for container_id in running:
+                worker = self._workers.get(container_id)
+                if worker is None or not worker.is_alive():
+                    worker = threading.Thread(target=self._follow, args=(app, container_id),
+                                              name=f"stats-{container_id[:12]}", daemon=True)
+                    self._workers[container_id] = worker
+                    self._counters["subscriptions"] += 1
+                    worker.start()
+
+    def _follow(self, app, container_id: str):
+        stream = None
+        try:
+            stream = self._client.api.stats(container_id, decode=True, stream=True)
+            for stats in stream:
+                if self._stop.is_set() or container_id not in self._wanted:
+                    break
+                if not stats.get('precpu_stats', {}).get('system_cpu_usage'):
+                    continue
+                sample = compute_usage(stats)
+                sample["sampled_at"] = time.time()
+                with self._lock:
+                    name = self._wanted.get(container_id)
+                    if name is not None:
+                        self._latest[container_id] = sample
+                    self._counters["samples"] += 1
+                if name is not None:
+                    metrics_store.record(container_id, name, sample["sampled_at"], sample)
+        except Exception as e:
+            with self._lock:
+                self._counters["stream_errors"] += 1
+            app.logger.debug(f"Stream stats {container_id[:12]} berhenti: {e}")
+        finally:
+            if stream is not None:
+                stream.close()
+
+stats_sampler = StatsSampler()
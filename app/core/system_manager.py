@@ -1,9 +1,12 @@
 import docker
+import hashlib
+import json
 from flask import current_app
-from .docker_client import get_docker_client
+from .docker_client import fan_out, get_docker_client, host_names
+from .inventory_cache import inventory
 
 def prune_system(params: dict) -> tuple[dict, str]:
-    client = get_docker_client()
+    client = get_docker_client(long_running=True)
     if not client:
         return None, "Error: Tidak dapat terhubung ke Docker daemon."
     try:
@@ -60,4 +63,67 @@ def system_version(params: dict) -> tuple[str, str]:
         formatted_json = json.dumps(version_info, indent=2)
         return formatted_json, ""
     except Exception as e:
-        return None, f"Error tak terduga saat mengambil versi sistem: {str(e)}"
\ No newline at end of file
+        return None, f"Error tak terduga saat mengambil versi sistem: {str(e)}"
+
+def refresh_inventory(params: dict) -> tuple[dict, str]:
+    client = get_docker_client()
+    if not client:
+        return None, "Error: Tidak dapat terhubung ke Docker daemon."
+    if not current_app.config.get('INVENTORY_CACHE_ENABLED', True):
+        return None, "Error: Cache inventaris dinonaktifkan (INVENTORY_CACHE_ENABLED)."
+    try:
+        inventory.ensure_started()
+        counts = inventory.refresh(client)
+        output = {
+            "action": "Refresh",
+            "status": "Inventaris Berhasil Dimuat Ulang",
+            "resource_type": "Inventaris Docker",
+            "resource_name": "Global",
+            "details": [
+                {"key": "Kontainer", "value": str(counts["containers"])},
+                {"key": "Image", "value": str(counts["images"])},
+                {"key": "Volume", "value": str(counts["volumes"])},
+                {"key": "Network", "value": str(counts["networks"])},
+            ]
+        }
+        return output, ""
+    except docker.errors.APIError as e:
+        return None, f"Error Docker API saat refresh inventaris: {e.explanation or str(e)}"
+    except Exception as e:
+        return None, f"Error tak terduga saat refresh inventaris: {str(e)}"
+
+def _host_state(params: dict) -> tuple[list, str]:
+    client = get_docker_client()
+    if not client:
+        return None, "Error: Tidak dapat terhubung ke Docker daemon."
+    containers = sorted(
+        (c['Id'], c.get('State', ''), c.get('ImageID', ''), ','.join(c.get('Names') or []))
+        for c in client.api.containers(all=True)
+    )
+    images = sorted(client.api.images(quiet=True))
+    volumes = sorted(v['Name'] for v in (client.api.volumes().get('Volumes') or []))
+    networks = sorted(n['Id'] for n in client.api.networks())
+    digest = hashlib.sha1(json.dumps([containers, images, volumes, networks]).encode('utf-8'))
+    return [{"state": digest.hexdigest()}], ""
+
+# Answers may come from any configured host (host-qualified or fanned-out
+# tool calls), so the fingerprint covers every host. The default host is
+# identified by the inventory cache's generation while it is live; the
+# others are listed in parallel under DOCKER_FANOUT_DEADLINE. Hosts that do
+# not answer are recorded as missing rather than dropping the fingerprint.
+def docker_state_fingerprint() -> str:
+    hosts = host_names()
+    state = {}
+    generation = inventory.generation()
+    if generation is not None:
+        state[hosts[0]] = f"inventaris:{generation}"
+        hosts = hosts[1:]
+    if hosts:
+        rows, _error = fan_out(_host_state, {}, hosts)
+        state.update({row["host"]: row["state"] for row in rows})
+    if not state:
+        current_app.logger.warning("Fingerprint state Docker tidak dapat dihitung: tidak ada host yang menjawab.")
+        return None
+    missing = sorted(host for host in host_names() if host not in state)
+    digest = hashlib.sha1(json.dumps([state, missing], sort_keys=True).encode('utf-8'))
+    return digest.hexdigest()
@@ -1,6 +1,7 @@
 import docker
 from flask import current_app
 from .docker_client import get_docker_client
+from .inventory_cache import inventory
 import json
 
 def list_volumes(params: dict) -> tuple[list, str]:
@@ -8,13 +9,15 @@ def list_volumes(params: dict) -> tuple[list, str]:
     if not client:
         return None, "Error: Tidak dapat terhubung ke Docker daemon."
     try:
-        volumes = client.volumes.list()
+        volumes = inventory.list("volumes")
+        if volumes is None:
+            volumes = client.api.volumes().get('Volumes') or []
         volume_list = []
         for vol in volumes:
             volume_list.append({
-                "name": vol.name,
-                "driver": vol.attrs.get('Driver', 'n/a'), 
-                "created_at": vol.attrs.get('CreatedAt', '-')[:19].replace('T', ' ')
+                "name": vol['Name'],
+                "driver": vol.get('Driver', 'n/a'), 
+                "created_at": vol.get('CreatedAt', '-')[:19].replace('T', ' ')
             })
         return volume_list, ""
     except docker.errors.APIError as e:
@@ -1,7 +1,11 @@
+# Optional "di host <nama>" suffix for commands that can target one of the
+# Docker hosts in DOCKER_HOSTS instead of the default host.
+HOST_QUALIFIER = r"(?:\s+di\s+host\s+(?P<host>[a-zA-Z0-9_.-]+))?"
+
 COMMAND_GUIDE = [
     {
         "id": "list_all_containers",
-        "pattern": r"^(?:tampilkan|list|lihat)\s+semua\s+(?:container|kontainer)(?:s)?|docker\s+ps\s+-a$",
+        "pattern": r"^(?:(?:tampilkan|list|lihat)\s+semua\s+(?:container|kontainer)(?:s)?|docker\s+ps\s+-a)" + HOST_QUALIFIER + "$",
         "action": "list_containers",
         "params_map": {"all": True},
         "description": "Menampilkan semua kontainer (berjalan dan berhenti).",
@@ -9,7 +13,7 @@ COMMAND_GUIDE = [
     },
     {
         "id": "list_running_containers",
-        "pattern": r"^(?:tampilkan|list|lihat)\s+(?:(?:container|kontainer)(?:s)?(?:(?:\s+sedang|\s+yang)?\s+(?:jalan|aktif|running))?)?$|docker\s+ps$",
+        "pattern": r"^(?:(?:tampilkan|list|lihat)\s+(?:(?:container|kontainer)(?:s)?(?:(?:\s+sedang|\s+yang)?\s+(?:jalan|aktif|running))?)?|docker\s+ps)" + HOST_QUALIFIER + "$",
         "action": "list_containers",
         "params_map": {"all": False},
         "description": "Menampilkan hanya kontainer yang sedang berjalan.",
@@ -17,7 +21,7 @@ COMMAND_GUIDE = [
     },
     {
         "id": "run_container_name_first",
-        "pattern": r"^(?:jalankan|nyalakan|start|buat|run)\s+(?:(?:kontainer|container|layanan|servis)\s+)?(?P<name>[a-zA-Z0-9_.-]+)\s+(?:dari\s+image\s+)?(?P<image>[a-zA-Z0-9/:_.-]+)(?:\s+dengan\s+port(?:s)?\s+(?P<ports>\d{1,5}:\d{1,5}(?:,\d{1,5}:\d{1,5})*))?$",
+        "pattern": r"^(?:jalankan|nyalakan|start|buat|run)\s+(?:(?:kontainer|container|layanan|servis)\s+)?(?P<name>[a-zA-Z0-9_.-]+)\s+(?:dari\s+image\s+)?(?P<image>[a-zA-Z0-9/:_.-]+)(?:\s+dengan\s+port(?:s)?\s+(?P<ports>\d{1,5}:\d{1,5}(?:,\d{1,5}:\d{1,5})*))?" + HOST_QUALIFIER + "$",
         "action": "run_container",
         "description": "Menjalankan kontainer baru (Format: run NAMA dari IMAGE).",
         "example": "run webku nginx:latest",
@@ -25,7 +29,7 @@ COMMAND_GUIDE = [
     },
     {
         "id": "run_container_image_first",
-        "pattern": r"^(?:jalankan|nyalakan|start|buat|run)\s+(?:dari\s+)?image\s+(?P<image>[a-zA-Z0-9/:_.-]+)\s+(?:sebagai|as)\s+(?:(?:kontainer|container)\s+)?(?P<name>[a-zA-Z0-9_.-]+)(?:\s+dengan\s+port(?:s)?\s+(?P<ports>\d{1,5}:\d{1,5}(?:,\d{1,5}:\d{1,5})*))?$",
+        "pattern": r"^(?:jalankan|nyalakan|start|buat|run)\s+(?:dari\s+)?image\s+(?P<image>[a-zA-Z0-9/:_.-]+)\s+(?:sebagai|as)\s+(?:(?:kontainer|container)\s+)?(?P<name>[a-zA-Z0-9_.-]+)(?:\s+dengan\s+port(?:s)?\s+(?P<ports>\d{1,5}:\d{1,5}(?:,\d{1,5}:\d{1,5})*))?" + HOST_QUALIFIER + "$",
         "action": "run_container",
         "description": "Menjalankan kontainer baru (Format: run image IMAGE as NAMA).",
         "example": "run image nginx:latest as webku",
@@ -33,49 +37,49 @@ COMMAND_GUIDE = [
     },
     {
         "id": "start_container_verb_first",
-        "pattern": r"^(?:hidupkan|nyalakan|start|mulai)\s+(?:(?:kontainer|container|layanan|servis)\s+)?(?P<name>[a-zA-Z0-9_.-]+)$",
+        "pattern": r"^(?:hidupkan|nyalakan|start|mulai)\s+(?:(?:kontainer|container|layanan|servis)\s+)?(?P<name>[a-zA-Z0-9_.-]+)" + HOST_QUALIFIER + "$",
         "action": "start_container",
         "description": "Menghidupkan kontainer (Format: start NAMA).",
         "example": "start webku"
     },
     {
         "id": "start_container_noun_first",
-        "pattern": r"^(?:kontainer|container|layanan|servis)\s+(?P<name>[a-zA-Z0-9_.-]+)\s+(?:hidupkan|nyalakan|start|mulai)$",
+        "pattern": r"^(?:kontainer|container|layanan|servis)\s+(?P<name>[a-zA-Z0-9_.-]+)\s+(?:hidupkan|nyalakan|start|mulai)" + HOST_QUALIFIER + "$",
         "action": "start_container",
         "description": "Menghidupkan kontainer (Format: container NAMA start).",
         "example": "container webku start"
     },
     {
         "id": "stop_container_verb_first",
-        "pattern": r"^(?:hentikan|matikan|stop)\s+(?:(?:kontainer|container|layanan|servis)\s+)?(?P<name>[a-zA-Z0-9_.-]+)$",
+        "pattern": r"^(?:hentikan|matikan|stop)\s+(?:(?:kontainer|container|layanan|servis)\s+)?(?P<name>[a-zA-Z0-9_.-]+)" + HOST_QUALIFIER + "$",
         "action": "stop_container",
         "description": "Menghentikan kontainer (Format: stop NAMA).",
         "example": "stop webku"
     },
     {
         "id": "stop_container_noun_first",
-        "pattern": r"^(?:kontainer|container|layanan|servis)\s+(?P<name>[a-zA-Z0-9_.-]+)\s+(?:hentikan|matikan|stop)$",
+        "pattern": r"^(?:kontainer|container|layanan|servis)\s+(?P<name>[a-zA-Z0-9_.-]+)\s+(?:hentikan|matikan|stop)" + HOST_QUALIFIER + "$",
         "action": "stop_container",
         "description": "Menghentikan kontainer (Format: container NAMA stop).",
         "example": "container webku stop"
     },
     {
         "id": "remove_container_verb_first",
-        "pattern": r"^(?:hapus|buang|remove|rm)\s+(?:(?:kontainer|container|layanan|servis)\s+)?(?P<name>[a-zA-Z0-9_.-]+)$",
+        "pattern": r"^(?:hapus|buang|remove|rm)\s+(?:(?:kontainer|container|layanan|servis)\s+)?(?P<name>[a-zA-Z0-9_.-]+)" + HOST_QUALIFIER + "$",
         "action": "remove_container",
         "description": "Menghapus kontainer (Format: rm NAMA).",
         "example": "rm webku_lama"
     },
     {
         "id": "remove_container_noun_first",
-        "pattern": r"^(?:kontainer|container|layanan|servis)\s+(?P<name>[a-zA-Z0-9_.-]+)\s+(?:hapus|buang|remove|rm)$",
+        "pattern": r"^(?:kontainer|container|layanan|servis)\s+(?P<name>[a-zA-Z0-9_.-]+)\s+(?:hapus|buang|remove|rm)" + HOST_QUALIFIER + "$",
         "action": "remove_container",
         "description": "Menghapus kontainer (Format: container NAMA rm).",
         "example": "container webku_lama rm"
     },
     {
         "id": "view_logs_verb_first",
-        "pattern": r"^(?:(?:lihat|tampilkan)\s+log(?:s)?|docker\s+logs)\s+(?:(?:dari\s+)?(?:kontainer|container|layanan|servis)\s+)?(?P<name>[a-zA-Z0-9_.-]+)(?:\s+sebanyak\s+(?P<lines>\d+)\s+baris)?$",
+        "pattern": r"^(?:(?:lihat|tampilkan)\s+log(?:s)?|docker\s+logs)\s+(?:(?:dari\s+)?(?:kontainer|container|layanan|servis)\s+)?(?P<name>[a-zA-Z0-9_.-]+)(?:\s+sebanyak\s+(?P<lines>\d+)\s+baris)?" + HOST_QUALIFIER + "$",
         "action": "view_logs",
         "description": "Melihat log kontainer (Format: lihat log NAMA).",
         "example": "lihat log webku",
@@ -83,36 +87,44 @@ COMMAND_GUIDE = [
     },
     {
         "id": "view_logs_noun_first",
-        "pattern": r"^(?:lihat|tampilkan)\s+(?:kontainer|container|layanan|servis)\s+(?P<name>[a-zA-Z0-9_.-]+)\s+log(?:s)?(?:\s+sebanyak\s+(?P<lines>\d+)\s+baris)?$",
+        "pattern": r"^(?:lihat|tampilkan)\s+(?:kontainer|container|layanan|servis)\s+(?P<name>[a-zA-Z0-9_.-]+)\s+log(?:s)?(?:\s+sebanyak\s+(?P<lines>\d+)\s+baris)?" + HOST_QUALIFIER + "$",
         "action": "view_logs",
         "description": "Melihat log kontainer (Format: lihat container NAMA log).",
         "example": "lihat container webku log",
         "required_params": ["name"]
     },
+    {
+        "id": "view_all_stats",
+        "pattern": r"^(?:(?:lihat|tampilkan)\s+)?(?:stats|statistik|docker\s+stats)\s+semua(?:\s+(?:kontainer|container)(?:s)?)?(?:\s+(?:urut|sort)\s+(?P<sort>cpu|mem|memori|nama|name))?$",
+        "action": "view_all_stats",
+        "description": "Melihat statistik CPU/memori semua kontainer yang berjalan sekaligus, diurutkan (default: CPU tertinggi).",
+        "example": "stats semua urut memori",
+        "required_params": []
+    },
     {
         "id": "view_stats_verb_first",
-        "pattern": r"^(?:(?:lihat|tampilkan)\s+stats|docker\s+stats)\s+(?:(?:dari\s+)?(?:kontainer|container)\s+)?(?P<name>[a-zA-Z0-9_.-]+)$",
+        "pattern": r"^(?:(?:lihat|tampilkan)\s+stats|docker\s+stats)\s+(?:(?:dari\s+)?(?:kontainer|container)\s+)?(?P<name>[a-zA-Z0-9_.-]+)" + HOST_QUALIFIER + "$",
         "action": "view_stats",
         "description": "Melihat statistik kontainer (Format: lihat stats NAMA).",
         "example": "lihat stats webku"
     },
     {
         "id": "view_stats_noun_first",
-        "pattern": r"^(?:lihat|tampilkan)\s+(?:kontainer|container)\s+(?P<name>[a-zA-Z0-9_.-]+)\s+stats$",
+        "pattern": r"^(?:lihat|tampilkan)\s+(?:kontainer|container)\s+(?P<name>[a-zA-Z0-9_.-]+)\s+stats" + HOST_QUALIFIER + "$",
         "action": "view_stats",
         "description": "Melihat statistik kontainer (Format: lihat container NAMA stats).",
         "example": "lihat container webku stats"
     },
     {
         "id": "pull_image",
-        "pattern": r"^(?:(?:tarik|pull)\s+image|docker\s+pull)\s+(?P<image>[a-zA-Z0-9/:_.-]+)$",
+        "pattern": r"^(?:(?:tarik|pull)\s+image|docker\s+pull)\s+(?P<image>[a-zA-Z0-9/:_.-]+)" + HOST_QUALIFIER + "$",
         "action": "pull_image",
         "description": "Menarik (pull) image dari registry.",
         "example": "docker pull alpine:latest"
     },
     {
         "id": "list_images",
-        "pattern": r"^(?:tampilkan|list|lihat)\s+image(?:s)?|docker\s+images$",
+        "pattern": r"^(?:(?:tampilkan|list|lihat)\s+image(?:s)?|docker\s+images)" + HOST_QUALIFIER + "$",
         "action": "list_images",
         "description": "Menampilkan semua image Docker yang ada di lokal.",
         "example": "docker images"
@@ -134,84 +146,84 @@ COMMAND_GUIDE = [
     },
     {
         "id": "list_volumes",
-        "pattern": r"^(?:tampilkan|list|lihat)\s+volume(?:s)?|docker\s+volume\s+ls$",
+        "pattern": r"^(?:(?:tampilkan|list|lihat)\s+volume(?:s)?|docker\s+volume\s+ls)" + HOST_QUALIFIER + "$",
         "action": "list_volumes",
         "description": "Menampilkan semua volume Docker.",
         "example": "list volumes"
     },
     {
         "id": "remove_volume",
-        "pattern": r"^(?:hapus|rm)\s+volume\s+(?P<name>[a-zA-Z0-9_.-]+)$",
+        "pattern": r"^(?:hapus|rm)\s+volume\s+(?P<name>[a-zA-Z0-9_.-]+)" + HOST_QUALIFIER + "$",
         "action": "remove_volume",
         "description": "Menghapus volume yang tidak terpakai.",
         "example": "rm volume data_lama"
     },
     {
         "id": "list_networks",
-        "pattern": r"^(?:tampilkan|list|lihat)\s+network(?:s)?|docker\s+network\s+ls$",
+        "pattern": r"^(?:(?:tampilkan|list|lihat)\s+network(?:s)?|docker\s+network\s+ls)" + HOST_QUALIFIER + "$",
         "action": "list_networks",
         "description": "Menampilkan semua network Docker.",
         "example": "list networks"
     },
     {
         "id": "inspect_object",
-        "pattern": r"^(?:periksa|inspect|detail)\s+(?P<object_type>container|kontainer|image|volume|network)\s+(?P<name>[a-zA-Z0-9_.-]+)$",
+        "pattern": r"^(?:periksa|inspect|detail)\s+(?P<object_type>container|kontainer|image|volume|network)\s+(?P<name>[a-zA-Z0-9_.-]+)" + HOST_QUALIFIER + "$",
         "action": "inspect_object",
         "description": "Menampilkan informasi detail (JSON) dari sebuah objek.",
         "example": "inspect container webku"
     },
     {
         "id": "system_prune",
-        "pattern": r"^(?:sistem\s+bersihkan|system\s+prune)$",
+        "pattern": r"^(?:sistem\s+bersihkan|system\s+prune)" + HOST_QUALIFIER + "$",
         "action": "prune_system",
         "description": "Membersihkan kontainer, image, volume, dan network yang tidak terpakai.",
         "example": "system prune"
     },
     {
         "id": "restart_container",
-        "pattern": r"^(?:restart|mulai ulang)\s+(?:(?:kontainer|container)\s+)?(?P<name>[a-zA-Z0-9_.-]+)$",
+        "pattern": r"^(?:restart|mulai ulang)\s+(?:(?:kontainer|container)\s+)?(?P<name>[a-zA-Z0-9_.-]+)" + HOST_QUALIFIER + "$",
         "action": "restart_container",
         "description": "Me-restart kontainer yang sedang berjalan.",
         "example": "restart webku"
     },
     {
         "id": "remove_image",
-        "pattern": r"^(?:hapus|rm|remove)\s+image\s+(?P<name>[a-zA-Z0-9/:_.-]+)$",
+        "pattern": r"^(?:hapus|rm|remove)\s+image\s+(?P<name>[a-zA-Z0-9/:_.-]+)" + HOST_QUALIFIER + "$",
         "action": "remove_image",
         "description": "Menghapus sebuah image.",
         "example": "rm image nginx:latest"
     },
     {
         "id": "system_info",
-        "pattern": r"^(?:sistem\s+info|system\s+info|docker\s+info)$",
+        "pattern": r"^(?:sistem\s+info|system\s+info|docker\s+info)" + HOST_QUALIFIER + "$",
         "action": "system_info",
         "description": "Menampilkan informasi sistem Docker (JSON).",
         "example": "docker info"
     },
     {
         "id": "system_version",
-        "pattern": r"^(?:sistem\s+versi|system\s+version|docker\s+version)$",
+        "pattern": r"^(?:sistem\s+versi|system\s+version|docker\s+version)" + HOST_QUALIFIER + "$",
         "action": "system_version",
         "description": "Menampilkan versi komponen Docker (JSON).",
         "example": "docker version"
     },
     {
         "id": "pause_container",
-        "pattern": r"^(?:pause|jeda)\s+(?:(?:kontainer|container)\s+)?(?P<name>[a-zA-Z0-9_.-]+)$",
+        "pattern": r"^(?:pause|jeda)\s+(?:(?:kontainer|container)\s+)?(?P<name>[a-zA-Z0-9_.-]+)" + HOST_QUALIFIER + "$",
         "action": "pause_container",
         "description": "Menghentikan sementara (pause) sebuah kontainer.",
         "example": "pause webku"
     },
     {
         "id": "unpause_container",
-        "pattern": r"^(?:unpause|lanjutkan)\s+(?:(?:kontainer|container)\s+)?(?P<name>[a-zA-Z0-9_.-]+)$",
+        "pattern": r"^(?:unpause|lanjutkan)\s+(?:(?:kontainer|container)\s+)?(?P<name>[a-zA-Z0-9_.-]+)" + HOST_QUALIFIER + "$",
         "action": "unpause_container",
         "description": "Melanjutkan kembali kontainer yang di-pause.",
         "example": "unpause webku"
     },
     {
         "id": "create_volume",
-        "pattern": r"^(?:buat|create)\s+volume\s+(?P<name>[a-zA-Z0-9_.-]+)$",
+        "pattern": r"^(?:buat|create)\s+volume\s+(?P<name>[a-zA-Z0-9_.-]+)" + HOST_QUALIFIER + "$",
         "action": "create_volume",
         "description": "Membuat volume Docker baru.",
         "example": "create volume data_baru"
@@ -240,14 +252,14 @@ COMMAND_GUIDE = [
     },
     {
         "id": "rename_container",
-        "pattern": r"^(?:rename|ganti nama)\s+(?:(?:kontainer|container)\s+)?(?P<old_name>[a-zA-Z0-9_.-]+)\s+(?:to|ke|menjadi)\s+(?P<new_name>[a-zA-Z0-9_.-]+)$",
+        "pattern": r"^(?:rename|ganti nama)\s+(?:(?:kontainer|container)\s+)?(?P<old_name>[a-zA-Z0-9_.-]+)\s+(?:to|ke|menjadi)\s+(?P<new_name>[a-zA-Z0-9_.-]+)" + HOST_QUALIFIER + "$",
         "action": "rename_container",
         "description": "Mengganti nama sebuah kontainer.",
         "example": "rename container web_lama ke web_baru"
     },
     {
         "id": "remove_network",
-        "pattern": r"^(?:hapus|rm|remove)\s+network\s+(?P<name>[a-zA-Z0-9_.-]+)$",
+        "pattern": r"^(?:hapus|rm|remove)\s+network\s+(?P<name>[a-zA-Z0-9_.-]+)" + HOST_QUALIFIER + "$",
         "action": "remove_network",
         "description": "Menghapus sebuah network.",
         "example": "rm network my_app_net"
@@ -267,5 +279,44 @@ COMMAND_GUIDE = [
         "description": "Membangun (build) image untuk service docker-compose.",
         "example": "compose-build",
         "required_params": []
+    },
+    {
+        "id": "refresh_inventory",
+        "pattern": r"^(?:refresh|muat\s+ulang|segarkan)\s+(?:inventaris|inventory)$",
+        "action": "refresh_inventory",
+        "description": "Memuat ulang cache inventaris Docker (kontainer, image, volume, network) secara penuh.",
+        "example": "refresh inventaris"
+    },
+    {
+        "id": "view_metrics_history",
+        "pattern": r"^(?:(?:riwayat|history|grafik)\s+(?:metrik\s+)?|(?=(?:cpu|memori|memory|mem|ram|jaringan|network|net|disk|io)\s+(?:kontainer|container)\s))(?P<metric>cpu|memori|memory|mem|ram|jaringan|network|net|disk|io)\s+(?:(?:kontainer|container)\s+)?(?P<name>[a-zA-Z0-9_.-]+)(?:\s+(?P<amount>\d{1,4})\s*(?P<unit>menit|jam|hari|m|h|d))?(?:\s+terakhir)?$",
+        "action": "view_metrics_history",
+        "description": "Melihat riwayat metrik kontainer (min/avg/p95/max) untuk cpu, memori, jaringan, atau disk dalam rentang waktu tertentu. Diawali 'riwayat', 'history' atau 'grafik', atau sebut 'kontainer' setelah metrik.",
+        "example": "riwayat cpu nginx 1 jam terakhir",
+        "required_params": ["metric", "name"]
+    },
+    {
+        "id": "follow_logs",
+        "pattern": r"^(?:(?:ikuti|follow|pantau)\s+log(?:s)?|(?:docker\s+)?logs?\s+-f|tail\s+-f)\s+(?:(?:dari\s+)?(?:kontainer|container|layanan|servis)\s+)?(?P<name>[a-zA-Z0-9_.-]+)(?:\s+sebanyak\s+(?P<lines>\d+)\s+baris)?$",
+        "action": "follow_logs",
+        "description": "Mengikuti log kontainer secara langsung (streaming) di jendela chat.",
+        "example": "ikuti log webku",
+        "required_params": ["name"]
+    },
+    {
+        "id": "search_logs",
+        "pattern": r"^(?:cari|search|grep)(?:\s+(?P<mode>regex))?\s+['\"](?P<query>.+?)['\"]\s+(?:di|dalam|in)\s+log(?:s)?\s+(?:semua\s+(?:kontainer|container)(?:s)?|(?:kontainer|container|layanan|servis)\s+(?P<names>[a-zA-Z0-9_.,-]+))(?:\s+sejak\s+(?P<amount>\d+)\s+(?P<unit>menit|jam|hari|m|h|d)(?:\s+(?:yang\s+)?lalu)?)?(?:\s+sampai\s+(?P<until_amount>\d+)\s+(?P<until_unit>menit|jam|hari|m|h|d)(?:\s+(?:yang\s+)?lalu)?)?(?:\s+maks(?:imal)?\s+(?P<limit>\d+))?" + HOST_QUALIFIER + "$",
+        "action": "search_logs",
+        "description": "Mencari teks di log banyak kontainer sekaligus dalam rentang waktu tertentu (default 1 jam terakhir). Teks dicocokkan apa adanya; isi mode 'regex' untuk mencari dengan pola regex. Parameter names berisi nama kontainer dipisah koma, kosongkan untuk semua kontainer.",
+        "example": "cari 'timeout' di log semua kontainer sejak 30 menit lalu",
+        "required_params": ["query"]
+    },
+    {
+        "id": "bulk_container_action",
+        "pattern": r"^(?P<operation>hentikan|matikan|stop|hidupkan|nyalakan|start|restart|mulai\s+ulang|mulai|pause|jeda|unpause|lanjutkan|hapus|buang|remove|rm)\s+(?:(?P<all>semua)\s+)?(?:kontainer|container|layanan|servis)(?:s)?(?:\s+(?!(?:dengan|label|berstatus|status)\b)(?P<names>[a-zA-Z0-9_.*?\[\],-]+))?(?:\s+(?:dengan\s+)?label\s+(?P<label>[a-zA-Z0-9_./-]+(?:=[a-zA-Z0-9_./:-]+)?))?(?:\s+(?:ber)?status\s+(?P<status>running|exited|paused|created|restarting|dead))?" + HOST_QUALIFIER + "$",
+        "action": "bulk_container_action",
+        "description": "Menjalankan stop/start/restart/pause/unpause/hapus ke banyak kontainer sekaligus. Pilih dengan daftar nama dipisah koma atau pola glob (names), label KEY atau KEY=VALUE (label), status (status), atau 'semua' (all).",
+        "example": "hentikan kontainer web-*,db-test",
+        "required_params": ["operation"]
     }
-]
\ No newline at end of file
+]
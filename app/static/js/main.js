@@ -1,6 +1,18 @@
 document.addEventListener("DOMContentLoaded", () => {
+  const MESSAGE_PAGE_SIZE = 20;
+  const CONVERSATION_PAGE_SIZE = 50;
+  const LOG_STREAM_MAX_ROWS = 500;
+  const JOB_POLL_INTERVAL_MS = 1000;
+  const JOB_LOG_MAX_LINES = 500;
+
   let activeConversationId = null;
   let conversations = [];
+  let conversationsCursor = null;
+  let messagesCursor = null;
+  let isLoadingOlderMessages = false;
+  let isLoadingConversations = false;
+  const activeLogStreams = new Set();
+  const activeJobPolls = new Set();
 
   const commandForm = document.getElementById("commandForm");
   const commandInput = document.getElementById("commandInput");
@@ -127,12 +139,20 @@ document.addEventListener("DOMContentLoaded", () => {
 
   function createTableRenderer(config) {
     return function (data) {
+      const withHost = data.some((item) => item.host);
       const rows = data.map((item) => {
         const rowTemplate = document.getElementById(config.rowTemplateId).content.cloneNode(true);
         config.mapDataToRow(rowTemplate, item);
+        if (withHost) {
+          const hostCell = document.createElement("td");
+          hostCell.className = "p-3 align-middle text-gray-400 font-mono text-xs";
+          hostCell.textContent = item.host || "-";
+          rowTemplate.querySelector("tr").prepend(hostCell);
+        }
         return rowTemplate;
       });
-      const table = createTableElement(config.headers, rows, config.noDataMessage);
+      const headers = withHost ? [{ text: "Host" }, ...config.headers] : config.headers;
+      const table = createTableElement(headers, rows, config.noDataMessage);
       const messageElement = createBaseMessageElement("self-start w-full");
       configureIcon(messageElement, config.icon.name, config.icon.color);
       messageElement.querySelector(".message-content").appendChild(table);
@@ -177,12 +197,12 @@ document.addEventListener("DOMContentLoaded", () => {
       row.querySelector(".container-image").textContent = c.image;
       row.querySelector(".container-ports").textContent = c.ports || "-";
       row.querySelector(".copy-button").onclick = () => copyToClipboard(c.name, "Nama");
-      row.querySelector(".inspect-button").onclick = () => handleQuickAction("inspect container", c.name);
+      row.querySelector(".inspect-button").onclick = () => handleQuickAction("inspect container", c.name, c.host);
       const logsButton = row.querySelector(".logs-button");
-      logsButton.onclick = () => handleQuickAction("lihat log", c.name);
+      logsButton.onclick = () => handleQuickAction("lihat log", c.name, c.host);
       if (!canInteract) logsButton.disabled = true;
       const stopButton = row.querySelector(".stop-button");
-      stopButton.onclick = () => handleQuickAction("stop", c.name);
+      stopButton.onclick = () => handleQuickAction("stop", c.name, c.host);
       if (!canInteract) stopButton.disabled = true;
     },
   });
@@ -211,8 +231,8 @@ document.addEventListener("DOMContentLoaded", () => {
       row.querySelector(".driver").textContent = v.driver;
       row.querySelector(".created_at").textContent = v.created_at;
       row.querySelector(".copy-button").onclick = () => copyToClipboard(v.name, "Nama Volume");
-      row.querySelector(".inspect-button").onclick = () => handleQuickAction("inspect volume", v.name);
-      row.querySelector(".remove-button").onclick = () => handleQuickAction("rm volume", v.name);
+      row.querySelector(".inspect-button").onclick = () => handleQuickAction("inspect volume", v.name, v.host);
+      row.querySelector(".remove-button").onclick = () => handleQuickAction("rm volume", v.name, v.host);
     },
   });
 
@@ -227,7 +247,7 @@ document.addEventListener("DOMContentLoaded", () => {
       row.querySelector(".driver").textContent = n.driver;
       row.querySelector(".scope").textContent = n.scope;
       row.querySelector(".copy-button").onclick = () => copyToClipboard(n.name, "Nama Network");
-      row.querySelector(".inspect-button").onclick = () => handleQuickAction("inspect network", n.name);
+      row.querySelector(".inspect-button").onclick = () => handleQuickAction("inspect network", n.name, n.host);
     },
   });
 
@@ -243,6 +263,18 @@ document.addEventListener("DOMContentLoaded", () => {
     },
   });
 
+  const createMetricsTable = createTableRenderer({
+    rowTemplateId: "metrics-table-row-template",
+    headers: [{ text: "Metrik" }, { text: "Rentang", className: "hidden sm:table-cell" }, { text: "Min" }, { text: "Avg" }, { text: "P95" }, { text: "Max" }, { text: "Sampel", className: "hidden md:table-cell text-right" }],
+    noDataMessage: "Tidak ada data metrik untuk ditampilkan.",
+    icon: { name: "analytics-outline", color: "bg-green-800 text-white" },
+    mapDataToRow: (row, m) => {
+      ["metric", "window", "min", "avg", "p95", "max", "samples"].forEach((key) => {
+        row.querySelector(`.${key}`).textContent = m[key];
+      });
+    },
+  });
+
   const createLogsTable = createTableRenderer({
     rowTemplateId: "logs-table-row-template",
     headers: [
@@ -257,6 +289,145 @@ document.addEventListener("DOMContentLoaded", () => {
     },
   });
 
+  const createBulkResultTable = createTableRenderer({
+    rowTemplateId: "bulk-table-row-template",
+    headers: [
+      { text: "Kontainer" },
+      { text: "Operasi", className: "hidden sm:table-cell" },
+      { text: "Hasil" },
+      { text: "Durasi", className: "text-right" },
+    ],
+    noDataMessage: "Tidak ada kontainer yang diproses.",
+    icon: { name: "layers-outline", color: "bg-gray-700 text-white" },
+    mapDataToRow: (row, r) => {
+      row.querySelector(".container_name").textContent = r.container_name;
+      row.querySelector(".operation").textContent = r.operation;
+      const result = row.querySelector(".result");
+      result.textContent = r.result;
+      result.classList.add(r.result.startsWith("Berhasil") ? "text-green-400" : r.result.startsWith("Gagal") ? "text-red-400" : "text-gray-400");
+      row.querySelector(".duration").textContent = r.duration;
+    },
+  });
+
+  const createComposeTable = createTableRenderer({
+    rowTemplateId: "compose-table-row-template",
+    headers: [
+      { text: "State" },
+      { text: "Service" },
+      { text: "Kontainer" },
+      { text: "Image", className: "hidden md:table-cell" },
+      { text: "Status", className: "hidden sm:table-cell" },
+      { text: "Ports", className: "hidden lg:table-cell" },
+    ],
+    noDataMessage: "Tidak ada kontainer di proyek compose.",
+    icon: { name: "layers-outline", color: "bg-blue-800 text-white" },
+    mapDataToRow: (row, c) => {
+      const indicator = row.querySelector(".status-indicator");
+      indicator.classList.add(c.state === "running" ? "bg-green-500" : c.state === "paused" ? "bg-yellow-500" : "bg-gray-500");
+      indicator.title = c.state;
+      row.querySelector(".service").textContent = c.service;
+      row.querySelector(".container_name").textContent = c.container_name;
+      row.querySelector(".image").textContent = c.image;
+      row.querySelector(".status").textContent = c.status;
+      row.querySelector(".ports").textContent = c.ports;
+    },
+  });
+
+  const createLogSearchTable = createTableRenderer({
+    rowTemplateId: "log-search-table-row-template",
+    headers: [
+      { text: "Kontainer", className: "w-1/6" },
+      { text: "Timestamp", className: "w-1/5 hidden sm:table-cell" },
+      { text: "Log Entry" },
+    ],
+    noDataMessage: "Tidak ada log yang cocok.",
+    icon: { name: "search-outline", color: "bg-yellow-800 text-white" },
+    mapDataToRow: (row, l) => {
+      row.querySelector(".container_name").textContent = l.container_name;
+      row.querySelector(".timestamp").textContent = l.timestamp;
+      row.querySelector(".log_entry").textContent = l.log_entry;
+    },
+  });
+
+  const LOG_STREAM_END_REASONS = {
+    eof: "Stream selesai.",
+    max_lines: "Batas jumlah baris tercapai.",
+    max_bytes: "Batas ukuran log tercapai.",
+    max_seconds: "Batas durasi stream tercapai.",
+    error: "Stream terputus karena error.",
+  };
+
+  function stopLiveUpdates() {
+    activeLogStreams.forEach((source) => source.close());
+    activeLogStreams.clear();
+    activeJobPolls.forEach((timer) => clearTimeout(timer));
+    activeJobPolls.clear();
+  }
+
+  function createLogStreamElement(data, autoStart) {
+    const messageElement = createLogsTable([]);
+    const content = messageElement.querySelector(".message-content");
+    const tbody = content.querySelector("tbody");
+    const placeholder = tbody.querySelector("tr");
+
+    const toolbar = document.createElement("div");
+    toolbar.className = "flex items-center justify-between gap-3 px-3 py-2 text-sm text-gray-400";
+    const status = document.createElement("span");
+    const toggleButton = document.createElement("button");
+    toggleButton.className = "px-3 py-1 rounded-md bg-[var(--bg-secondary)] text-gray-200 hover:bg-[var(--bg-tertiary)] transition-colors";
+    toolbar.append(status, toggleButton);
+    content.prepend(toolbar);
+
+    let source = null;
+    let lineCount = 0;
+
+    const setIdle = (message) => {
+      if (source) {
+        source.close();
+        activeLogStreams.delete(source);
+        source = null;
+      }
+      status.textContent = `${data.name}: ${message} (${lineCount} baris)`;
+      toggleButton.textContent = "Ikuti lagi";
+    };
+
+    const appendRecord = (record) => {
+      if (placeholder.isConnected) placeholder.remove();
+      const row = document.getElementById("logs-table-row-template").content.cloneNode(true);
+      row.querySelector(".timestamp").textContent = record.timestamp;
+      row.querySelector(".log_entry").textContent = record.log_entry;
+      const stickToBottom = chatFeed.scrollTop + chatFeed.clientHeight >= chatFeed.scrollHeight - 40;
+      tbody.appendChild(row);
+      while (tbody.children.length > LOG_STREAM_MAX_ROWS) tbody.firstElementChild.remove();
+      lineCount += 1;
+      status.textContent = `${data.name}: mengikuti log (${lineCount} baris)`;
+      if (stickToBottom) chatFeed.scrollTop = chatFeed.scrollHeight;
+    };
+
+    const start = () => {
+      tbody.innerHTML = "";
+      tbody.appendChild(placeholder);
+      lineCount = 0;
+      source = new EventSource(data.url);
+      activeLogStreams.add(source);
+      status.textContent = `${data.name}: menghubungkan...`;
+      toggleButton.textContent = "Berhenti";
+      source.addEventListener("log", (event) => appendRecord(JSON.parse(event.data)));
+      source.addEventListener("end", (event) => {
+        const info = JSON.parse(event.data);
+        setIdle(LOG_STREAM_END_REASONS[info.reason] || "Stream selesai.");
+      });
+      source.onerror = () => {
+        if (source) setIdle("Koneksi stream terputus.");
+      };
+    };
+
+    toggleButton.onclick = () => (source ? setIdle("Dihentikan.") : start());
+    if (autoStart) start();
+    else setIdle("Stream tidak aktif.");
+    return messageElement;
+  }
+
   function createInspectOutputElement(jsonDataString, objectName) {
     const element = createBaseMessageElement("self-start w-full");
     configureIcon(element, "code-slash-outline", "bg-purple-800 text-white");
@@ -268,6 +439,122 @@ document.addEventListener("DOMContentLoaded", () => {
     return element;
   }
 
+  const JOB_STATUS_LABELS = {
+    queued: "Job Diantrekan",
+    running: "Job Sedang Berjalan",
+    succeeded: "Job Selesai",
+    failed: "Job Gagal",
+    cancelled: "Job Dibatalkan",
+    expired: "Job Tidak Lagi Tersedia",
+  };
+  const JOB_FINISHED_STATES = ["succeeded", "failed", "cancelled"];
+
+  function createJobElement(job) {
+    const element = createBaseMessageElement("self-start");
+    configureIcon(element, "time-outline", "bg-sky-800/80 text-white");
+    const template = document.getElementById("action-receipt-template").content.cloneNode(true);
+    const wrapper = template.querySelector(".wrapper");
+    const statusText = template.querySelector(".status-text");
+    const detailsList = template.querySelector(".details-list");
+    template.querySelector(".resource-type").textContent = "Job";
+    template.querySelector(".resource-name").textContent = `${job.action} (${job.job_id})`;
+    wrapper.classList.add("border-sky-500");
+    element.querySelector(".message-content").appendChild(template);
+
+    const logBox = document.createElement("pre");
+    logBox.className = "hidden mt-2 max-h-64 overflow-y-auto whitespace-pre-wrap break-all font-mono text-xs text-gray-400 bg-[var(--bg-secondary)] p-2 rounded-md";
+    const cancelButton = document.createElement("button");
+    cancelButton.className = "hidden mt-2 px-3 py-1 rounded-md text-sm bg-red-800/80 text-white hover:bg-red-700 transition-colors";
+    cancelButton.textContent = "Batalkan";
+    cancelButton.onclick = async () => {
+      cancelButton.disabled = true;
+      try {
+        const response = await fetch(`${job.url}/cancel`, { method: "POST", headers: { Accept: "application/json" } });
+        const result = await response.json();
+        showToast(response.ok ? "Pembatalan job dikirim." : result.error, !response.ok);
+      } catch (error) {
+        console.error("Gagal membatalkan job:", error);
+        cancelButton.disabled = false;
+      }
+    };
+    element.querySelector(".message-content").append(logBox, cancelButton);
+
+    let logOffset = 0;
+    const appendLog = (lines) => {
+      if (!lines || lines.length === 0) return;
+      const stickToBottom = logBox.scrollTop + logBox.clientHeight >= logBox.scrollHeight - 4;
+      const kept = (logBox.textContent ? logBox.textContent.split("\n") : []).concat(lines).slice(-JOB_LOG_MAX_LINES);
+      logBox.textContent = kept.join("\n");
+      logBox.classList.remove("hidden");
+      if (stickToBottom) logBox.scrollTop = logBox.scrollHeight;
+    };
+
+    const render = (state) => {
+      statusText.textContent = JOB_STATUS_LABELS[state.status] || state.status;
+      cancelButton.classList.toggle("hidden", !state.cancellable);
+      detailsList.innerHTML = "";
+      const details = [{ key: "Durasi", value: `${Number(state.elapsed || 0).toFixed(1)} detik` }];
+      const progress = state.progress;
+      if (progress && progress.layers_total) {
+        const downloaded = (progress.downloaded_bytes / (1024 * 1024)).toFixed(1);
+        const total = (progress.total_bytes / (1024 * 1024)).toFixed(1);
+        const percent = progress.percent === null ? "-" : `${progress.percent}%`;
+        details.push({ key: "Progres", value: `${percent} (${downloaded}/${total} MB)` });
+        details.push({ key: "Layer", value: `${progress.layers_done}/${progress.layers_total} selesai` });
+      }
+      if (JOB_FINISHED_STATES.includes(state.status)) {
+        details.push({ key: "Hasil", value: "dicatat di percakapan" });
+      }
+      details.forEach((detail) => {
+        const item = document.createElement("p");
+        item.className = "text-xs text-gray-400";
+        item.innerHTML = `<span class="font-semibold">${detail.key}:</span> <span class="font-mono">${detail.value}</span>`;
+        detailsList.appendChild(item);
+      });
+    };
+
+    let sawActive = false;
+    const poll = async () => {
+      let timer = null;
+      try {
+        const response = await fetch(`${job.url}?log_from=${logOffset}`, { headers: { Accept: "application/json" } });
+        if (response.status === 404) {
+          render({ ...job, status: "expired" });
+          return;
+        }
+        if (!response.ok) return;
+        const latest = await response.json();
+        appendLog(latest.log);
+        logOffset = latest.log_total || logOffset;
+        if (JOB_FINISHED_STATES.includes(latest.status) && sawActive && element.isConnected) {
+          element.replaceWith(createBotResponse({ output: latest.output, error: latest.error, output_type: latest.output_type }));
+          return;
+        }
+        render(latest);
+        if (latest.status === "queued" || latest.status === "running") {
+          sawActive = true;
+          timer = setTimeout(() => {
+            activeJobPolls.delete(timer);
+            poll();
+          }, JOB_POLL_INTERVAL_MS);
+          activeJobPolls.add(timer);
+        }
+      } catch (error) {
+        console.error("Gagal memuat status job:", error);
+      }
+    };
+
+    render(job);
+    poll();
+    return element;
+  }
+
+  // Jobs started by Gemini tool calls come back alongside its answer.
+  function createJobElements(data) {
+    if (data.error || !Array.isArray(data.jobs)) return [];
+    return data.jobs.map(createJobElement);
+  }
+
   function createActionReceiptElement(data) {
     const element = createBaseMessageElement("self-start");
     const template = document.getElementById("action-receipt-template").content.cloneNode(true);
@@ -322,6 +609,14 @@ document.addEventListener("DOMContentLoaded", () => {
   }
 
   function createBotResponse(data) {
+    if (data.error && data.output_type === "table" && Array.isArray(data.output) && data.output.length > 0) {
+      const element = createBotResponse({ ...data, error: "" });
+      const warning = document.createElement("p");
+      warning.className = "mt-2 text-xs text-yellow-400";
+      warning.textContent = data.error;
+      element.querySelector(".message-content").appendChild(warning);
+      return element;
+    }
     if (data.error) {
       return createBotTextMessage(data.error, "bot-error");
     }
@@ -331,6 +626,7 @@ document.addEventListener("DOMContentLoaded", () => {
     switch (data.output_type) {
       case "table":
         if (!data.output || data.output.length === 0) {
+          if (receivedCmd.includes("compose-ps") || receivedCmd.includes("compose ps")) return createComposeTable([]);
           if (receivedCmd.includes("image")) return createImageTable([]);
           if (receivedCmd.includes("log")) return createLogsTable([]);
           if (receivedCmd.includes("stats")) return createStatsTable([]);
@@ -339,9 +635,13 @@ document.addEventListener("DOMContentLoaded", () => {
           return createContainerTable([]);
         }
         const firstItem = data.output[0];
+        if (firstItem.hasOwnProperty("service") && firstItem.hasOwnProperty("state")) return createComposeTable(data.output);
         if (firstItem.hasOwnProperty("status")) return createContainerTable(data.output);
         if (firstItem.hasOwnProperty("repository")) return createImageTable(data.output);
         if (firstItem.hasOwnProperty("cpu_usage")) return createStatsTable(data.output);
+        if (firstItem.hasOwnProperty("p95")) return createMetricsTable(data.output);
+        if (firstItem.hasOwnProperty("operation") && firstItem.hasOwnProperty("result")) return createBulkResultTable(data.output);
+        if (firstItem.hasOwnProperty("log_entry") && firstItem.hasOwnProperty("container_name")) return createLogSearchTable(data.output);
         if (firstItem.hasOwnProperty("log_entry")) return createLogsTable(data.output);
         if (firstItem.hasOwnProperty("driver") && firstItem.hasOwnProperty("created_at")) return createVolumeTable(data.output);
         if (firstItem.hasOwnProperty("driver") && firstItem.hasOwnProperty("scope")) return createNetworkTable(data.output);
@@ -349,8 +649,12 @@ document.addEventListener("DOMContentLoaded", () => {
 
       case "action_receipt":
         return createActionReceiptElement(data.output);
+      case "log_stream":
+        return createLogStreamElement(data.output, !data.from_history);
+      case "job":
+        return createJobElement(data.output);
       case "inspect":
-        const objectName = receivedCmd.split(" ").slice(2).join(" ");
+        const objectName = receivedCmd.replace(/\s+di\s+host\s+\S+$/i, "").split(" ").slice(2).join(" ");
         return createInspectOutputElement(data.output, objectName);
       case "text":
         return createBotTextMessage(data.output, "bot-output");
@@ -380,8 +684,9 @@ document.addEventListener("DOMContentLoaded", () => {
     if (!isLoading) commandInput.focus();
   }
 
-  function handleQuickAction(action, name) {
+  function handleQuickAction(action, name, host) {
     let command = `${action} ${name}`;
+    if (host) command += ` di host ${host}`;
     showToast(`Menjalankan: ${command}`);
     submitCommand(command);
   }
@@ -435,29 +740,102 @@ document.addEventListener("DOMContentLoaded", () => {
     });
   }
 
+  function createHistoryEntryElements(entry) {
+    const botResponseData = entry.bot_response;
+    botResponseData.received_command = entry.user_command;
+    botResponseData.from_history = true;
+    return [createUserMessageElement(entry.user_command), createBotResponse(botResponseData), ...createJobElements(botResponseData)].filter(Boolean);
+  }
+
+  async function fetchConversationPage(convId, before = null) {
+    const params = new URLSearchParams({ limit: MESSAGE_PAGE_SIZE });
+    if (before !== null) params.set("before", before);
+    const response = await fetch(`/conversation/${convId}?${params}`);
+
+    if (response.status === 401) {
+      showToast("Sesi Anda telah berakhir. Harap login kembali.", true);
+      window.location.reload();
+      return null;
+    }
+
+    if (!response.ok) throw new Error("Gagal memuat percakapan.");
+    return response.json();
+  }
+
   async function loadConversationMessages(convId) {
+    stopLiveUpdates();
     chatFeed.innerHTML = "";
+    messagesCursor = null;
     try {
-      const response = await fetch(`/conversation/${convId}`);
+      const page = await fetchConversationPage(convId);
+      if (!page || convId !== activeConversationId) return;
+      messagesCursor = page.next_before;
 
-      if (response.status === 401) {
-        showToast("Sesi Anda telah berakhir. Harap login kembali.", true);
-        window.location.reload();
-        return;
+      page.messages.forEach((entry) => {
+        createHistoryEntryElements(entry).forEach(appendToFeed);
+      });
+
+      if (messagesCursor !== null && chatFeed.scrollHeight <= chatFeed.clientHeight) {
+        await loadOlderMessages();
       }
+    } catch (error) {
+      console.error(error);
+      appendToFeed(createBotTextMessage(error.message, "bot-error"));
+    }
+  }
 
-      if (!response.ok) throw new Error("Gagal memuat percakapan.");
-      const messages = await response.json();
+  async function loadOlderMessages() {
+    if (isLoadingOlderMessages || messagesCursor === null || !activeConversationId) return;
+    isLoadingOlderMessages = true;
+    const convId = activeConversationId;
+    try {
+      const page = await fetchConversationPage(convId, messagesCursor);
+      if (!page || convId !== activeConversationId) return;
+      messagesCursor = page.next_before;
 
-      messages.forEach((entry) => {
-        appendToFeed(createUserMessageElement(entry.user_command));
-        const botResponseData = entry.bot_response;
-        botResponseData.received_command = entry.user_command;
-        appendToFeed(createBotResponse(botResponseData));
+      const fragment = document.createDocumentFragment();
+      page.messages.forEach((entry) => {
+        createHistoryEntryElements(entry).forEach((element) => fragment.appendChild(element));
       });
+      const previousHeight = chatFeed.scrollHeight;
+      chatFeed.prepend(fragment);
+      chatFeed.scrollTop += chatFeed.scrollHeight - previousHeight;
     } catch (error) {
       console.error(error);
-      appendToFeed(createBotTextMessage(error.message, "bot-error"));
+      showToast(error.message, true);
+    } finally {
+      isLoadingOlderMessages = false;
+    }
+  }
+
+  async function fetchConversationsPage(before = null) {
+    const params = new URLSearchParams({ limit: CONVERSATION_PAGE_SIZE });
+    if (before) params.set("before", before);
+    const response = await fetch(`/conversations?${params}`);
+
+    if (response.status === 401) {
+      window.location.reload();
+      return null;
+    }
+
+    if (!response.ok) throw new Error("Gagal mengambil daftar percakapan.");
+    return response.json();
+  }
+
+  async function loadMoreConversations() {
+    if (isLoadingConversations || !conversationsCursor) return;
+    isLoadingConversations = true;
+    try {
+      const page = await fetchConversationsPage(conversationsCursor);
+      if (!page) return;
+      conversations = conversations.concat(page.conversations);
+      conversationsCursor = page.next_before;
+      renderSidebar();
+    } catch (error) {
+      console.error(error);
+      showToast(error.message, true);
+    } finally {
+      isLoadingConversations = false;
     }
   }
 
@@ -474,6 +852,8 @@ document.addEventListener("DOMContentLoaded", () => {
 
   function startNewChat() {
     activeConversationId = null;
+    messagesCursor = null;
+    stopLiveUpdates();
     chatFeed.innerHTML = "";
     chatHeader.textContent = "Percakapan Baru";
     appendToFeed(createBotTextMessage("Selamat datang! Ketik perintah untuk memulai percakapan baru.", "system-info"));
@@ -550,6 +930,7 @@ document.addEventListener("DOMContentLoaded", () => {
 
       data.received_command = commandText;
       appendToFeed(createBotResponse(data));
+      createJobElements(data).forEach(appendToFeed);
 
       if (!activeConversationId && data.conversation_id) {
         activeConversationId = data.conversation_id;
@@ -568,19 +949,13 @@ document.addEventListener("DOMContentLoaded", () => {
 
   async function init() {
     try {
-      const response = await fetch("/conversations");
-
-      if (response.status === 401) {
-        window.location.reload();
-        return;
-      }
-
-      if (!response.ok) throw new Error("Gagal mengambil daftar percakapan.");
-      conversations = await response.json();
+      const page = await fetchConversationsPage();
+      if (!page) return;
+      conversations = page.conversations;
+      conversationsCursor = page.next_before;
 
-      const lastActive = conversations.find((c) => c.is_last_active);
-      if (lastActive) {
-        await switchConversation(lastActive.id);
+      if (page.last_active_id) {
+        await switchConversation(page.last_active_id);
       } else {
         startNewChat();
       }
@@ -597,6 +972,13 @@ document.addEventListener("DOMContentLoaded", () => {
 
   newChatButton.addEventListener("click", startNewChat);
 
+  chatFeed.addEventListener("scroll", () => {
+    if (chatFeed.scrollTop < 80) loadOlderMessages();
+  });
+  conversationList.addEventListener("scroll", () => {
+    if (conversationList.scrollTop + conversationList.clientHeight >= conversationList.scrollHeight - 40) loadMoreConversations();
+  });
+
   toggleGuideButton.addEventListener("click", () => toggleModal(true));
   closeGuideButton.addEventListener("click", () => toggleModal(false));
   commandGuideModal.addEventListener("click", (event) => {
@@ -0,0 +1,229 @@
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import requests
+from docker.transport import UnixHTTPAdapter
+from fake_docker_daemon import COMPOSE_PROJECT
+
+READ_ONLY_SCENARIOS = [
+    ("list_containers", {"all": True}),
+    ("list_images", {}),
+    ("list_volumes", {}),
+    ("list_networks", {}),
+    ("inspect_container", {"name": "bench-0001"}),
+    ("inspect_image", {"name": "bench/app-0001:latest"}),
+    ("inspect_volume", {"name": "bench-vol-0001"}),
+    ("inspect_network", {"name": "bridge"}),
+    ("view_logs", {"name": "bench-0001", "lines": "100"}),
+    ("follow_logs", {"name": "bench-0001"}),
+    ("search_logs", {"query": "timeout", "amount": "30", "unit": "menit"}),
+    ("view_stats", {"name": "bench-0000"}),
+    ("view_all_stats", {"sort": "cpu"}),
+    ("view_metrics_history", {"metric": "cpu", "name": "bench-0000", "amount": "1", "unit": "jam"}),
+    ("exec_in_container", {"name": "bench-0000", "command": "ls /"}),
+    ("system_info", {}),
+    ("system_version", {}),
+    ("compose_ps", {}),
+    ("compose_logs", {"lines": "20"}),
+]
+
+MUTATING_SCENARIOS = [
+    ("pull_image", {"image": "bench/pulled:1.0"}),
+    ("run_container", {"name": "bench-new", "image": "bench/pulled:1.0", "ports": "18080:80"}),
+    ("stop_container", {"name": "bench-new"}),
+    ("start_container", {"name": "bench-new"}),
+    ("restart_container", {"name": "bench-new"}),
+    ("pause_container", {"name": "bench-new"}),
+    ("unpause_container", {"name": "bench-new"}),
+    ("rename_container", {"old_name": "bench-new", "new_name": "bench-renamed"}),
+    ("stop_container", {"name": "bench-renamed"}),
+    ("remove_container", {"name": "bench-renamed"}),
+    ("bulk_container_action", {"operation": "restart", "names": "bench-00[0-2]*"}),
+    ("remove_image", {"name": "bench/pulled:1.0"}),
+    ("create_volume", {"name": "bench-vol-new"}),
+    ("remove_volume", {"name": "bench-vol-new"}),
+    ("remove_network", {"name": "bench-net-000"}),
+    ("clear_history", {}),
+    ("refresh_inventory", {}),
+    ("compose_build", {}),
+    ("compose_up", {}),
+    ("compose_restart", {}),
+    ("compose_down", {}),
+    ("prune_system", {}),
+]
+
+WARMUP_SECONDS = {"view_all_stats": 2.5}
+
+COMPOSE_ACTIONS = {"compose_up", "compose_down", "compose_build"}
+
+class FakeDaemon:
+    def __init__(self, socket_path, containers, images, volumes, networks, latency_ms):
+        self.socket_path = socket_path
+        self.args = [
+            sys.executable, os.path.join(os.path.dirname(__file__), "fake_docker_daemon.py"),
+            "--socket", socket_path, "--containers", str(containers), "--images", str(images),
+            "--volumes", str(volumes), "--networks", str(networks), "--latency-ms", str(latency_ms),
+        ]
+        self.process = None
+        self.session = requests.Session()
+        self.session.mount("http+docker://", UnixHTTPAdapter(f"http+unix://{socket_path}"))
+        self.base_url = "http+docker://localhost"
+
+    def __enter__(self):
+        self.process = subprocess.Popen(self.args, stdout=subprocess.PIPE, text=True)
+        self.process.stdout.readline()
+        return self
+
+    def __exit__(self, *exc):
+        self.process.terminate()
+        self.process.wait(timeout=5)
+
+    def reset(self):
+        self.session.post(f"{self.base_url}/_fake/reset").raise_for_status()
+
+    def calls(self):
+        response = self.session.get(f"{self.base_url}/_fake/stats")
+        response.raise_for_status()
+        return response.json()
+
+def _measure(app, handler, params, repeat, daemon):
+    timings = []
+    with app.app_context():
+        for _ in range(repeat):
+            start = time.perf_counter()
+            handler(dict(params))
+            timings.append(time.perf_counter() - start)
+
+        daemon.reset()
+        tracemalloc.start()
+        traced_start = time.perf_counter()
+        output, error = handler(dict(params))
+        traced_elapsed = time.perf_counter() - traced_start
+        _current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        calls = daemon.calls()
+
+    latency = statistics.median(timings) if timings else traced_elapsed
+    return {
+        "latency_ms": round(latency * 1000, 3),
+        "api_calls": calls["total"],
+        "calls_by_route": calls["by_route"],
+        "peak_kb": round(peak / 1024, 1),
+        "rows": len(output) if isinstance(output, list) else None,
+        "error": error or "",
+    }
+
+def run_suite(args):
+    workdir = tempfile.mkdtemp(prefix="chatops-bench-")
+    socket_path = os.path.join(workdir, "docker.sock")
+    os.environ["DOCKER_HOST"] = f"unix://{socket_path}"
+    os.environ["COMPOSE_PROJECT_NAME"] = COMPOSE_PROJECT
+
+    from app import create_app
+    from app.api.handlers import ACTION_HANDLERS
+
+    app = create_app('default')
+    app.instance_path = os.path.join(workdir, "instance")
+    os.makedirs(app.instance_path, exist_ok=True)
+    app.logger.setLevel("ERROR")
+
+    has_compose = shutil.which("docker-compose") is not None
+    results = {}
+    try:
+        with FakeDaemon(socket_path, args.containers, args.images, args.volumes, args.networks, args.latency_ms) as daemon:
+            with app.app_context():
+                ACTION_HANDLERS["system_version"]({})
+
+            for action, params in READ_ONLY_SCENARIOS:
+                if action in WARMUP_SECONDS:
+                    with app.app_context():
+                        ACTION_HANDLERS[action](dict(params))
+                    time.sleep(WARMUP_SECONDS[action])
+                results[action] = _measure(app, ACTION_HANDLERS[action], params, args.repeat, daemon)
+
+            for action, params in MUTATING_SCENARIOS:
+                key = action if action not in results else f"{action}#{sum(1 for k in results if k.split('#')[0] == action) + 1}"
+                if action in COMPOSE_ACTIONS and not has_compose:
+                    results[key] = {"skipped": "docker-compose tidak tersedia"}
+                    continue
+                results[key] = _measure(app, ACTION_HANDLERS[action], params, 0, daemon)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    covered = {key.split('#')[0] for key in results}
+    missing = sorted(set(ACTION_HANDLERS) - covered)
+    if missing:
+        raise SystemExit(f"Aksi tanpa skenario benchmark: {', '.join(missing)}")
+    return results
+
+def compare(results, baseline, tolerance, min_latency_ms):
+    regressions = []
+    for action, current in results.items():
+        previous = baseline.get(action)
+        if not previous or "skipped" in current or "skipped" in previous:
+            continue
+        if current["api_calls"] > previous["api_calls"]:
+            regressions.append(f"{action}: panggilan API {previous['api_calls']} -> {current['api_calls']}")
+        allowed = max(previous["latency_ms"] * (1 + tolerance), previous["latency_ms"] + min_latency_ms)
+        if current["latency_ms"] > allowed:
+            regressions.append(f"{action}: latensi {previous['latency_ms']:.2f} ms -> {current['latency_ms']:.2f} ms")
+    return regressions
+
+def print_table(results):
+    print(f"{'aksi':<22} {'latensi ms':>11} {'API':>6} {'peak KB':>9} {'baris':>6}  catatan")
+    for action, result in results.items():
+        if "skipped" in result:
+            print(f"{action:<22} {'-':>11} {'-':>6} {'-':>9} {'-':>6}  dilewati: {result['skipped']}")
+            continue
+        rows = "-" if result["rows"] is None else str(result["rows"])
+        note = result["error"][:60]
+        print(f"{action:<22} {result['latency_ms']:>11.2f} {result['api_calls']:>6} {result['peak_kb']:>9.1f} {rows:>6}  {note}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark offline semua ACTION_HANDLERS terhadap fake Docker daemon.")
+    parser.add_argument("--containers", type=int, default=200)
+    parser.add_argument("--images", type=int, default=50)
+    parser.add_argument("--volumes", type=int, default=30)
+    parser.add_argument("--networks", type=int, default=5)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Latensi buatan per panggilan API")
+    parser.add_argument("--repeat", type=int, default=5, help="Pengulangan aksi read-only (median)")
+    parser.add_argument("--json", action="store_true", help="Cetak hasil sebagai JSON")
+    parser.add_argument("--save-baseline", metavar="PATH")
+    parser.add_argument("--baseline", metavar="PATH", help="Gagal (exit 1) jika ada regresi terhadap baseline")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="Toleransi kenaikan latensi relatif")
+    parser.add_argument("--min-latency-ms", type=float, default=2.0, help="Kenaikan latensi absolut yang diabaikan")
+    args = parser.parse_args()
+
+    results = run_suite(args)
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"{args.containers} kontainer, {args.images} image, {args.volumes} volume, latensi buatan {args.latency_ms} ms\n")
+        print_table(results)
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance, args.min_latency_ms)
+        if regressions:
+            print("\nRegresi terdeteksi:", file=sys.stderr)
+            for line in regressions:
+                print(f"  {line}", file=sys.stderr)
+            sys.exit(1)
+        print("\nTidak ada regresi terhadap baseline.")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+import re
+import sys
+import os
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.models.commands import COMMAND_GUIDE
+from app.api.command_matcher import match_command
+
+MATCHING_INPUTS = [cmd["example"] for cmd in COMMAND_GUIDE] + [
+    "docker ps -a", "stop webku", "lihat stats webku", "compose-logs", "mulai ulang webku",
+]
+NON_MATCHING_INPUTS = [
+    "container apa saja yang mati?",
+    "berapa image yang ada?",
+    "tolong jelaskan kenapa nginx restart terus",
+    "show me the details of nginx and redis",
+    "lihat semua kontainer yang memakai memori paling besar",
+    "1234 apa ini",
+]
+
+def linear_match(normalized_command):
+    for cmd_def in COMMAND_GUIDE:
+        match = re.fullmatch(cmd_def["pattern"], normalized_command)
+        if match:
+            return cmd_def, match
+    return None, None
+
+def _same_result(left, right):
+    if left[0] is None or right[0] is None:
+        return left[0] is right[0]
+    return left[0]["id"] == right[0]["id"] and left[1].groupdict() == right[1].groupdict()
+
+def check_equivalence(inputs):
+    for text in inputs:
+        normalized = text.lower().strip()
+        if not _same_result(linear_match(normalized), match_command(normalized)):
+            raise AssertionError(f"Dispatcher dan linear scan berbeda untuk: {text!r}")
+
+def bench(label, func, inputs, number):
+    normalized = [text.lower().strip() for text in inputs]
+    timer = timeit.Timer(lambda: [func(text) for text in normalized])
+    best = min(timer.repeat(repeat=5, number=number))
+    per_message_us = best / (number * len(normalized)) * 1e6
+    print(f"  {label:<12} {per_message_us:8.2f} us/pesan")
+    return per_message_us
+
+def main(number=2000):
+    check_equivalence(MATCHING_INPUTS + NON_MATCHING_INPUTS)
+    print(f"{len(COMMAND_GUIDE)} pola, {number} iterasi per putaran (terbaik dari 5)\n")
+    for label, inputs in (("Cocok", MATCHING_INPUTS), ("Tidak cocok", NON_MATCHING_INPUTS)):
+        print(f"{label} ({len(inputs)} input):")
+        before = bench("linear", linear_match, inputs, number)
+        after = bench("dispatcher", match_command, inputs, number)
+        print(f"  percepatan   {before / after:8.1f}x\n")
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
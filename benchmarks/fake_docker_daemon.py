@@ -0,0 +1,782 @@
+import argparse
+import hashlib
+import json
+import os
+import re
+import socketserver
+import struct
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+API_VERSION = "1.41"
+COMPOSE_PROJECT = "benchproj"
+
+def _digest(value: str) -> str:
+    return hashlib.sha256(value.encode("utf-8")).hexdigest()
+
+def _iso(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+class Inventory:
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.containers = {}
+        self.images = {}
+        self.volumes = {}
+        self.networks = {}
+        self.execs = {}
+        self.events = []
+        self.events_cond = threading.Condition(self.lock)
+
+    def seed(self, containers=100, images=20, volumes=20, networks=5, running_ratio=0.75, log_lines=200):
+        now = time.time()
+        with self.lock:
+            self.containers.clear()
+            self.images.clear()
+            self.volumes.clear()
+            self.networks.clear()
+            for i in range(max(images, 1)):
+                self.add_image(f"bench/app-{i:04d}:latest", size=(i % 50 + 1) * 10 * 1024 * 1024, created=now - i * 3600)
+            image_ids = list(self.images)
+            for i in range(containers):
+                image_id = image_ids[i % len(image_ids)]
+                self.add_container(
+                    name=f"bench-{i:04d}",
+                    image_id=image_id,
+                    state="running" if (i % 100) < running_ratio * 100 else "exited",
+                    ports={"80/tcp": [{"HostIp": "0.0.0.0", "HostPort": str(10000 + i)}]} if i % 3 == 0 else {},
+                    labels={
+                        "com.docker.compose.project": COMPOSE_PROJECT,
+                        "com.docker.compose.service": f"svc{i % 5}",
+                        "com.docker.compose.config-hash": _digest(f"svc{i % 5}"),
+                    } if i % 10 == 0 else {},
+                    log_lines=log_lines,
+                    created=now - i * 60,
+                )
+            for i in range(volumes):
+                name = f"bench-vol-{i:04d}"
+                self.volumes[name] = {
+                    "Name": name, "Driver": "local", "Mountpoint": f"/var/lib/docker/volumes/{name}/_data",
+                    "CreatedAt": _iso(now - i * 600)[:19] + "Z", "Labels": {}, "Scope": "local", "Options": {},
+                }
+            for i, name in enumerate(["bridge", "host", "none"] + [f"bench-net-{i:03d}" for i in range(networks)]):
+                network_id = _digest(name)
+                self.networks[network_id] = {
+                    "Name": name, "Id": network_id, "Created": _iso(now), "Scope": "local",
+                    "Driver": "bridge" if name not in ("host", "none") else name,
+                    "EnableIPv6": False, "Internal": False, "Attachable": False, "Ingress": False,
+                    "IPAM": {"Driver": "default", "Config": []}, "Containers": {}, "Options": {}, "Labels": {},
+                }
+
+    def add_image(self, tag, size=10 * 1024 * 1024, created=None):
+        image_id = "sha256:" + _digest(tag)
+        self.images[image_id] = {
+            "Id": image_id, "RepoTags": [tag], "RepoDigests": [], "Size": size, "VirtualSize": size,
+            "Created": int(created or time.time()), "Labels": {}, "ParentId": "", "SharedSize": -1, "Containers": -1,
+        }
+        return image_id
+
+    def add_container(self, name, image_id, state="created", ports=None, labels=None, log_lines=50, created=None):
+        container_id = _digest(name + str(time.time()))
+        image = self.images[image_id]
+        self.containers[container_id] = {
+            "id": container_id, "name": name, "image_id": image_id,
+            "image": image["RepoTags"][0] if image["RepoTags"] else image_id,
+            "state": state, "ports": ports or {}, "labels": labels or {},
+            "created": created or time.time(), "log_lines": log_lines,
+        }
+        return container_id
+
+    def find_container(self, ref):
+        with self.lock:
+            if ref in self.containers:
+                return self.containers[ref]
+            for container in self.containers.values():
+                if container["name"] == ref.lstrip("/") or (len(ref) >= 4 and container["id"].startswith(ref)):
+                    return container
+        return None
+
+    def find_image(self, ref):
+        with self.lock:
+            if ref in self.images:
+                return self.images[ref]
+            for image_id, image in self.images.items():
+                if ref in image["RepoTags"] or (ref + ":latest") in image["RepoTags"]:
+                    return image
+                if len(ref) >= 4 and (image_id.startswith(ref) or image_id[7:].startswith(ref)):
+                    return image
+        return None
+
+    def find_network(self, ref):
+        with self.lock:
+            for network in self.networks.values():
+                if ref in (network["Id"], network["Name"]) or (len(ref) >= 4 and network["Id"].startswith(ref)):
+                    return network
+        return None
+
+    def emit(self, event_type, action, actor_id, attributes=None):
+        with self.events_cond:
+            now = time.time()
+            self.events.append({
+                "Type": event_type, "Action": action, "status": action, "id": actor_id,
+                "Actor": {"ID": actor_id, "Attributes": attributes or {}},
+                "scope": "local", "time": int(now), "timeNano": int(now * 1e9),
+            })
+            del self.events[:-1000]
+            self.events_cond.notify_all()
+
+def _status_text(container):
+    return {"running": "Up 2 hours", "paused": "Up 2 hours (Paused)", "exited": "Exited (0) 1 hour ago"}.get(
+        container["state"], "Created")
+
+def _ports_summary(container):
+    summary = []
+    for private, bindings in container["ports"].items():
+        port, proto = private.split("/")
+        for binding in bindings or []:
+            summary.append({"IP": binding["HostIp"], "PrivatePort": int(port), "PublicPort": int(binding["HostPort"]), "Type": proto})
+    return summary
+
+def container_summary(container):
+    return {
+        "Id": container["id"], "Names": ["/" + container["name"]], "Image": container["image"],
+        "ImageID": container["image_id"], "Command": "/docker-entrypoint.sh", "Created": int(container["created"]),
+        "Ports": _ports_summary(container), "Labels": container["labels"], "State": container["state"],
+        "Status": _status_text(container), "HostConfig": {"NetworkMode": "default"}, "Mounts": [],
+    }
+
+def container_inspect(container):
+    state = container["state"]
+    return {
+        "Id": container["id"], "Name": "/" + container["name"], "Created": _iso(container["created"]),
+        "Image": container["image_id"], "Path": "/docker-entrypoint.sh", "Args": [],
+        "State": {
+            "Status": state, "Running": state in ("running", "paused"), "Paused": state == "paused",
+            "Restarting": False, "OOMKilled": False, "Dead": False, "Pid": 4242 if state == "running" else 0,
+            "ExitCode": 0, "Error": "", "StartedAt": _iso(container["created"]), "FinishedAt": "0001-01-01T00:00:00Z",
+        },
+        "Config": {
+            "Hostname": container["id"][:12], "Image": container["image"], "Tty": False,
+            "Labels": container["labels"], "Env": ["PATH=/usr/local/sbin:/usr/local/bin:/usr/sbin:/usr/bin"],
+            "Cmd": ["run"], "ExposedPorts": {port: {} for port in container["ports"]},
+        },
+        "HostConfig": {"PortBindings": container["ports"], "RestartPolicy": {"Name": "no"}, "NetworkMode": "default"},
+        "NetworkSettings": {"Ports": container["ports"], "IPAddress": "172.17.0.2", "Networks": {}},
+        "Mounts": [],
+    }
+
+def image_inspect(image):
+    return {
+        "Id": image["Id"], "RepoTags": image["RepoTags"], "RepoDigests": image["RepoDigests"],
+        "Created": _iso(image["Created"]), "Size": image["Size"], "VirtualSize": image["Size"],
+        "Architecture": "amd64", "Os": "linux", "Config": {"Labels": image["Labels"]},
+        "RootFS": {"Type": "layers", "Layers": [image["Id"]]},
+    }
+
+def stats_payload(container):
+    seed = int(container["id"][:6], 16)
+    total = 10_000_000_000 + seed
+    return {
+        "read": _iso(time.time()), "preread": _iso(time.time() - 1), "name": "/" + container["name"], "id": container["id"],
+        "cpu_stats": {"cpu_usage": {"total_usage": total + 50_000_000, "percpu_usage": [1, 1]},
+                      "system_cpu_usage": 900_000_000_000 + 1_000_000_000, "online_cpus": 2},
+        "precpu_stats": {"cpu_usage": {"total_usage": total}, "system_cpu_usage": 900_000_000_000, "online_cpus": 2},
+        "memory_stats": {"usage": (seed % 512 + 16) * 1024 * 1024, "limit": 2048 * 1024 * 1024},
+        "networks": {"eth0": {"rx_bytes": seed * 10, "tx_bytes": seed * 5}},
+        "blkio_stats": {"io_service_bytes_recursive": [{"op": "read", "value": seed}, {"op": "write", "value": seed // 2}]},
+    }
+
+def log_lines(container, tail=None, since=None, until=None):
+    now = time.time()
+    total = container["log_lines"]
+    lines = []
+    for i in range(total):
+        timestamp = now - (total - i)
+        if (since and timestamp < since) or (until and timestamp > until):
+            continue
+        level = "ERROR request timeout" if i % 37 == 0 else "INFO request served"
+        lines.append((timestamp, f"{level} id={i} container={container['name']}"))
+    if tail is not None and tail >= 0:
+        lines = lines[-tail:] if tail else []
+    return lines
+
+def frame(payload: bytes, stream_type: int = 1) -> bytes:
+    return struct.pack(">BxxxL", stream_type, len(payload)) + payload
+
+class FakeDockerHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "FakeDocker/1.0"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def do_DELETE(self):
+        self._dispatch("DELETE")
+
+    def do_HEAD(self):
+        self._dispatch("HEAD")
+
+    def _dispatch(self, method):
+        parsed = urlparse(self.path)
+        path = re.sub(r"^/v[\d.]+", "", parsed.path)
+        self.query = {key: values[-1] for key, values in parse_qs(parsed.query).items()}
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        self.body = json.loads(body) if body and self.headers.get("Content-Type", "").startswith("application/json") else None
+        self.inventory = self.server.inventory
+
+        for route_method, pattern, handler_name in ROUTES:
+            match = pattern.fullmatch(path)
+            if route_method == method and match:
+                if not handler_name.startswith("_fake"):
+                    self.server.record(handler_name)
+                    if self.server.latency:
+                        time.sleep(self.server.latency)
+                try:
+                    getattr(self, handler_name)(*match.groups())
+                except BrokenPipeError:
+                    pass
+                return
+        self._json(404, {"message": f"page not found: {method} {path}"})
+
+    def _json(self, status, payload):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Api-Version", API_VERSION)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _raw(self, status, data: bytes, content_type="application/vnd.docker.raw-stream"):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _start_chunked(self, content_type="application/json"):
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+    def _chunk(self, data: bytes):
+        self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+    def _end_chunked(self):
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+    def _no_content(self, status=204):
+        self.send_response(status)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def _not_found(self, kind, ref):
+        self._json(404, {"message": f"No such {kind}: {ref}"})
+
+    def _flag(self, name, default=False):
+        value = self.query.get(name)
+        if value is None:
+            return default
+        return value.lower() in ("1", "true", "yes")
+
+    def _filters(self):
+        raw = self.query.get("filters")
+        if not raw:
+            return {}
+        filters = json.loads(raw)
+        return {key: list(value.keys()) if isinstance(value, dict) else value for key, value in filters.items()}
+
+    # -- control endpoints -------------------------------------------------
+    def _fake_stats(self):
+        self._json(200, self.server.snapshot())
+
+    def _fake_reset(self):
+        self.server.reset_counters()
+        self._no_content()
+
+    def _fake_config(self):
+        if "latency_ms" in self.query:
+            self.server.latency = float(self.query["latency_ms"]) / 1000
+        self._json(200, {"latency_ms": self.server.latency * 1000})
+
+    # -- system ------------------------------------------------------------
+    def ping(self):
+        self._raw(200, b"OK", content_type="text/plain")
+
+    def version(self):
+        self._json(200, {"Version": "24.0.0-fake", "ApiVersion": API_VERSION, "MinAPIVersion": "1.12",
+                         "Os": "linux", "Arch": "amd64", "KernelVersion": "6.0.0", "GoVersion": "go1.20"})
+
+    def info(self):
+        with self.inventory.lock:
+            containers = list(self.inventory.containers.values())
+            self._json(200, {
+                "ID": "FAKE", "Name": "fake-docker", "ServerVersion": "24.0.0-fake",
+                "Containers": len(containers),
+                "ContainersRunning": sum(1 for c in containers if c["state"] == "running"),
+                "ContainersPaused": sum(1 for c in containers if c["state"] == "paused"),
+                "ContainersStopped": sum(1 for c in containers if c["state"] == "exited"),
+                "Images": len(self.inventory.images), "NCPU": 8, "MemTotal": 16 * 1024 ** 3,
+            })
+
+    def events(self):
+        since = float(self.query.get("since") or time.time())
+        until = float(self.query["until"]) if "until" in self.query else None
+        self._start_chunked()
+        cursor = 0
+        with self.inventory.events_cond:
+            backlog = [e for e in self.inventory.events if e["time"] >= int(since)]
+            cursor = len(self.inventory.events)
+        for event in backlog:
+            self._chunk(json.dumps(event).encode("utf-8") + b"\n")
+        try:
+            while until is None or time.time() < until:
+                with self.inventory.events_cond:
+                    self.inventory.events_cond.wait(timeout=0.5)
+                    events = self.inventory.events
+                    cursor = min(cursor, len(events))
+                    fresh = events[cursor:]
+                    cursor = len(events)
+                for event in fresh:
+                    self._chunk(json.dumps(event).encode("utf-8") + b"\n")
+                if self.server.shutting_down:
+                    break
+            self._end_chunked()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    # -- containers ----------------------------------------------------------
+    def containers_list(self):
+        show_all = self._flag("all")
+        filters = self._filters()
+        with self.inventory.lock:
+            result = []
+            for container in sorted(self.inventory.containers.values(), key=lambda c: -c["created"]):
+                if not show_all and container["state"] not in ("running", "paused", "restarting"):
+                    continue
+                if "id" in filters and not any(container["id"].startswith(ref) for ref in filters["id"]):
+                    continue
+                if "status" in filters and container["state"] not in filters["status"]:
+                    continue
+                if "name" in filters and not any(name in container["name"] for name in filters["name"]):
+                    continue
+                if "label" in filters and not all(_label_matches(container["labels"], label) for label in filters["label"]):
+                    continue
+                result.append(container_summary(container))
+        self._json(200, result)
+
+    def container_inspect(self, ref):
+        container = self.inventory.find_container(ref)
+        if not container:
+            return self._not_found("container", ref)
+        self._json(200, container_inspect(container))
+
+    def container_create(self):
+        name = self.query.get("name") or f"fake-{int(time.time() * 1000)}"
+        image = self.inventory.find_image((self.body or {}).get("Image", ""))
+        if not image:
+            return self._not_found("image", (self.body or {}).get("Image"))
+        if self.inventory.find_container(name):
+            return self._json(409, {"message": f"Conflict. The container name \"/{name}\" is already in use"})
+        with self.inventory.lock:
+            bindings = ((self.body or {}).get("HostConfig") or {}).get("PortBindings") or {}
+            container_id = self.inventory.add_container(name, image["Id"], ports=bindings,
+                                                        labels=(self.body or {}).get("Labels") or {})
+        self.inventory.emit("container", "create", container_id, {"name": name})
+        self._json(201, {"Id": container_id, "Warnings": []})
+
+    def _transition(self, ref, allowed, target, action):
+        container = self.inventory.find_container(ref)
+        if not container:
+            return self._not_found("container", ref)
+        with self.inventory.lock:
+            if allowed and container["state"] not in allowed:
+                return self._json(409, {"message": f"Container {ref} is {container['state']}"})
+            if container["state"] == target and action in ("start", "stop"):
+                return self._no_content(304)
+            container["state"] = target
+        self.inventory.emit("container", action, container["id"], {"name": container["name"], "image": container["image"]})
+        self._no_content()
+
+    def container_start(self, ref):
+        self._transition(ref, None, "running", "start")
+
+    def container_stop(self, ref):
+        self._transition(ref, None, "exited", "stop")
+
+    def container_restart(self, ref):
+        self._transition(ref, None, "running", "restart")
+
+    def container_pause(self, ref):
+        self._transition(ref, ("running",), "paused", "pause")
+
+    def container_unpause(self, ref):
+        self._transition(ref, ("paused",), "running", "unpause")
+
+    def container_rename(self, ref):
+        container = self.inventory.find_container(ref)
+        if not container:
+            return self._not_found("container", ref)
+        with self.inventory.lock:
+            container["name"] = self.query.get("name", container["name"])
+        self.inventory.emit("container", "rename", container["id"], {"name": container["name"]})
+        self._no_content()
+
+    def container_delete(self, ref):
+        container = self.inventory.find_container(ref)
+        if not container:
+            return self._not_found("container", ref)
+        with self.inventory.lock:
+            if container["state"] == "running" and not self._flag("force"):
+                return self._json(409, {"message": "You cannot remove a running container"})
+            del self.inventory.containers[container["id"]]
+        self.inventory.emit("container", "destroy", container["id"], {"name": container["name"]})
+        self._no_content()
+
+    def container_logs(self, ref):
+        container = self.inventory.find_container(ref)
+        if not container:
+            return self._not_found("container", ref)
+        tail = self.query.get("tail", "all")
+        tail = None if tail == "all" else int(tail)
+        since = float(self.query["since"]) if self.query.get("since") not in (None, "0") else None
+        until = float(self.query["until"]) if self.query.get("until") not in (None, "0") else None
+        timestamps = self._flag("timestamps")
+
+        def render(timestamp, text):
+            prefix = (_iso(timestamp)[:-1] + "000Z ") if timestamps else ""
+            return frame(f"{prefix}{text}\n".encode("utf-8"))
+
+        lines = log_lines(container, tail=tail, since=since, until=until)
+        if not self._flag("follow"):
+            return self._raw(200, b"".join(render(ts, text) for ts, text in lines))
+
+        self._start_chunked("application/vnd.docker.raw-stream")
+        try:
+            for ts, text in lines:
+                self._chunk(render(ts, text))
+            counter = 0
+            while not self.server.shutting_down and (until is None or time.time() < until):
+                time.sleep(0.2)
+                counter += 1
+                self._chunk(render(time.time(), f"INFO follow tick={counter} container={container['name']}"))
+            self._end_chunked()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def container_stats(self, ref):
+        container = self.inventory.find_container(ref)
+        if not container:
+            return self._not_found("container", ref)
+        if self._flag("stream", default=True):
+            self._start_chunked()
+            try:
+                while not self.server.shutting_down and container["id"] in self.inventory.containers:
+                    self._chunk(json.dumps(stats_payload(container)).encode("utf-8") + b"\n")
+                    time.sleep(1)
+                self._end_chunked()
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+            return
+        self._json(200, stats_payload(container))
+
+    def exec_create(self, ref):
+        container = self.inventory.find_container(ref)
+        if not container:
+            return self._not_found("container", ref)
+        exec_id = _digest(f"exec{time.time()}")
+        with self.inventory.lock:
+            self.inventory.execs[exec_id] = {"container": container["name"], "cmd": (self.body or {}).get("Cmd")}
+        self._json(201, {"Id": exec_id})
+
+    def exec_start(self, exec_id):
+        exec_def = self.inventory.execs.get(exec_id)
+        if not exec_def:
+            return self._not_found("exec instance", exec_id)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/vnd.docker.raw-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.wfile.flush()
+        # Give the client time to finish parsing headers before the raw stream starts.
+        time.sleep(0.05)
+        output = f"fake exec {' '.join(exec_def['cmd'] or [])} in {exec_def['container']}\n".encode("utf-8")
+        self.wfile.write(frame(output))
+        self.wfile.flush()
+        self.close_connection = True
+
+    def exec_inspect(self, exec_id):
+        self._json(200, {"ID": exec_id, "Running": False, "ExitCode": 0})
+
+    def containers_prune(self):
+        with self.inventory.lock:
+            removed = [cid for cid, c in self.inventory.containers.items() if c["state"] == "exited"]
+            for cid in removed:
+                del self.inventory.containers[cid]
+        self._json(200, {"ContainersDeleted": removed, "SpaceReclaimed": len(removed) * 1024})
+
+    # -- images ------------------------------------------------------------
+    def images_list(self):
+        quiet = self._flag("only_ids")
+        with self.inventory.lock:
+            images = list(self.inventory.images.values())
+        if quiet:
+            return self._json(200, [{"Id": image["Id"]} for image in images])
+        self._json(200, images)
+
+    def image_inspect(self, ref):
+        image = self.inventory.find_image(ref)
+        if not image:
+            return self._not_found("image", ref)
+        self._json(200, image_inspect(image))
+
+    def image_delete(self, ref):
+        image = self.inventory.find_image(ref)
+        if not image:
+            return self._not_found("image", ref)
+        with self.inventory.lock:
+            in_use = [c for c in self.inventory.containers.values() if c["image_id"] == image["Id"]]
+            if in_use and not self._flag("force"):
+                state = "running" if any(c["state"] == "running" for c in in_use) else "stopped"
+                return self._json(409, {"message": f"conflict: unable to delete {ref} - image is being used by {state} container {in_use[0]['id'][:12]}"})
+            del self.inventory.images[image["Id"]]
+        self.inventory.emit("image", "delete", image["Id"])
+        self._json(200, [{"Deleted": image["Id"]}])
+
+    def image_create(self):
+        repository = self.query.get("fromImage", "")
+        tag = self.query.get("tag") or "latest"
+        reference = f"{repository}:{tag}"
+        layers = [_digest(f"{reference}-{i}")[:12] for i in range(3)]
+        layer_size = 4 * 1024 * 1024
+        self._start_chunked()
+        try:
+            self._chunk(json.dumps({"status": f"Pulling from {repository}", "id": tag}).encode() + b"\r\n")
+            for layer in layers:
+                self._chunk(json.dumps({"status": "Pulling fs layer", "id": layer}).encode() + b"\r\n")
+            for step in range(1, 5):
+                for layer in layers:
+                    detail = {"current": layer_size * step // 4, "total": layer_size}
+                    self._chunk(json.dumps({"status": "Downloading", "progressDetail": detail, "id": layer}).encode() + b"\r\n")
+                time.sleep(self.server.latency)
+            for layer in layers:
+                self._chunk(json.dumps({"status": "Download complete", "progressDetail": {}, "id": layer}).encode() + b"\r\n")
+                detail = {"current": layer_size, "total": layer_size}
+                self._chunk(json.dumps({"status": "Extracting", "progressDetail": detail, "id": layer}).encode() + b"\r\n")
+                self._chunk(json.dumps({"status": "Pull complete", "progressDetail": {}, "id": layer}).encode() + b"\r\n")
+            with self.inventory.lock:
+                if not self.inventory.find_image(reference):
+                    self.inventory.add_image(reference, size=layer_size * len(layers))
+            self._chunk(json.dumps({"status": f"Status: Downloaded newer image for {reference}"}).encode() + b"\r\n")
+            self._end_chunked()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        self.inventory.emit("image", "pull", reference)
+
+    def images_prune(self):
+        with self.inventory.lock:
+            used = {c["image_id"] for c in self.inventory.containers.values()}
+            removed = [image_id for image_id in self.inventory.images if image_id not in used]
+            reclaimed = sum(self.inventory.images[image_id]["Size"] for image_id in removed)
+            for image_id in removed:
+                del self.inventory.images[image_id]
+        self._json(200, {"ImagesDeleted": [{"Deleted": image_id} for image_id in removed], "SpaceReclaimed": reclaimed})
+
+    # -- volumes -----------------------------------------------------------
+    def volumes_list(self):
+        with self.inventory.lock:
+            self._json(200, {"Volumes": list(self.inventory.volumes.values()), "Warnings": None})
+
+    def volume_inspect(self, name):
+        volume = self.inventory.volumes.get(name)
+        if not volume:
+            return self._not_found("volume", name)
+        self._json(200, volume)
+
+    def volume_create(self):
+        name = (self.body or {}).get("Name")
+        with self.inventory.lock:
+            if name in self.inventory.volumes:
+                return self._json(409, {"message": f"volume with name {name} already exists"})
+            self.inventory.volumes[name] = {
+                "Name": name, "Driver": "local", "Mountpoint": f"/var/lib/docker/volumes/{name}/_data",
+                "CreatedAt": _iso(time.time())[:19] + "Z", "Labels": {}, "Scope": "local", "Options": {},
+            }
+        self.inventory.emit("volume", "create", name)
+        self._json(201, self.inventory.volumes[name])
+
+    def volume_delete(self, name):
+        with self.inventory.lock:
+            if name not in self.inventory.volumes:
+                return self._not_found("volume", name)
+            del self.inventory.volumes[name]
+        self.inventory.emit("volume", "destroy", name)
+        self._no_content()
+
+    def volumes_prune(self):
+        with self.inventory.lock:
+            removed = list(self.inventory.volumes)[len(self.inventory.volumes) // 2:]
+            for name in removed:
+                del self.inventory.volumes[name]
+        self._json(200, {"VolumesDeleted": removed, "SpaceReclaimed": len(removed) * 4096})
+
+    # -- networks ----------------------------------------------------------
+    def networks_list(self):
+        with self.inventory.lock:
+            self._json(200, list(self.inventory.networks.values()))
+
+    def network_inspect(self, ref):
+        network = self.inventory.find_network(ref)
+        if not network:
+            return self._not_found("network", ref)
+        self._json(200, network)
+
+    def network_delete(self, ref):
+        network = self.inventory.find_network(ref)
+        if not network:
+            return self._not_found("network", ref)
+        with self.inventory.lock:
+            del self.inventory.networks[network["Id"]]
+        self.inventory.emit("network", "destroy", network["Id"], {"name": network["Name"]})
+        self._no_content()
+
+    def networks_prune(self):
+        with self.inventory.lock:
+            removed = [n["Name"] for n in self.inventory.networks.values() if n["Name"].startswith("bench-net-")]
+            self.inventory.networks = {k: v for k, v in self.inventory.networks.items() if v["Name"] not in removed}
+        self._json(200, {"NetworksDeleted": removed})
+
+def _label_matches(labels, selector):
+    key, _, value = selector.partition("=")
+    return key in labels and (not value or labels[key] == value)
+
+_ID = r"([^/]+)"
+ROUTES = [(method, re.compile(pattern), handler) for method, pattern, handler in [
+    ("GET", r"/_fake/stats", "_fake_stats"),
+    ("POST", r"/_fake/reset", "_fake_reset"),
+    ("POST", r"/_fake/config", "_fake_config"),
+    ("GET", r"/_ping", "ping"),
+    ("HEAD", r"/_ping", "ping"),
+    ("GET", r"/version", "version"),
+    ("GET", r"/info", "info"),
+    ("GET", r"/events", "events"),
+    ("GET", r"/containers/json", "containers_list"),
+    ("POST", r"/containers/create", "container_create"),
+    ("POST", r"/containers/prune", "containers_prune"),
+    ("GET", rf"/containers/{_ID}/json", "container_inspect"),
+    ("POST", rf"/containers/{_ID}/start", "container_start"),
+    ("POST", rf"/containers/{_ID}/stop", "container_stop"),
+    ("POST", rf"/containers/{_ID}/restart", "container_restart"),
+    ("POST", rf"/containers/{_ID}/pause", "container_pause"),
+    ("POST", rf"/containers/{_ID}/unpause", "container_unpause"),
+    ("POST", rf"/containers/{_ID}/rename", "container_rename"),
+    ("GET", rf"/containers/{_ID}/logs", "container_logs"),
+    ("GET", rf"/containers/{_ID}/stats", "container_stats"),
+    ("POST", rf"/containers/{_ID}/exec", "exec_create"),
+    ("DELETE", rf"/containers/{_ID}", "container_delete"),
+    ("POST", rf"/exec/{_ID}/start", "exec_start"),
+    ("GET", rf"/exec/{_ID}/json", "exec_inspect"),
+    ("GET", r"/images/json", "images_list"),
+    ("POST", r"/images/create", "image_create"),
+    ("POST", r"/images/prune", "images_prune"),
+    ("GET", r"/images/(.+)/json", "image_inspect"),
+    ("DELETE", r"/images/(.+)", "image_delete"),
+    ("GET", r"/volumes", "volumes_list"),
+    ("POST", r"/volumes/create", "volume_create"),
+    ("POST", r"/volumes/prune", "volumes_prune"),
+    ("GET", rf"/volumes/{_ID}", "volume_inspect"),
+    ("DELETE", rf"/volumes/{_ID}", "volume_delete"),
+    ("GET", r"/networks", "networks_list"),
+    ("POST", r"/networks/prune", "networks_prune"),
+    ("GET", rf"/networks/{_ID}", "network_inspect"),
+    ("DELETE", rf"/networks/{_ID}", "network_delete"),
+]]
+
+class FakeDockerServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+    request_queue_size = 128
+    allow_reuse_address = True
+
+    def __init__(self, socket_path, inventory, latency_ms=0.0):
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        super().__init__(socket_path, FakeDockerHandler)
+        self.socket_path = socket_path
+        self.inventory = inventory
+        self.latency = latency_ms / 1000
+        self.shutting_down = False
+        self._counter_lock = threading.Lock()
+        self.reset_counters()
+
+    def get_request(self):
+        request, _ = super().get_request()
+        return request, ("fake-docker", 0)
+
+    def record(self, route):
+        with self._counter_lock:
+            self.total_calls += 1
+            self.calls_by_route[route] = self.calls_by_route.get(route, 0) + 1
+
+    def reset_counters(self):
+        with self._counter_lock:
+            self.total_calls = 0
+            self.calls_by_route = {}
+
+    def snapshot(self):
+        with self._counter_lock:
+            return {"total": self.total_calls, "by_route": dict(self.calls_by_route)}
+
+    def shutdown(self):
+        self.shutting_down = True
+        super().shutdown()
+        self.server_close()
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+
+def start_in_thread(socket_path, latency_ms=0.0, **seed):
+    inventory = Inventory()
+    inventory.seed(**seed)
+    server = FakeDockerServer(socket_path, inventory, latency_ms=latency_ms)
+    thread = threading.Thread(target=server.serve_forever, name="fake-docker", daemon=True)
+    thread.start()
+    return server
+
+def main():
+    parser = argparse.ArgumentParser(description="Stand-in Docker Engine API di atas unix socket untuk benchmark offline.")
+    parser.add_argument("--socket", default="/tmp/chatops-fake-docker.sock")
+    parser.add_argument("--containers", type=int, default=100)
+    parser.add_argument("--images", type=int, default=20)
+    parser.add_argument("--volumes", type=int, default=20)
+    parser.add_argument("--networks", type=int, default=5)
+    parser.add_argument("--running-ratio", type=float, default=0.75)
+    parser.add_argument("--log-lines", type=int, default=200)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    args = parser.parse_args()
+
+    inventory = Inventory()
+    inventory.seed(containers=args.containers, images=args.images, volumes=args.volumes,
+                   networks=args.networks, running_ratio=args.running_ratio, log_lines=args.log_lines)
+    server = FakeDockerServer(args.socket, inventory, latency_ms=args.latency_ms)
+    print(f"Fake Docker daemon siap di unix://{args.socket}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
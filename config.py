@@ -9,6 +9,53 @@ class Config:
     GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
     SECRET_KEY = os.getenv('FLASK_SECRET_KEY', 'dev-secret-key') 
     CHATOPS_PASSWORD = os.getenv('CHATOPS_PASSWORD')
+    GEMINI_HISTORY_TOKEN_BUDGET = int(os.getenv('GEMINI_HISTORY_TOKEN_BUDGET', 6000))
+    GEMINI_HISTORY_VERBATIM_TURNS = int(os.getenv('GEMINI_HISTORY_VERBATIM_TURNS', 3))
+    GEMINI_TOOL_MAX_WORKERS = int(os.getenv('GEMINI_TOOL_MAX_WORKERS', 4))
+    GEMINI_TOOL_TURN_TIMEOUT = float(os.getenv('GEMINI_TOOL_TURN_TIMEOUT', 20))
+    GEMINI_TOOL_MAX_ABANDONED = int(os.getenv('GEMINI_TOOL_MAX_ABANDONED', 16))
+    GEMINI_CACHE_SIZE = int(os.getenv('GEMINI_CACHE_SIZE', 256))
+    GEMINI_CACHE_TTL = float(os.getenv('GEMINI_CACHE_TTL', 300))
+    DOCKER_POOL_SIZE = int(os.getenv('DOCKER_POOL_SIZE', 16))
+    DOCKER_TIMEOUT = float(os.getenv('DOCKER_TIMEOUT', 5))
+    DOCKER_LONG_TIMEOUT = float(os.getenv('DOCKER_LONG_TIMEOUT', 600))
+    DOCKER_HEALTH_INTERVAL = float(os.getenv('DOCKER_HEALTH_INTERVAL', 30))
+    DOCKER_RECONNECT_MAX_BACKOFF = float(os.getenv('DOCKER_RECONNECT_MAX_BACKOFF', 60))
+    DOCKER_HOSTS = os.getenv('DOCKER_HOSTS', '')
+    DOCKER_FANOUT_DEADLINE = float(os.getenv('DOCKER_FANOUT_DEADLINE', 5))
+    INVENTORY_CACHE_ENABLED = os.getenv('INVENTORY_CACHE_ENABLED', 'true').lower() == 'true'
+    STATS_SAMPLER_INTERVAL = float(os.getenv('STATS_SAMPLER_INTERVAL', 10))
+    STATS_SAMPLER_MAX_CONTAINERS = int(os.getenv('STATS_SAMPLER_MAX_CONTAINERS', 100))
+    METRICS_MAX_CONTAINERS = int(os.getenv('METRICS_MAX_CONTAINERS', 200))
+    METRICS_AUTOSTART = os.getenv('METRICS_AUTOSTART', 'true').lower() == 'true'
+    LOG_STREAM_MAX_LINES = int(os.getenv('LOG_STREAM_MAX_LINES', 5000))
+    LOG_STREAM_MAX_BYTES = int(os.getenv('LOG_STREAM_MAX_BYTES', 2 * 1024 * 1024))
+    LOG_STREAM_MAX_LINE_BYTES = int(os.getenv('LOG_STREAM_MAX_LINE_BYTES', 16 * 1024))
+    LOG_STREAM_MAX_SECONDS = float(os.getenv('LOG_STREAM_MAX_SECONDS', 900))
+    LOG_STREAM_KEEPALIVE_SECONDS = float(os.getenv('LOG_STREAM_KEEPALIVE_SECONDS', 15))
+    LOG_STREAM_QUEUE_LINES = int(os.getenv('LOG_STREAM_QUEUE_LINES', 64))
+    LOG_SEARCH_DEFAULT_WINDOW = int(os.getenv('LOG_SEARCH_DEFAULT_WINDOW', 3600))
+    LOG_SEARCH_MAX_CONTAINERS = int(os.getenv('LOG_SEARCH_MAX_CONTAINERS', 50))
+    LOG_SEARCH_MAX_WORKERS = int(os.getenv('LOG_SEARCH_MAX_WORKERS', 8))
+    LOG_SEARCH_PER_CONTAINER_LIMIT = int(os.getenv('LOG_SEARCH_PER_CONTAINER_LIMIT', 20))
+    LOG_SEARCH_MAX_RESULTS = int(os.getenv('LOG_SEARCH_MAX_RESULTS', 200))
+    LOG_SEARCH_MAX_SCAN_BYTES = int(os.getenv('LOG_SEARCH_MAX_SCAN_BYTES', 32 * 1024 * 1024))
+    LOG_SEARCH_TIMEOUT = float(os.getenv('LOG_SEARCH_TIMEOUT', 15))
+    LOG_SEARCH_MAX_REGEX_LENGTH = int(os.getenv('LOG_SEARCH_MAX_REGEX_LENGTH', 200))
+    BULK_MAX_CONTAINERS = int(os.getenv('BULK_MAX_CONTAINERS', 100))
+    BULK_MAX_WORKERS = int(os.getenv('BULK_MAX_WORKERS', 8))
+    COMPOSE_PROJECT_NAME = os.getenv('COMPOSE_PROJECT_NAME')
+    COMPOSE_MAX_WORKERS = int(os.getenv('COMPOSE_MAX_WORKERS', 8))
+    COMPOSE_COMMAND_TIMEOUT = float(os.getenv('COMPOSE_COMMAND_TIMEOUT', 600))
+    COMPOSE_SYNC_TIMEOUT = float(os.getenv('COMPOSE_SYNC_TIMEOUT', 120))
+    COMPOSE_OUTPUT_MAX_BYTES = int(os.getenv('COMPOSE_OUTPUT_MAX_BYTES', 1024 * 1024))
+    JOB_QUEUE_ENABLED = os.getenv('JOB_QUEUE_ENABLED', 'true').lower() == 'true'
+    JOB_MAX_WORKERS = int(os.getenv('JOB_MAX_WORKERS', 4))
+    JOB_MAX_PENDING = int(os.getenv('JOB_MAX_PENDING', 50))
+    JOB_MAX_FINISHED = int(os.getenv('JOB_MAX_FINISHED', 200))
+    JOB_LIMIT_PULL = int(os.getenv('JOB_LIMIT_PULL', 2))
+    JOB_LIMIT_COMPOSE = int(os.getenv('JOB_LIMIT_COMPOSE', 1))
+    JOB_LIMIT_PRUNE = int(os.getenv('JOB_LIMIT_PRUNE', 1))
 
 config = {
     'default': Config